@@ -3,6 +3,9 @@ Dividend Analysis Module (Question 11)
 """
 from typing import Dict, Any, List
 import pandas as pd
+import config
+from analyzers.rules import evaluate_rule
+from analyzers.dividend_metrics import dividend_metrics, dividend_adjustment, format_dividend_metrics
 
 class DividendAnalyzer:
     """Analyze dividend metrics of a stock"""
@@ -11,6 +14,22 @@ class DividendAnalyzer:
         self.fetcher = data_fetcher
         self.info = data_fetcher.get_stock_info()
         self.dividends = data_fetcher.get_dividends()
+        self.metrics = self._metrics()
+    
+    def _metrics(self) -> Dict[str, Any]:
+        """Growth, streak, regularity and trailing yield for this symbol (empty without payments)"""
+        if not isinstance(self.dividends, pd.Series) or self.dividends.empty:
+            return {}
+        try:
+            history = self.fetcher.get_historical_data(period=config.DIVIDEND_PARAMS['history_period'])
+            prices = None
+            if history is not None and not history.empty and 'Close' in history.columns:
+                prices = history[['Close']].rename(columns={'Close': self.fetcher.symbol})
+            table = dividend_metrics({self.fetcher.symbol: self.dividends}, prices)
+            return table.iloc[0].to_dict() if not table.empty else {}
+        except Exception as e:
+            print(f"Error computing dividend metrics: {e}")
+            return {}
     
     def analyze_dividend(self) -> Dict[str, Any]:
         """
@@ -22,43 +41,22 @@ class DividendAnalyzer:
         payout_ratio = self.info.get('payoutRatio', 0) * 100 if self.info.get('payoutRatio') else 0
         five_year_avg_yield = self.info.get('fiveYearAvgDividendYield', 0)
         
-        score = 50
-        assessment = "No dividend"
-        
-        # Check if company pays dividends
-        if dividend_yield > 0 or dividend_rate > 0:
-            if dividend_yield > 4:
-                score = 85
-                assessment = "High dividend yield - Attractive for income investors"
-            elif dividend_yield > 2:
-                score = 70
-                assessment = "Good dividend yield"
-            elif dividend_yield > 0:
-                score = 55
-                assessment = "Low dividend yield"
-            
-            # Adjust for payout ratio sustainability
-            if payout_ratio > 0:
-                if payout_ratio > 80:
-                    score = max(0, score - 15)
-                    assessment += " (high payout ratio - sustainability concern)"
-                elif payout_ratio < 60:
-                    score = min(100, score + 10)
-                    assessment += " (sustainable payout ratio)"
+        # Yield ladder adjusted for payout sustainability (config.SCORING_RULES['dividend']);
+        # without a quoted yield, fall back to the trailing yield from payments and price history
+        trailing_yield = self.metrics.get('trailing_yield')
+        if not dividend_yield and trailing_yield is not None and pd.notna(trailing_yield) and trailing_yield > 0:
+            dividend_yield = trailing_yield
+            score, assessment = evaluate_rule('dividend', {**self.info, 'dividendYield': trailing_yield / 100})
         else:
-            score = 45
-            assessment = "No dividend - Growth-focused company"
+            score, assessment = evaluate_rule('dividend', self.info)
         
-        # Analyze dividend history
+        # Dividend growth, increase streak and payment regularity
         dividend_history = "N/A"
-        if self.dividends is not None and len(self.dividends) > 0:
-            recent_dividends = self.dividends.tail(5)
-            if len(recent_dividends) >= 2:
-                trend = "increasing" if recent_dividends.iloc[-1] > recent_dividends.iloc[0] else "stable/decreasing"
-                dividend_history = f"{len(self.dividends)} payments on record, {trend} trend"
-                
-                if trend == "increasing":
-                    score = min(100, score + 5)
+        if self.metrics:
+            frequency = self.metrics.get('frequency') or 'irregular'
+            dividend_history = (f"{int(self.metrics['payments'])} payments on record, {frequency}, "
+                                f"{int(self.metrics['increase_streak'])} consecutive annual increases")
+            score = max(0, min(100, score + dividend_adjustment(self.metrics)))
         
         return {
             'question_en': 'Does this stock pay dividends? Is the dividend yield high?',
@@ -69,6 +67,7 @@ class DividendAnalyzer:
                 'payout_ratio': f"{payout_ratio:.2f}%" if payout_ratio else "N/A",
                 'five_year_avg_yield': f"{five_year_avg_yield:.2f}%" if five_year_avg_yield else "N/A",
                 'dividend_history': dividend_history,
+                **format_dividend_metrics(self.metrics),
                 'assessment': assessment
             },
             'score': score
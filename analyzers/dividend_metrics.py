@@ -0,0 +1,174 @@
+"""
+Dividend Metrics Module (feeds Question 11)
+
+Dividend CAGR, consecutive-increase streaks, payment regularity and trailing
+yield from ex-dividend payment series. Payments for every symbol are stacked
+into one long table and resampled to calendar years in a single group-by, so
+one symbol and thousands take the same path.
+"""
+from typing import Dict, Any, List, Mapping, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import config
+from utils.data_fetcher import get_fetcher
+from analyzers.relative_strength import load_panel
+
+FREQUENCIES = {12: 'monthly', 4: 'quarterly', 2: 'semi-annual', 1: 'annual'}
+
+def _naive(index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+    return index.tz_localize(None) if index.tz is not None else index
+
+def payments_table(dividends: Mapping[str, pd.Series]) -> pd.DataFrame:
+    """Stack per-symbol payment Series into long rows of (symbol, date, amount)"""
+    series = {symbol: s[s > 0] for symbol, s in dividends.items()
+              if isinstance(s, pd.Series) and isinstance(s.index, pd.DatetimeIndex) and not s.empty}
+    series = {symbol: s for symbol, s in series.items() if not s.empty}
+    if not series:
+        return pd.DataFrame({'symbol': pd.Series(dtype='object'), 'date': pd.Series(dtype='datetime64[ns]'),
+                             'amount': pd.Series(dtype='float64')})
+    lengths = [len(s) for s in series.values()]
+    return pd.DataFrame({
+        'symbol': np.repeat(list(series), lengths),
+        'date': np.concatenate([_naive(s.index).to_numpy(dtype='datetime64[ns]') for s in series.values()]),
+        'amount': np.concatenate([s.to_numpy(dtype=float) for s in series.values()])
+    })
+
+def _latest_prices(prices: Union[pd.Series, pd.DataFrame, Mapping[str, float], None]) -> pd.Series:
+    """Symbol -> latest close from a close panel (dates x symbols) or a mapping of prices"""
+    if prices is None:
+        return pd.Series(dtype=float)
+    if isinstance(prices, pd.DataFrame):
+        return prices.ffill().iloc[-1] if not prices.empty else pd.Series(dtype=float)
+    return pd.Series(prices, dtype=float)
+
+def dividend_metrics(dividends: Mapping[str, pd.Series],
+                     prices: Union[pd.Series, pd.DataFrame, Mapping[str, float], None] = None,
+                     as_of: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    Dividend growth and income metrics for every symbol.
+    Args:
+        dividends: Symbol -> payment Series (DataFetcher.get_dividends output)
+        prices: Close panel (dates x symbols) or symbol -> latest price, for trailing yield
+        as_of: Valuation date (default: the last price date, else the last payment)
+    Returns: DataFrame indexed by symbol with cagr_{n}y (%), increase_streak (years),
+             payments_per_year, frequency, regularity (share of recent years at that
+             frequency), ttm_dividend, trailing_yield (%), first_year and payments.
+             Growth is measured on complete calendar years before as_of.
+    """
+    params = config.DIVIDEND_PARAMS
+    long = payments_table(dividends)
+    if long.empty:
+        return pd.DataFrame(index=pd.Index([], name='symbol'))
+    
+    if as_of is None:
+        as_of = long['date'].max()
+        if isinstance(prices, pd.DataFrame) and not prices.empty:
+            as_of = max(as_of, _naive(pd.DatetimeIndex(prices.index))[-1])
+    as_of = pd.Timestamp(as_of)
+    as_of = as_of.tz_localize(None) if as_of.tz is not None else as_of
+    long = long[long['date'] <= as_of]
+    
+    # Calendar-year totals and payment counts (symbols x years), current partial year excluded
+    last_year = as_of.year - 1
+    years = long['date'].dt.year
+    annual = long[years <= last_year].groupby(['symbol', years[years <= last_year]])['amount'].agg(['sum', 'count'])
+    symbols = pd.Index(sorted(long['symbol'].unique()), name='symbol')
+    first_year = years.groupby(long['symbol']).min().reindex(symbols).to_numpy()
+    span = np.arange(min(first_year.min(), last_year), last_year + 1)
+    totals = annual['sum'].unstack().reindex(index=symbols, columns=span).to_numpy(dtype=float)
+    counts = annual['count'].unstack().reindex(index=symbols, columns=span).fillna(0).to_numpy(dtype=float)
+    
+    # The first year of payments is usually partial; years before it are not "missed"
+    started = span[None, :] >= first_year[:, None]
+    full_year = span[None, :] > first_year[:, None]
+    totals = np.where(full_year, totals, np.nan)
+    
+    metrics = pd.DataFrame(index=symbols)
+    latest = totals[:, -1] if span.size else np.full(len(symbols), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for n in params['cagr_years']:
+            base = totals[:, -1 - n] if n < span.size else np.full(len(symbols), np.nan)
+            valid = (base > 0) & (latest > 0)
+            metrics[f'cagr_{n}y'] = np.where(valid, (latest / base) ** (1.0 / n) - 1.0, np.nan) * 100
+    
+    # Consecutive year-over-year increases ending with the last complete year
+    increases = np.zeros_like(totals, dtype=bool)
+    with np.errstate(invalid='ignore'):
+        increases[:, 1:] = totals[:, 1:] > totals[:, :-1]
+    metrics['increase_streak'] = np.cumprod(increases[:, ::-1], axis=1).sum(axis=1)
+    
+    # Payment frequency from recent years; regularity is the share of years paid at that frequency
+    recent = counts[:, -params['regularity_years']:]
+    recent_started = started[:, -params['regularity_years']:] & full_year[:, -params['regularity_years']:]
+    with np.errstate(invalid='ignore'):
+        per_year = np.nanmedian(np.where(recent_started, recent, np.nan), axis=1)
+    per_year = np.round(per_year)
+    matches = (recent == per_year[:, None]) & recent_started
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics['regularity'] = matches.sum(axis=1) / recent_started.sum(axis=1)
+    metrics['payments_per_year'] = per_year
+    metrics['frequency'] = [FREQUENCIES.get(int(n), 'irregular') if np.isfinite(n) else None for n in per_year]
+    
+    # Trailing twelve months of payments against the latest close
+    trailing = long[long['date'] > as_of - pd.DateOffset(years=1)]
+    metrics['ttm_dividend'] = trailing.groupby('symbol')['amount'].sum().reindex(symbols).fillna(0.0)
+    latest_prices = _latest_prices(prices).reindex(symbols)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics['trailing_yield'] = metrics['ttm_dividend'] / latest_prices.where(latest_prices > 0) * 100
+    metrics['first_year'] = first_year
+    metrics['payments'] = long.groupby('symbol').size().reindex(symbols)
+    metrics.index = metrics.index.astype(str)
+    return metrics
+
+def load_dividends(symbols: List[str]) -> Dict[str, pd.Series]:
+    """Fetch payment histories for a universe through the shared fetchers"""
+    def fetch(symbol: str):
+        return symbol, get_fetcher(symbol).get_dividends()
+    
+    with ThreadPoolExecutor(max_workers=config.DIVIDEND_PARAMS['workers']) as pool:
+        return {symbol: dividends for symbol, dividends in pool.map(fetch, symbols)
+                if isinstance(dividends, pd.Series) and not dividends.empty}
+
+def universe_dividend_metrics(symbols: List[str]) -> pd.DataFrame:
+    """Batch path: dividend metrics for many symbols, with trailing yield from their price history"""
+    dividends = load_dividends(symbols)
+    if not dividends:
+        return dividend_metrics({})
+    panel = load_panel(list(dividends), config.DIVIDEND_PARAMS['history_period'])
+    return dividend_metrics(dividends, panel)
+
+def dividend_adjustment(metrics: Dict[str, Any]) -> int:
+    """Q11 score delta for dividend growth, long increase streaks and irregular payments"""
+    params = config.DIVIDEND_PARAMS
+    if not metrics:
+        return 0
+    delta = 0
+    growth = next((metrics[f'cagr_{n}y'] for n in sorted(params['cagr_years'], reverse=True)
+                   if pd.notna(metrics.get(f'cagr_{n}y'))), None)
+    if growth is not None and growth > 0:
+        delta += params['growth_bonus']
+    if metrics.get('increase_streak', 0) >= params['streak_years']:
+        delta += params['streak_bonus']
+    regularity = metrics.get('regularity')
+    if regularity is not None and pd.notna(regularity) and regularity < params['min_regularity']:
+        delta -= params['irregular_penalty']
+    return delta
+
+def format_dividend_metrics(metrics: Dict[str, Any]) -> Dict[str, str]:
+    """Display strings for a report"""
+    if not metrics:
+        return {}
+    
+    def percent(value: Any) -> str:
+        return f"{value:+.2f}%" if value is not None and pd.notna(value) else "N/A"
+    
+    formatted = {f'dividend_cagr_{n}y': percent(metrics.get(f'cagr_{n}y'))
+                 for n in config.DIVIDEND_PARAMS['cagr_years']}
+    formatted['increase_streak'] = f"{int(metrics['increase_streak'])} years"
+    formatted['payment_frequency'] = metrics.get('frequency') or "N/A"
+    regularity = metrics.get('regularity')
+    formatted['payment_regularity'] = f"{regularity:.0%}" if pd.notna(regularity) else "N/A"
+    trailing_yield = metrics.get('trailing_yield')
+    formatted['trailing_yield'] = f"{trailing_yield:.2f}%" if pd.notna(trailing_yield) else "N/A"
+    return formatted
@@ -4,6 +4,9 @@ Fundamental Analysis Module (Questions 1-6)
 from typing import Dict, Any, List
 import pandas as pd
 import numpy as np
+from analyzers.rules import evaluate_rule
+from utils.statement_store import normalize_financials, fundamental_metrics, profitability_scores
+from analyzers.ttm import ttm_for_symbol, format_growth, format_percent, format_dollars
 
 class FundamentalAnalyzer:
     """Analyze fundamental aspects of a stock"""
@@ -12,6 +15,20 @@ class FundamentalAnalyzer:
         self.fetcher = data_fetcher
         self.info = data_fetcher.get_stock_info()
         self.financials = data_fetcher.get_financials()
+        self.statements = normalize_financials(data_fetcher.symbol, self.financials)
+        self.ttm = self._ttm()
+    
+    def _ttm(self) -> Dict[str, Any]:
+        """Latest TTM and QoQ/YoY figures from the quarterly statements (empty if unavailable)"""
+        try:
+            return ttm_for_symbol(self.statements, self.fetcher.symbol)
+        except Exception as e:
+            print(f"Error computing TTM fundamentals: {e}")
+            return {}
+    
+    def _ttm_value(self, key: str):
+        value = self.ttm.get(key)
+        return value if value is not None and pd.notna(value) else None
     
     def analyze_business(self) -> Dict[str, Any]:
         """
@@ -41,38 +58,23 @@ class FundamentalAnalyzer:
         profit_margin = self.info.get('profitMargins', 0) * 100
         gross_margin = self.info.get('grossMargins', 0) * 100
         
-        # Try to get historical margins from financials
+        # Gross margin trend from the normalized annual income statements
         margins_trend = "N/A"
-        score = 50
+        trend = None
         
         try:
-            if 'income_stmt' in self.financials and not self.financials['income_stmt'].empty:
-                income_stmt = self.financials['income_stmt']
-                
-                if 'Gross Profit' in income_stmt.index and 'Total Revenue' in income_stmt.index:
-                    gross_profits = income_stmt.loc['Gross Profit']
-                    revenues = income_stmt.loc['Total Revenue']
-                    historical_margins = (gross_profits / revenues * 100).dropna()
-                    
-                    if len(historical_margins) >= 2:
-                        trend = "improving" if historical_margins.iloc[0] > historical_margins.iloc[-1] else "declining"
-                        margins_trend = f"{trend} ({historical_margins.iloc[-1]:.1f}% → {historical_margins.iloc[0]:.1f}%)"
-                        
-                        # Score based on margin level and trend
-                        if gross_margin > 40:
-                            score = 80 if trend == "improving" else 70
-                        elif gross_margin > 25:
-                            score = 65 if trend == "improving" else 55
-                        else:
-                            score = 45 if trend == "improving" else 35
+            metrics = fundamental_metrics(self.statements)
+            if not metrics.empty and metrics['margin_trend'].iloc[0] is not None:
+                row = metrics.iloc[0]
+                trend = row['margin_trend']
+                margins_trend = f"{trend} ({row['gross_margin_first']:.1f}% → {row['gross_margin_latest']:.1f}%)"
         except Exception as e:
             print(f"Error analyzing profitability trend: {e}")
         
-        # Adjust score based on current margins
-        if profit_margin > 20:
-            score = min(100, score + 10)
-        elif profit_margin < 5:
-            score = max(0, score - 15)
+        # Score on margin level and trend, adjusted for the current net margin
+        score = int(profitability_scores(pd.DataFrame({
+            'gross_margin': [gross_margin], 'profit_margin': [profit_margin], 'margin_trend': [trend]
+        })).iloc[0])
         
         return {
             'question_en': 'Is profitability strong? Net profit and gross margin trends?',
@@ -81,6 +83,10 @@ class FundamentalAnalyzer:
                 'profit_margin': f"{profit_margin:.2f}%",
                 'gross_margin': f"{gross_margin:.2f}%",
                 'margins_trend': margins_trend,
+                'ttm_gross_margin': format_percent(self._ttm_value('ttm_gross_margin')),
+                'ttm_net_margin': format_percent(self._ttm_value('ttm_net_margin')),
+                'net_income_qoq': format_growth(self._ttm_value('net_income_qoq')),
+                'net_income_yoy': format_growth(self._ttm_value('net_income_yoy')),
                 'assessment': 'Strong' if profit_margin > 15 else 'Moderate' if profit_margin > 5 else 'Weak'
             },
             'score': score
@@ -93,26 +99,18 @@ class FundamentalAnalyzer:
         """
         revenue_growth = self.info.get('revenueGrowth', 0) * 100
         quarterly_revenue_growth = self.info.get('quarterlyRevenueGrowth', 0) * 100
+        source = 'info'
         
-        score = 50
-        stability = "Moderate"
+        # Prefer growth measured on the quarterly statements over the info snapshot
+        statement_yoy = self._ttm_value('revenue_yoy')
+        statement_qoq = self._ttm_value('revenue_qoq')
+        if statement_yoy is not None:
+            revenue_growth = statement_yoy
+            source = 'quarterly statements'
+        if statement_qoq is not None:
+            quarterly_revenue_growth = statement_qoq
         
-        # Score based on growth rates
-        if revenue_growth > 20:
-            score = 85
-            stability = "Strong growth"
-        elif revenue_growth > 10:
-            score = 70
-            stability = "Healthy growth"
-        elif revenue_growth > 0:
-            score = 55
-            stability = "Modest growth"
-        elif revenue_growth > -5:
-            score = 40
-            stability = "Stagnant"
-        else:
-            score = 25
-            stability = "Declining"
+        score, stability = evaluate_rule('revenue_growth', {**self.info, 'revenueGrowth': revenue_growth / 100})
         
         return {
             'question_en': 'Is revenue growth stable? YoY and QoQ growth?',
@@ -120,6 +118,9 @@ class FundamentalAnalyzer:
             'answer': {
                 'yoy_growth': f"{revenue_growth:.2f}%",
                 'qoq_growth': f"{quarterly_revenue_growth:.2f}%",
+                'ttm_revenue': format_dollars(self._ttm_value('ttm_revenue')),
+                'ttm_revenue_yoy': format_growth(self._ttm_value('ttm_revenue_yoy')),
+                'source': source,
                 'stability': stability
             },
             'score': score
@@ -134,28 +135,8 @@ class FundamentalAnalyzer:
         current_ratio = self.info.get('currentRatio', 0)
         quick_ratio = self.info.get('quickRatio', 0)
         
-        score = 50
-        risk_level = "Moderate"
-        
-        # Assess leverage risk
-        if debt_to_equity < 50:
-            score = 85
-            risk_level = "Low leverage - Healthy"
-        elif debt_to_equity < 100:
-            score = 65
-            risk_level = "Moderate leverage - Acceptable"
-        elif debt_to_equity < 200:
-            score = 45
-            risk_level = "High leverage - Caution"
-        else:
-            score = 25
-            risk_level = "Very high leverage - Risky"
-        
-        # Adjust for liquidity
-        if current_ratio > 2:
-            score = min(100, score + 10)
-        elif current_ratio < 1:
-            score = max(0, score - 15)
+        # Leverage ladder adjusted for liquidity (config.SCORING_RULES['balance_sheet'])
+        score, risk_level = evaluate_rule('balance_sheet', self.info)
         
         return {
             'question_en': 'How is the balance sheet? Any high leverage risk?',
@@ -176,6 +157,15 @@ class FundamentalAnalyzer:
         """
         operating_cashflow = self.info.get('operatingCashflow', 0)
         free_cashflow = self.info.get('freeCashflow', 0)
+        source = 'info'
+        
+        # Trailing four quarters from the cash flow statements when available
+        ttm_operating = self._ttm_value('ttm_operating_cashflow')
+        ttm_free = self._ttm_value('ttm_free_cashflow')
+        if ttm_operating is not None:
+            operating_cashflow = ttm_operating
+            free_cashflow = ttm_free if ttm_free is not None else free_cashflow
+            source = 'TTM quarterly statements'
         
         score = 50
         assessment = "Moderate"
@@ -199,6 +189,9 @@ class FundamentalAnalyzer:
             'answer': {
                 'operating_cashflow': f"${operating_cashflow:,.0f}" if operating_cashflow else "N/A",
                 'free_cashflow': f"${free_cashflow:,.0f}" if free_cashflow else "N/A",
+                'fcf_margin': format_percent(self._ttm_value('ttm_fcf_margin')),
+                'free_cashflow_yoy': format_growth(self._ttm_value('free_cashflow_yoy')),
+                'source': source,
                 'assessment': assessment
             },
             'score': score
@@ -0,0 +1,313 @@
+"""
+Chart Pattern Detection Engine (Question 14)
+
+Swing highs/lows are extracted with a vectorized rolling-extremum pass that
+works on a single price history or on a whole (dates x symbols) panel, then
+reduced to an alternating zigzag. Patterns are matched on the zigzag pivots
+using the tolerance rules in config.PATTERN_PARAMS.
+"""
+from typing import Dict, Any, List, Optional
+import pandas as pd
+import numpy as np
+import config
+
+HIGH = 1
+LOW = -1
+
+def _centered_extreme(values: np.ndarray, order: int, ufunc) -> np.ndarray:
+    """
+    Centered rolling max/min over +/- `order` rows of a 2D array, computed as
+    2*order shifted whole-array ufunc passes. Incomplete windows (edges and
+    NaN gaps) come out as NaN so they never qualify as swings.
+    """
+    result = values.copy()
+    for shift in range(1, order + 1):
+        result[shift:] = ufunc(result[shift:], values[:-shift])
+        result[:-shift] = ufunc(result[:-shift], values[shift:])
+    result[:order] = np.nan
+    result[len(result) - order:] = np.nan
+    return result
+
+def find_swing_candidates(high: np.ndarray, low: np.ndarray, order: int):
+    """
+    Mark bars that are the highest high / lowest low within +/- `order` bars.
+    Works column-wise on (dates x symbols) arrays for the whole panel at once.
+    Returns: (is_swing_high, is_swing_low) boolean numpy arrays
+    """
+    is_high = high == _centered_extreme(high, order, np.maximum)
+    is_low = low == _centered_extreme(low, order, np.minimum)
+    return is_high, is_low
+
+def _linear_fit(x: np.ndarray, y: np.ndarray):
+    """Least-squares slope and intercept of y on x"""
+    x_mean, y_mean = x.mean(), y.mean()
+    dx = x - x_mean
+    slope = (dx * (y - y_mean)).sum() / (dx * dx).sum()
+    return slope, y_mean - slope * x_mean
+
+def build_zigzag(high: np.ndarray, low: np.ndarray, is_high: np.ndarray,
+                 is_low: np.ndarray, min_change: float):
+    """
+    Reduce swing candidates of one symbol to an alternating high/low zigzag
+    where every leg moves at least `min_change` (fraction of price).
+    Returns: (positions, prices, kinds) numpy arrays, kind 1=high, -1=low
+    """
+    positions = np.concatenate([np.flatnonzero(is_high), np.flatnonzero(is_low)])
+    kinds = np.concatenate([np.full(is_high.sum(), HIGH), np.full(is_low.sum(), LOW)])
+    prices = np.concatenate([high[is_high], low[is_low]])
+    
+    if len(positions) == 0:
+        return positions, prices, kinds
+    
+    order = np.lexsort((kinds, positions))
+    positions, kinds, prices = positions[order], kinds[order], prices[order]
+    
+    # Collapse runs of same-kind candidates to their most extreme member
+    run_ids = np.cumsum(np.r_[True, kinds[1:] != kinds[:-1]])
+    order = np.lexsort((-prices * kinds, run_ids))
+    best = order[np.r_[True, run_ids[order][1:] != run_ids[order][:-1]]]
+    positions, kinds, prices = positions[best], kinds[best], prices[best]
+    
+    # Enforce the minimum leg size; this pass only walks the (few) pivots
+    pivots = []
+    for pos, kind, price in zip(positions.tolist(), kinds.tolist(), prices.tolist()):
+        if not pivots:
+            pivots.append([pos, price, kind])
+            continue
+        last = pivots[-1]
+        if kind == last[2]:
+            if price * kind > last[1] * kind:
+                last[0], last[1] = pos, price
+        elif abs(price - last[1]) / last[1] >= min_change:
+            pivots.append([pos, price, kind])
+        elif len(pivots) >= 2 and price * kind > pivots[-2][1] * kind:
+            # Small retracement that still extends the previous swing
+            pivots.pop()
+            pivots[-1][0], pivots[-1][1] = pos, price
+    
+    pivots = np.array(pivots, dtype=float).reshape(-1, 3)
+    return pivots[:, 0].astype(int), pivots[:, 1], pivots[:, 2].astype(int)
+
+class PatternDetector:
+    """Detect classic chart patterns from swing points"""
+    
+    def __init__(self, params: Optional[Dict[str, Any]] = None):
+        self.params = dict(config.PATTERN_PARAMS)
+        if params:
+            self.params.update(params)
+    
+    def detect(self, history: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Detect patterns for a single OHLC history"""
+        if history is None or history.empty:
+            return []
+        return self.scan({'_': history}).get('_', [])
+    
+    def scan(self, histories: Dict[str, pd.DataFrame]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Detect patterns for a whole universe in one batch.
+        Args:
+            histories: Mapping of symbol -> OHLC DataFrame (any length)
+        Returns: Mapping of symbol -> list of detected patterns
+        """
+        histories = {s: h for s, h in histories.items() if h is not None and not h.empty}
+        if not histories:
+            return {}
+        
+        high = pd.DataFrame({s: h['High'] for s, h in histories.items()})
+        low = pd.DataFrame({s: h['Low'] for s, h in histories.items()})
+        close = pd.DataFrame({s: h['Close'] for s, h in histories.items()})
+        high_values = high.to_numpy(dtype=float)
+        low_values = low.to_numpy(dtype=float)
+        close_values = close.to_numpy(dtype=float)
+        is_high, is_low = find_swing_candidates(high_values, low_values, self.params['swing_order'])
+        
+        results = {}
+        for col, symbol in enumerate(high.columns):
+            valid = np.flatnonzero(np.isfinite(close_values[:, col]))
+            if len(valid) < 2 * self.params['swing_order'] + 1:
+                results[symbol] = []
+                continue
+            zigzag = build_zigzag(
+                high_values[:, col], low_values[:, col],
+                is_high[:, col], is_low[:, col], self.params['min_swing_pct']
+            )
+            results[symbol] = self._match(zigzag, close_values[:, col], high.index, valid[-1])
+        return results
+    
+    def _match(self, zigzag, closes: np.ndarray, dates: pd.Index,
+               last_position: int) -> List[Dict[str, Any]]:
+        """
+        Match all pattern rules against one symbol's zigzag.
+        Args:
+            closes: The symbol's closes aligned with dates (NaN where it did not trade)
+            last_position: Row of the symbol's last close
+        """
+        positions, prices, kinds = zigzag
+        current_price = closes[last_position]
+        # Only report structures that ended recently enough to still be relevant
+        min_end = last_position - self.params['max_pattern_age']
+        
+        patterns = []
+        for matcher in (self._match_double, self._match_head_shoulders, self._match_triangle):
+            pattern = matcher(positions, prices, kinds, current_price)
+            if pattern and pattern['end'] >= min_end:
+                patterns.append(pattern)
+        
+        for matcher in (self._match_breakout, self._match_consolidation):
+            pattern = matcher(positions, prices, kinds, closes[:last_position + 1], min_end)
+            # A neckline break already confirmed by a structure is not counted twice
+            if pattern and not any(p['bias'] == pattern['bias'] and p['status'] != 'forming'
+                                   for p in patterns):
+                patterns.append(pattern)
+        
+        for pattern in patterns:
+            if 'start' in pattern:
+                pattern['start'] = dates[int(pattern['start'])]
+                pattern['end'] = dates[int(pattern['end'])]
+        return patterns
+    
+    def _similar(self, a: float, b: float) -> bool:
+        return abs(a - b) / ((a + b) / 2) <= self.params['peak_tolerance']
+    
+    def _match_double(self, positions, prices, kinds, current_price: float) -> Optional[Dict[str, Any]]:
+        """Double top (H-L-H) or double bottom (L-H-L) on the last three pivots"""
+        if len(positions) < 3:
+            return None
+        positions, prices, kinds = positions[-3:], prices[-3:], kinds[-3:]
+        
+        if not self._similar(prices[0], prices[2]):
+            return None
+        
+        neckline = prices[1]
+        breakout = self.params['breakout_pct']
+        if kinds[0] == HIGH:
+            if current_price > max(prices[0], prices[2]):
+                return None
+            confirmed = current_price < neckline * (1 - breakout)
+            return {'name': 'Double top', 'bias': 'bearish',
+                    'status': 'confirmed' if confirmed else 'forming',
+                    'level': neckline, 'start': positions[0], 'end': positions[2]}
+        if current_price < min(prices[0], prices[2]):
+            return None
+        confirmed = current_price > neckline * (1 + breakout)
+        return {'name': 'Double bottom', 'bias': 'bullish',
+                'status': 'confirmed' if confirmed else 'forming',
+                'level': neckline, 'start': positions[0], 'end': positions[2]}
+    
+    def _match_head_shoulders(self, positions, prices, kinds, current_price: float) -> Optional[Dict[str, Any]]:
+        """Head and shoulders (H-L-H-L-H) or inverse (L-H-L-H-L) on the last five pivots"""
+        if len(positions) < 5:
+            return None
+        positions, prices, kinds = positions[-5:], prices[-5:], kinds[-5:]
+        sign = kinds[0]
+        tolerance = self.params['peak_tolerance']
+        shoulder = max(prices[0] * sign, prices[4] * sign)
+        
+        # The head must clearly stand out beyond both (similar) shoulders
+        if not (prices[2] * sign > shoulder + abs(shoulder) * tolerance
+                and self._similar(prices[0], prices[4])):
+            return None
+        
+        # Neckline through the two inner pivots, projected to the right shoulder
+        slope = (prices[3] - prices[1]) / (positions[3] - positions[1])
+        neckline = prices[3] + slope * (positions[4] - positions[3])
+        breakout = self.params['breakout_pct']
+        
+        if sign == HIGH:
+            confirmed = current_price < neckline * (1 - breakout)
+            return {'name': 'Head and shoulders', 'bias': 'bearish',
+                    'status': 'confirmed' if confirmed else 'forming',
+                    'level': neckline, 'start': positions[0], 'end': positions[4]}
+        confirmed = current_price > neckline * (1 + breakout)
+        return {'name': 'Inverse head and shoulders', 'bias': 'bullish',
+                'status': 'confirmed' if confirmed else 'forming',
+                'level': neckline, 'start': positions[0], 'end': positions[4]}
+    
+    def _match_triangle(self, positions, prices, kinds, current_price: float) -> Optional[Dict[str, Any]]:
+        """Ascending, descending or symmetrical triangle from the last pivots"""
+        n = self.params['triangle_pivots']
+        positions, prices, kinds = positions[-n:], prices[-n:], kinds[-n:]
+        highs, lows = kinds == HIGH, kinds == LOW
+        if highs.sum() < 2 or lows.sum() < 2:
+            return None
+        
+        # Slopes normalized to fraction of price per bar
+        high_slope, high_icept = _linear_fit(positions[highs], prices[highs])
+        low_slope, low_icept = _linear_fit(positions[lows], prices[lows])
+        mean_price = prices.mean()
+        high_slope_n, low_slope_n = high_slope / mean_price, low_slope / mean_price
+        flat = self.params['flat_slope']
+        
+        if abs(high_slope_n) <= flat and low_slope_n > flat:
+            name, bias = 'Ascending triangle', 'bullish'
+        elif abs(low_slope_n) <= flat and high_slope_n < -flat:
+            name, bias = 'Descending triangle', 'bearish'
+        elif high_slope_n < -flat and low_slope_n > flat:
+            name, bias = 'Symmetrical triangle', 'neutral'
+        else:
+            return None
+        
+        end = positions[-1]
+        upper = high_slope * end + high_icept
+        lower = low_slope * end + low_icept
+        if upper <= lower:
+            return None
+        
+        status, level = 'forming', upper
+        if current_price > upper * (1 + self.params['breakout_pct']):
+            status, bias = 'broken out', 'bullish'
+        elif current_price < lower * (1 - self.params['breakout_pct']):
+            status, bias, level = 'broken down', 'bearish', lower
+        
+        return {'name': name, 'bias': bias, 'status': status, 'level': level,
+                'start': positions[0], 'end': end}
+    
+    def _match_breakout(self, positions, prices, kinds, closes: np.ndarray,
+                        min_end: int) -> Optional[Dict[str, Any]]:
+        """
+        Close beyond the most recent swing high (resistance) or swing low (support).
+        The current run of closes beyond the level must have started within
+        max_pattern_age bars; an old break that simply kept going is not reported.
+        """
+        current_price = closes[-1]
+        breakout = self.params['breakout_pct']
+        
+        for kind, sign, name, bias in ((HIGH, 1, 'Breakout above resistance', 'bullish'),
+                                       (LOW, -1, 'Breakdown below support', 'bearish')):
+            pivots = np.flatnonzero(kinds == kind)
+            if not len(pivots):
+                continue
+            position, level = positions[pivots[-1]], prices[pivots[-1]]
+            threshold = level * (1 + sign * breakout)
+            if current_price * sign <= threshold * sign:
+                continue
+            # NaN closes (no trade) compare False and do not end the run
+            inside = np.flatnonzero(closes[position + 1:] * sign <= threshold * sign)
+            start = position + 1 + (inside[-1] + 1 if len(inside) else 0)
+            if start < min_end:
+                return None
+            return {'name': name, 'bias': bias, 'status': 'confirmed', 'level': level,
+                    'start': position, 'end': start}
+        return None
+    
+    def _match_consolidation(self, positions, prices, kinds, closes: np.ndarray,
+                             min_end: int) -> Optional[Dict[str, Any]]:
+        """Tight trading range over the consolidation window (never reaching back past max_pattern_age)"""
+        start = max(len(closes) - self.params['consolidation_window'], min_end, 0)
+        window = closes[start:]
+        window = window[np.isfinite(window)]
+        if not len(window) or window.min() <= 0:
+            return None
+        price_range = (window.max() - window.min()) / window.min()
+        if price_range < self.params['consolidation_range']:
+            return {'name': 'Tight consolidation', 'bias': 'neutral',
+                    'status': 'forming', 'level': window.max(),
+                    'start': start, 'end': len(closes) - 1}
+        return None
+
+def describe_pattern(pattern: Dict[str, Any]) -> str:
+    """Human-readable one-line description of a detected pattern"""
+    text = f"{pattern['name']} ({pattern['bias']}, {pattern['status']}) - key level ${pattern['level']:.2f}"
+    if 'start' in pattern:
+        text += f" [{pd.Timestamp(pattern['start']):%Y-%m-%d} → {pd.Timestamp(pattern['end']):%Y-%m-%d}]"
+    return text
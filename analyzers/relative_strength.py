@@ -0,0 +1,146 @@
+"""
+Relative Strength Module - cross-sectional momentum ranking
+
+Trailing 1/3/6/12-month returns for every symbol of a universe, converted to
+percentile ranks against the rest of the universe. Only the last
+max(lookback) + 1 closes are kept, in a ring buffer, so each new daily bar
+updates returns and ranks without touching the full history.
+"""
+from typing import Dict, List, Mapping, Optional
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import config
+from utils.data_fetcher import get_fetcher
+
+def load_panel(symbols: List[str], period: Optional[str] = None) -> pd.DataFrame:
+    """
+    Fetch daily closes for a universe and align them on trading date.
+    Returns: DataFrame (dates x symbols); symbols without history are left out
+    """
+    params = config.RELATIVE_STRENGTH_PARAMS
+    period = period or params['history_period']
+    
+    def fetch(symbol: str):
+        return symbol, get_fetcher(symbol).get_historical_data(period=period)
+    
+    with ThreadPoolExecutor(max_workers=params['workers']) as pool:
+        histories = list(pool.map(fetch, symbols))
+    
+    closes = {}
+    for symbol, history in histories:
+        if history is None or history.empty or 'Close' not in history.columns:
+            continue
+        index = history.index.tz_localize(None) if history.index.tz is not None else history.index
+        closes[symbol] = pd.Series(history['Close'].to_numpy(dtype=float), index=index.normalize())
+    if not closes:
+        return pd.DataFrame()
+    return pd.concat(closes, axis=1).sort_index()
+
+class RelativeStrength:
+    """Trailing returns and cross-sectional percentile ranks, updated one bar at a time"""
+    
+    def __init__(self, panel: pd.DataFrame, lookbacks: Optional[Dict[str, int]] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            panel: Daily closes (dates x symbols); only the most recent rows are kept
+            lookbacks: Horizon name -> trading days (default RELATIVE_STRENGTH_PARAMS)
+            weights: Horizon name -> weight in the composite rank
+        """
+        params = config.RELATIVE_STRENGTH_PARAMS
+        self.lookbacks = dict(lookbacks or params['lookbacks'])
+        self.weights = dict(weights or params['composite_weights'])
+        self.symbols = list(panel.columns)
+        self._column = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._lags = np.array(list(self.lookbacks.values()))
+        
+        # Ring buffer of the last window closes; gaps carry the previous close forward
+        self._window = int(self._lags.max()) + 1
+        recent = panel.ffill().to_numpy(dtype=float)[-self._window:]
+        self._buffer = np.full((self._window, len(self.symbols)), np.nan)
+        self._buffer[:len(recent)] = recent
+        self._filled = len(recent)
+        self._head = self._filled - 1
+        self.last_date = panel.index[-1] if len(panel) else None
+        self._recompute()
+    
+    def update(self, bar: Mapping[str, float], date=None):
+        """
+        Append one daily bar.
+        Args:
+            bar: Symbol -> close for the new day; symbols that did not trade keep
+                 their previous close, symbols outside the universe are ignored
+            date: Date of the bar, kept for reporting
+        """
+        row = self._buffer[self._head].copy() if self._filled else np.full(len(self.symbols), np.nan)
+        for symbol, close in bar.items():
+            column = self._column.get(symbol)
+            if column is not None and close is not None and np.isfinite(close):
+                row[column] = close
+        
+        self._head = (self._head + 1) % self._window
+        self._buffer[self._head] = row
+        self._filled = min(self._filled + 1, self._window)
+        self.last_date = date if date is not None else self.last_date
+        self._recompute()
+    
+    def _recompute(self):
+        """Returns for every (symbol, horizon) from the ring buffer, then ranks in one pass"""
+        if self._filled == 0:
+            self.returns = pd.DataFrame(np.nan, index=self.symbols, columns=list(self.lookbacks))
+        else:
+            latest = self._buffer[self._head]
+            lagged = self._buffer[(self._head - self._lags) % self._window]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                returns = latest[None, :] / lagged - 1.0
+            # Horizons longer than the loaded history have no starting price
+            returns[self._lags >= self._filled] = np.nan
+            self.returns = pd.DataFrame(returns.T, index=self.symbols, columns=list(self.lookbacks))
+        
+        self.ranks = self.returns.rank(axis=0, pct=True) * 100
+        weights = pd.Series(self.weights).reindex(self.ranks.columns).fillna(0.0)
+        available = self.ranks.notna()
+        weighted = (self.ranks.fillna(0.0) * weights).sum(axis=1)
+        total = (available * weights).sum(axis=1)
+        self.composite = (weighted / total).where(total > 0)
+    
+    def table(self) -> pd.DataFrame:
+        """Returns (%), percentile ranks and composite rank, strongest first"""
+        table = pd.concat([
+            (self.returns * 100).add_suffix('_return'),
+            self.ranks.add_suffix('_rank'),
+            self.composite.rename('composite_rank')
+        ], axis=1)
+        return table.sort_values('composite_rank', ascending=False, na_position='last')
+    
+    def rank_of(self, symbol: str) -> Dict[str, float]:
+        """Percentile ranks (0-100) of one symbol per horizon plus the composite"""
+        symbol = symbol.upper()
+        if symbol not in self._column:
+            return {}
+        ranks = self.ranks.loc[symbol].to_dict()
+        ranks['composite'] = float(self.composite.loc[symbol])
+        return ranks
+
+def format_relative_strength(table: pd.DataFrame, top: int = 25) -> str:
+    """Plain-text ranking table"""
+    horizons = [c[:-len('_rank')] for c in table.columns if c.endswith('_rank') and c != 'composite_rank']
+    header = f"  {'#':>4}  {'Symbol':<10}{'Composite':>10}" + ''.join(f"{h:>16}" for h in horizons)
+    lines = [
+        "=" * 100,
+        "RELATIVE STRENGTH | 相对强度排名",
+        "=" * 100,
+        f"Universe | 股票池: {len(table)} symbols  (return % / percentile rank)",
+        "",
+        header,
+    ]
+    for position, (symbol, row) in enumerate(table.head(top).iterrows(), start=1):
+        cells = ''.join(
+            f" {row[h + '_return']:>+8.1f}% /{row[h + '_rank']:>4.0f}" if pd.notna(row[h + '_rank']) else f"{'N/A':>16}"
+            for h in horizons
+        )
+        composite = f"{row['composite_rank']:>10.1f}" if pd.notna(row['composite_rank']) else f"{'N/A':>10}"
+        lines.append(f"  {position:>4}  {symbol:<10}{composite}{cells}")
+    lines.append("=" * 100)
+    return "\n".join(lines)
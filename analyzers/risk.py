@@ -0,0 +1,166 @@
+"""
+Risk Metrics Module (feeds Question 20)
+
+Realized volatility, maximum drawdown, beta and historical/parametric
+VaR and CVaR, computed column-wise over a (dates x symbols) price panel so
+a single symbol and a whole universe take the same NumPy pass.
+"""
+from typing import Dict, Any, List, Optional, Tuple, Union
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+import config
+from utils.data_fetcher import get_fetcher
+
+TRADING_DAYS = 252
+
+METRIC_COLUMNS = ['volatility', 'max_drawdown', 'beta', 'var_historical', 'cvar_historical',
+                  'var_parametric', 'cvar_parametric', 'observations']
+
+def _as_panel(prices: Union[pd.Series, pd.DataFrame]) -> pd.DataFrame:
+    if isinstance(prices, pd.Series):
+        return prices.to_frame(prices.name or 'close')
+    return prices
+
+def _align_dates(index: pd.Index) -> pd.Index:
+    """Drop time zone and time of day so panels from different exchanges line up"""
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        return index.normalize()
+    return index
+
+def risk_metrics(prices: Union[pd.Series, pd.DataFrame], benchmark: Optional[pd.Series] = None,
+                 confidence: float = None) -> pd.DataFrame:
+    """
+    Risk metrics for every column of a price panel.
+    Args:
+        prices: Close prices, one column per symbol (a Series is treated as one symbol)
+        benchmark: Benchmark close prices for beta (aligned on date)
+        confidence: VaR/CVaR confidence level (default RISK_PARAMS['var_confidence'])
+    Returns: DataFrame indexed by symbol with METRIC_COLUMNS. VaR and CVaR are
+             positive one-day loss fractions; volatility is annualized; max_drawdown is negative.
+    """
+    confidence = confidence or config.RISK_PARAMS['var_confidence']
+    panel = _as_panel(prices).copy()
+    panel.index = _align_dates(panel.index)
+    if benchmark is not None:
+        benchmark = benchmark.copy()
+        benchmark.index = _align_dates(benchmark.index)
+        benchmark = benchmark[~benchmark.index.duplicated(keep='last')].reindex(panel.index)
+    
+    values = panel.to_numpy(dtype=float)
+    returns = values[1:] / values[:-1] - 1.0
+    present = np.isfinite(returns)
+    counts = present.sum(axis=0)
+    r = np.where(present, returns, 0.0)
+    # nanmin/nanquantile warn on all-NaN columns whatever np.errstate says, so those are skipped
+    priced = np.isfinite(values).any(axis=0)
+    traded = counts > 0
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = r.sum(axis=0) / counts
+        deviations = np.where(present, returns - mean, 0.0)
+        daily_std = np.where(counts > 1, np.sqrt((deviations ** 2).sum(axis=0) / (counts - 1)), np.nan)
+        
+        # Drawdown from the running peak; gaps carry the last price forward
+        filled = pd.DataFrame(values).ffill().to_numpy()
+        peaks = np.fmax.accumulate(np.where(np.isfinite(filled), filled, -np.inf), axis=0)
+        drawdowns = np.where(np.isfinite(filled), filled / peaks - 1.0, np.nan)
+        max_drawdown = np.full(values.shape[1], np.nan)
+        max_drawdown[priced] = np.nanmin(drawdowns[:, priced], axis=0)
+        
+        # Historical VaR/CVaR: loss at the (1 - confidence) quantile and the mean loss beyond it
+        alpha = 1.0 - confidence
+        quantile = np.full(values.shape[1], np.nan)
+        quantile[traded] = np.nanquantile(np.where(present, returns, np.nan)[:, traded], alpha, axis=0)
+        tail = present & (returns <= quantile)
+        var_historical = -quantile
+        cvar_historical = -(np.where(tail, returns, 0.0).sum(axis=0) / tail.sum(axis=0))
+        
+        # Parametric (normal) VaR/CVaR
+        z = NormalDist().inv_cdf(alpha)
+        var_parametric = -(mean + z * daily_std)
+        cvar_parametric = -(mean - daily_std * NormalDist().pdf(z) / alpha)
+        
+        beta = np.full(values.shape[1], np.nan)
+        if benchmark is not None:
+            bench = benchmark.to_numpy(dtype=float)
+            bench_returns = bench[1:] / bench[:-1] - 1.0
+            both = present & np.isfinite(bench_returns)[:, None]
+            n = both.sum(axis=0)
+            x = np.where(both, bench_returns[:, None], 0.0)
+            y = np.where(both, returns, 0.0)
+            x_mean, y_mean = x.sum(axis=0) / n, y.sum(axis=0) / n
+            covariance = ((x - x_mean) * (y - y_mean) * both).sum(axis=0) / (n - 1)
+            bench_variance = (((x - x_mean) ** 2) * both).sum(axis=0) / (n - 1)
+            beta = covariance / bench_variance
+    
+    return pd.DataFrame({
+        'volatility': daily_std * np.sqrt(TRADING_DAYS),
+        'max_drawdown': max_drawdown,
+        'beta': beta,
+        'var_historical': var_historical,
+        'cvar_historical': cvar_historical,
+        'var_parametric': var_parametric,
+        'cvar_parametric': cvar_parametric,
+        'observations': counts
+    }, index=panel.columns)
+
+def benchmark_history() -> Optional[pd.Series]:
+    """Close prices of the configured benchmark (shared, cached fetcher)"""
+    params = config.RISK_PARAMS
+    history = get_fetcher(params['benchmark']).get_historical_data(period=params['history_period'])
+    if history is None or history.empty or 'Close' not in history.columns:
+        return None
+    return history['Close']
+
+def risk_adjustment(metrics: Dict[str, Any]) -> Tuple[int, List[str]]:
+    """
+    Score adjustment and risk-factor notes for one symbol's metrics,
+    using the thresholds in RISK_PARAMS.
+    Returns: (score delta, list of notes)
+    """
+    params = config.RISK_PARAMS
+    if not metrics or metrics.get('observations', 0) < params['min_observations']:
+        return 0, []
+    
+    delta = 0
+    notes = []
+    volatility = metrics['volatility']
+    if volatility >= params['high_volatility']:
+        delta -= 10
+        notes.append(f"High volatility: {volatility:.0%} annualized")
+    elif volatility <= params['low_volatility']:
+        delta += 5
+    
+    drawdown = metrics['max_drawdown']
+    if drawdown <= params['severe_drawdown']:
+        delta -= 10
+        notes.append(f"Severe drawdown: {drawdown:.0%} from peak")
+    
+    beta = metrics['beta']
+    if np.isfinite(beta) and beta >= params['high_beta']:
+        delta -= 5
+        notes.append(f"High beta vs {params['benchmark']}: {beta:.2f}")
+    
+    cvar = metrics['cvar_historical']
+    if cvar >= params['high_cvar']:
+        delta -= 5
+        notes.append(f"Fat left tail: {cvar:.1%} expected loss on the worst "
+                     f"{1 - params['var_confidence']:.0%} of days")
+    return delta, notes
+
+def format_metrics(metrics: Dict[str, Any]) -> Dict[str, str]:
+    """Display strings for a report"""
+    if not metrics:
+        return {}
+    confidence = f"{config.RISK_PARAMS['var_confidence']:.0%}"
+    beta = metrics['beta']
+    return {
+        'volatility': f"{metrics['volatility']:.1%}",
+        'max_drawdown': f"{metrics['max_drawdown']:.1%}",
+        'beta': f"{beta:.2f}" if np.isfinite(beta) else "N/A",
+        f'var_{confidence}': f"{metrics['var_historical']:.2%} (historical), {metrics['var_parametric']:.2%} (parametric)",
+        f'cvar_{confidence}': f"{metrics['cvar_historical']:.2%} (historical), {metrics['cvar_parametric']:.2%} (parametric)"
+    }
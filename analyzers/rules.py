@@ -0,0 +1,149 @@
+"""
+Declarative Scoring Rules
+
+Score ladders from config.SCORING_RULES are compiled into vectorized
+evaluators (np.digitize for the ladder, masks for validity) that score
+a whole DataFrame of `info` rows at once. A single symbol is just a
+one-row frame.
+
+Rule spec:
+    field         info key, or a name in DERIVED_FIELDS
+    scale         multiplier applied to the raw value (e.g. 100 for ratios -> %)
+    fill          value used when the field is missing (default: leave missing)
+    valid         'positive' (value > 0), 'finite' or 'any' (default)
+    bins          ascending breakpoints
+    closed        'left'  -> bucket i is bins[i-1] <= x < bins[i]
+                  'right' -> bucket i is bins[i-1] <  x <= bins[i]
+    scores        one score per bucket (len(bins) + 1)
+    labels        one label per bucket; may use {value}
+    default_score / default_label   used where the rule is not valid
+    adjustments   list of specs with the same field/bins keys plus
+                  `deltas` (added to the score, clipped to 0-100 after each)
+                  and optional `notes` (appended to the label);
+                  `requires_base` limits an adjustment to rows where the base rule applied
+"""
+from typing import Dict, Any, Tuple, Callable
+import pandas as pd
+import numpy as np
+import config
+
+def _range_position(frame: pd.DataFrame) -> pd.Series:
+    """Current price position within the 52-week range, in percent"""
+    price = _numeric(frame, 'currentPrice')
+    high = _numeric(frame, 'fiftyTwoWeekHigh')
+    low = _numeric(frame, 'fiftyTwoWeekLow')
+    span = high - low
+    position = np.where(span > 0, (price - low) / span.where(span > 0) * 100, 50.0)
+    valid = (high > 0) & (low > 0) & (price > 0)
+    return pd.Series(np.where(valid, position, np.nan), index=frame.index)
+
+# Values computed from several info fields
+DERIVED_FIELDS: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    'range_position': _range_position,
+}
+
+def _numeric(frame: pd.DataFrame, column: str) -> pd.Series:
+    if column not in frame.columns:
+        return pd.Series(np.nan, index=frame.index)
+    return pd.to_numeric(frame[column], errors='coerce').astype(float)
+
+class CompiledRule:
+    """A scoring ladder plus adjustments, evaluated column-wise"""
+    
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.base = self._compile_ladder(spec, 'scores')
+        self.default_score = spec.get('default_score', 50)
+        self.default_label = spec.get('default_label', '')
+        self.labels = np.array(spec.get('labels', [''] * len(spec['scores'])), dtype=object)
+        self.adjustments = [self._compile_ladder(adj, 'deltas') for adj in spec.get('adjustments', [])]
+    
+    @staticmethod
+    def _compile_ladder(spec: Dict[str, Any], values_key: str) -> Dict[str, Any]:
+        bins = np.asarray(spec['bins'], dtype=float)
+        values = np.asarray(spec[values_key], dtype=float)
+        if len(values) != len(bins) + 1:
+            raise ValueError(f"Rule on '{spec['field']}' needs {len(bins) + 1} {values_key}, got {len(values)}")
+        return {
+            'field': spec['field'],
+            'scale': spec.get('scale', 1),
+            'fill': spec.get('fill'),
+            'valid': spec.get('valid', 'any'),
+            'bins': bins,
+            'right': spec.get('closed', 'left') == 'right',
+            'values': values,
+            'notes': np.array(spec.get('notes', [''] * len(values)), dtype=object),
+            'requires_base': spec.get('requires_base', False)
+        }
+    
+    @staticmethod
+    def _bucket(frame: pd.DataFrame, ladder: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns: (values, bucket index, validity mask)"""
+        field = ladder['field']
+        if field in DERIVED_FIELDS:
+            values = DERIVED_FIELDS[field](frame)
+        else:
+            values = _numeric(frame, field)
+        if ladder['fill'] is not None:
+            values = values.fillna(ladder['fill'])
+        values = values.to_numpy(dtype=float) * ladder['scale']
+        
+        finite = np.isfinite(values)
+        if ladder['valid'] == 'positive':
+            valid = finite & (values > 0)
+        elif ladder['valid'] == 'finite':
+            valid = finite
+        else:
+            valid = np.ones(len(values), dtype=bool)
+        buckets = np.digitize(np.where(finite, values, 0), ladder['bins'], right=ladder['right'])
+        return values, buckets, valid
+    
+    def evaluate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score every row of a frame of info dicts.
+        Returns: DataFrame with 'score', 'label' and 'value' columns
+        """
+        values, buckets, valid = self._bucket(frame, self.base)
+        scores = np.where(valid, self.base['values'][buckets], self.default_score)
+        labels = np.where(valid, self.labels[buckets], self.default_label)
+        
+        for adjustment in self.adjustments:
+            _, adj_buckets, adj_valid = self._bucket(frame, adjustment)
+            if adjustment['requires_base']:
+                adj_valid = adj_valid & valid
+            scores = np.clip(scores + np.where(adj_valid, adjustment['values'][adj_buckets], 0), 0, 100)
+            labels = labels + np.where(adj_valid, adjustment['notes'][adj_buckets], '')
+        
+        labels = [label.format(value=value) if '{' in label else label
+                  for label, value in zip(labels, values)]
+        return pd.DataFrame({'score': scores, 'label': labels, 'value': values}, index=frame.index)
+
+def compile_rules(rules: Dict[str, Dict[str, Any]] = None) -> Dict[str, CompiledRule]:
+    """Compile rule tables (default: config.SCORING_RULES)"""
+    rules = rules if rules is not None else config.SCORING_RULES
+    return {name: CompiledRule(name, spec) for name, spec in rules.items()}
+
+_compiled = compile_rules()
+
+def evaluate_rule(name: str, info: Dict[str, Any]) -> Tuple[float, str]:
+    """Score a single symbol's info dict with one rule. Returns: (score, label)"""
+    row = _compiled[name].evaluate(pd.DataFrame([info])).iloc[0]
+    score = float(row['score'])
+    # Ladder scores are whole numbers; keep them as ints for the report
+    return (int(score) if score.is_integer() else score), str(row['label'])
+
+def score_universe(infos: Dict[str, Dict[str, Any]], rules: Dict[str, CompiledRule] = None) -> pd.DataFrame:
+    """
+    Score every rule for every symbol in one pass.
+    Args:
+        infos: Mapping of symbol -> info dict (DataFetcher.get_stock_info)
+    Returns: DataFrame indexed by symbol with '<rule>_score' and '<rule>_label' columns
+    """
+    rules = rules or _compiled
+    frame = pd.DataFrame.from_dict(infos, orient='index')
+    columns = {}
+    for name, rule in rules.items():
+        result = rule.evaluate(frame)
+        columns[f'{name}_score'] = result['score']
+        columns[f'{name}_label'] = result['label']
+    return pd.DataFrame(columns, index=frame.index)
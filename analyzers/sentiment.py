@@ -1,18 +1,131 @@
 """
 Sentiment and News Analysis Module (Questions 17-20)
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from datetime import datetime, timedelta
+from utils.keyword_matcher import KeywordMatcher
+from utils.data_fetcher import get_fetcher
+import config
+from analyzers.risk import risk_metrics, benchmark_history, risk_adjustment, format_metrics
+
+# Keyword lexicons for headline tone (Q17, Q19) and risk events (Q20)
+HEADLINE_LEXICONS = {
+    'news_positive': ['beat', 'exceed', 'growth', 'profit', 'gain', 'rise', 'upgrade', 'buy', 'strong'],
+    'news_negative': ['miss', 'decline', 'loss', 'fall', 'downgrade', 'sell', 'weak', 'concern'],
+    'social_positive': ['bullish', 'optimistic', 'positive', 'confident', 'strong buy'],
+    'social_negative': ['bearish', 'pessimistic', 'negative', 'concerned', 'sell'],
+    'risk': ['investigation', 'lawsuit', 'regulatory', 'scandal', 'fraud', 'recall',
+             'bankruptcy', 'default', 'suspension', 'delisting', 'warning', 'violation']
+}
+
+# Forms of each keyword that count as a hit. Listed by hand: suffix rules also
+# produce non-words and nouns with another meaning ("missable", "buyers", "sellers")
+HEADLINE_INFLECTIONS = {
+    'beat': ['beats', 'beating'],
+    'exceed': ['exceeds', 'exceeded', 'exceeding'],
+    'profit': ['profits', 'profitable'],
+    'gain': ['gains', 'gained', 'gaining'],
+    'rise': ['rises', 'rose', 'risen', 'rising'],
+    'upgrade': ['upgrades', 'upgraded'],
+    'buy': ['buys'],
+    'strong': ['stronger', 'strongest'],
+    'miss': ['misses', 'missed'],
+    'decline': ['declines', 'declined', 'declining'],
+    'loss': ['losses'],
+    'fall': ['falls', 'fell', 'falling', 'fallen'],
+    'downgrade': ['downgrades', 'downgraded'],
+    'sell': ['sells'],
+    'weak': ['weaker', 'weakest', 'weakness', 'weakened', 'weakening'],
+    'concern': ['concerns', 'concerned', 'concerning'],
+    'investigation': ['investigations'],
+    'lawsuit': ['lawsuits'],
+    'scandal': ['scandals'],
+    'recall': ['recalls', 'recalled'],
+    'default': ['defaults', 'defaulted'],
+    'suspension': ['suspensions'],
+    'warning': ['warnings'],
+    'violation': ['violations'],
+}
+
+# Number of most recent headlines each question looks at
+NEWS_HEADLINES = 5
+SOCIAL_HEADLINES = 10
+RISK_HEADLINES = 10
+
+_headline_matcher = KeywordMatcher(HEADLINE_LEXICONS, HEADLINE_INFLECTIONS)
+
+def scan_headlines(news_by_symbol: Dict[str, list]) -> Dict[str, Dict[str, Any]]:
+    """
+    Keyword-score the headlines of many symbols in one matcher pass.
+    Produces the headline inputs of Q17, Q19 and Q20 together.
+    Args:
+        news_by_symbol: Mapping of symbol -> news items (as returned by DataFetcher.get_news)
+    Returns: Mapping of symbol -> distinct keyword counts per lexicon and risk headlines
+    """
+    depth = max(NEWS_HEADLINES, SOCIAL_HEADLINES, RISK_HEADLINES)
+    titles, owners = [], []
+    for symbol, news in news_by_symbol.items():
+        for item in (news or [])[:depth]:
+            titles.append(item.get('title', ''))
+            owners.append(symbol)
+    
+    hits = _headline_matcher.match_many(titles)
+    
+    per_symbol = {symbol: [] for symbol in news_by_symbol}
+    for symbol, title, keywords in zip(owners, titles, hits):
+        per_symbol[symbol].append((title, keywords))
+    
+    results = {}
+    for symbol, headlines in per_symbol.items():
+        news_hits = set().union(*(kw for _, kw in headlines[:NEWS_HEADLINES]))
+        social_hits = set().union(*(kw for _, kw in headlines[:SOCIAL_HEADLINES]))
+        results[symbol] = {
+            'news_positive': len(_headline_matcher.lexicon_hits(news_hits, 'news_positive')),
+            'news_negative': len(_headline_matcher.lexicon_hits(news_hits, 'news_negative')),
+            'social_positive': len(_headline_matcher.lexicon_hits(social_hits, 'social_positive')),
+            'social_negative': len(_headline_matcher.lexicon_hits(social_hits, 'social_negative')),
+            'risk_headlines': [title for title, kw in headlines[:RISK_HEADLINES]
+                               if _headline_matcher.lexicon_hits(kw, 'risk')]
+        }
+    return results
+
+def load_headline_scans(symbols: List[str], workers: int = None) -> Dict[str, Dict[str, Any]]:
+    """Batch path: fetch many symbols' news through the shared fetchers and scan it in one pass"""
+    def fetch(symbol: str):
+        return symbol, get_fetcher(symbol).get_news()
+    
+    with ThreadPoolExecutor(max_workers=workers or config.SUMMARY_PARAMS['workers']) as pool:
+        return scan_headlines(dict(pool.map(fetch, symbols)))
 
 class SentimentAnalyzer:
     """Analyze market sentiment and news about a stock"""
     
-    def __init__(self, data_fetcher):
+    def __init__(self, data_fetcher, headline_scan: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            headline_scan: This symbol's entry of a batch scan_headlines() run over
+                           the same news; scanned here when not given
+        """
         self.fetcher = data_fetcher
         self.info = data_fetcher.get_stock_info()
         self.news = data_fetcher.get_news()
         self.recommendations = data_fetcher.get_recommendations()
+        self.headline_scan = headline_scan or scan_headlines({data_fetcher.symbol: self.news})[data_fetcher.symbol]
+        self.market_risk = self._market_risk()
+    
+    def _market_risk(self) -> Dict[str, Any]:
+        """Price-based risk metrics for Q20 (empty when there is no usable history)"""
+        history = self.fetcher.get_historical_data(period=config.RISK_PARAMS['history_period'])
+        if history is None or history.empty or 'Close' not in history.columns:
+            return {}
+        try:
+            metrics = risk_metrics(history['Close'], benchmark_history())
+        except Exception as e:
+            print(f"Error computing risk metrics: {e}")
+            return {}
+        return metrics.iloc[0].to_dict()
     
     def analyze_news(self) -> Dict[str, Any]:
         """
@@ -44,14 +157,9 @@ class SentimentAnalyzer:
                 })
                 news_summary.append(f"[{pub_date}] {title}")
             
-            # Simple sentiment analysis based on keywords
-            positive_keywords = ['beat', 'exceed', 'growth', 'profit', 'gain', 'rise', 'upgrade', 'buy', 'strong']
-            negative_keywords = ['miss', 'decline', 'loss', 'fall', 'downgrade', 'sell', 'weak', 'concern']
-            
-            all_titles = ' '.join([item.get('title', '').lower() for item in self.news[:5]])
-            
-            positive_count = sum(1 for word in positive_keywords if word in all_titles)
-            negative_count = sum(1 for word in negative_keywords if word in all_titles)
+            # Keyword sentiment of the top headlines
+            positive_count = self.headline_scan['news_positive']
+            negative_count = self.headline_scan['news_negative']
             
             if positive_count > negative_count:
                 score = 70
@@ -165,13 +273,8 @@ class SentimentAnalyzer:
         
         # Use news sentiment as proxy for social sentiment
         if self.news and len(self.news) > 0:
-            positive_keywords = ['bullish', 'optimistic', 'positive', 'confident', 'strong buy']
-            negative_keywords = ['bearish', 'pessimistic', 'negative', 'concerned', 'sell']
-            
-            all_text = ' '.join([item.get('title', '').lower() for item in self.news[:10]])
-            
-            positive_count = sum(1 for word in positive_keywords if word in all_text)
-            negative_count = sum(1 for word in negative_keywords if word in all_text)
+            positive_count = self.headline_scan['social_positive']
+            negative_count = self.headline_scan['social_negative']
             
             if positive_count > negative_count:
                 score = 65
@@ -203,17 +306,9 @@ class SentimentAnalyzer:
         risk_factors = []
         
         # Check for risk-related keywords in news
-        if self.news and len(self.news) > 0:
-            risk_keywords = ['investigation', 'lawsuit', 'regulatory', 'scandal', 'fraud', 'recall', 
-                           'bankruptcy', 'default', 'suspension', 'delisting', 'warning', 'violation']
-            
-            for item in self.news[:10]:
-                title = item.get('title', '').lower()
-                for keyword in risk_keywords:
-                    if keyword in title:
-                        risk_factors.append(f"⚠️ {item.get('title', 'Risk event detected')}")
-                        score = max(0, score - 15)
-                        break
+        for title in self.headline_scan['risk_headlines']:
+            risk_factors.append(f"⚠️ {title or 'Risk event detected'}")
+            score = max(0, score - 15)
         
         # Check company risk from info
         audit_risk = self.info.get('auditRisk', 0)
@@ -232,6 +327,11 @@ class SentimentAnalyzer:
             risk_factors.append("No significant risk events detected in recent news")
             score = 60
         
+        # Realized volatility, drawdown, beta and tail loss from price history
+        delta, market_factors = risk_adjustment(self.market_risk)
+        risk_factors.extend(f"⚠️ {note}" for note in market_factors)
+        score = max(0, min(100, score + delta))
+        
         assessment = "High risk" if score < 40 else "Moderate risk" if score < 55 else "Low risk"
         
         return {
@@ -240,8 +340,9 @@ class SentimentAnalyzer:
             'answer': {
                 'risk_factors': risk_factors,
                 'overall_risk_score': f"{overall_risk}/10" if overall_risk else "N/A",
+                'market_risk': format_metrics(self.market_risk) or "N/A",
                 'assessment': assessment,
-                'note': 'Risk assessment based on news analysis and company risk metrics'
+                'note': 'Risk assessment based on news analysis, company risk metrics and price-based risk metrics'
             },
             'score': score
         }
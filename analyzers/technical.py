@@ -7,6 +7,7 @@ import numpy as np
 from ta.trend import MACD, SMAIndicator, EMAIndicator
 from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.volume import OnBalanceVolumeIndicator
+from analyzers.patterns import PatternDetector, describe_pattern
 import config
 
 class TechnicalAnalyzer:
@@ -16,6 +17,7 @@ class TechnicalAnalyzer:
         self.fetcher = data_fetcher
         self.info = data_fetcher.get_stock_info()
         self.history = data_fetcher.get_historical_data(period="1y")
+        self.pattern_detector = PatternDetector()
     
     def analyze_price_trend(self) -> Dict[str, Any]:
         """
@@ -168,38 +170,17 @@ class TechnicalAnalyzer:
         patterns = []
         
         if self.history is not None and not self.history.empty and len(self.history) > 60:
-            close_prices = self.history['Close'].tail(60)
-            high_prices = self.history['High'].tail(60)
-            low_prices = self.history['Low'].tail(60)
-            
-            # Simple pattern detection (basic implementation)
-            current_price = close_prices.iloc[-1]
-            max_price = high_prices.max()
-            min_price = low_prices.min()
-            
-            # Check for double bottom (simplified)
-            recent_lows = low_prices.tail(30)
-            if len(recent_lows) > 10:
-                lowest_points = recent_lows.nsmallest(3)
-                if len(lowest_points) >= 2:
-                    if abs(lowest_points.iloc[0] - lowest_points.iloc[1]) / lowest_points.iloc[0] < 0.02:
-                        patterns.append("Potential double bottom pattern (bullish)")
-                        score += 15
-            
-            # Check for breakout
-            sma_20 = close_prices.rolling(window=20).mean().iloc[-1]
-            if current_price > sma_20 * 1.05:
-                patterns.append("Price breaking above 20-day MA (bullish)")
-                score += 10
-            elif current_price < sma_20 * 0.95:
-                patterns.append("Price breaking below 20-day MA (bearish)")
-                score -= 10
-            
-            # Check for consolidation
-            price_range = (max_price - min_price) / min_price * 100
-            if price_range < 10:
-                patterns.append("Tight consolidation - potential breakout setup")
-                score += 5
+            detected = self.pattern_detector.detect(self.history)
+            
+            for pattern in detected:
+                patterns.append(describe_pattern(pattern))
+                
+                # Confirmed patterns carry more weight than ones still forming
+                weight = 15 if pattern['status'] != 'forming' else 8
+                if pattern['bias'] == 'bullish':
+                    score += weight
+                elif pattern['bias'] == 'bearish':
+                    score -= weight
             
             if not patterns:
                 patterns.append("No significant patterns detected")
@@ -211,7 +192,7 @@ class TechnicalAnalyzer:
                 'question_zh': '有没有形成重要的技术形态？如双底、头肩顶？',
                 'answer': {
                     'patterns': patterns,
-                    'note': 'Pattern detection is simplified - manual chart review recommended'
+                    'note': f"Swing-point pattern detection over {len(self.history)} bars"
                 },
                 'score': score
             }
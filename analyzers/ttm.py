@@ -0,0 +1,130 @@
+"""
+Trailing-Twelve-Month Fundamentals Engine (feeds Questions 2, 3 and 5)
+
+TTM sums, margins and quarter-over-quarter / year-over-year growth from the
+quarterly statements, computed with grouped shifts over the long-format
+statement table so one symbol and a whole batch take the same path.
+"""
+from typing import Dict, Any, List, Optional
+import numpy as np
+import pandas as pd
+from utils.statement_store import line_items, normalize_financials, statement_store
+
+# Quarterly flow line items summed over four quarters
+FLOW_ITEMS = {
+    'income': {'Total Revenue': 'revenue', 'Gross Profit': 'gross_profit',
+               'Operating Income': 'operating_income', 'Net Income': 'net_income'},
+    'cashflow': {'Operating Cash Flow': 'operating_cashflow', 'Capital Expenditure': 'capital_expenditure',
+                 'Free Cash Flow': 'free_cashflow'},
+}
+
+# Days spanned by n consecutive quarter ends lie within n * this range
+QUARTER_DAYS = (80, 100)
+
+def quarterly_flows(long: pd.DataFrame) -> pd.DataFrame:
+    """Quarterly flow items per (symbol, period_end), oldest quarter first"""
+    parts = []
+    for statement, items in FLOW_ITEMS.items():
+        wide = line_items(long, list(items), statement, 'quarterly')
+        parts.append(wide.rename(columns=items))
+    flows = pd.concat(parts, axis=1).sort_index()
+    # Statements without a Free Cash Flow line: operating cash flow plus (negative) capex
+    flows['free_cashflow'] = flows['free_cashflow'].fillna(flows['operating_cashflow'] + flows['capital_expenditure'])
+    return flows
+
+def _growth(current: pd.Series, previous: pd.Series) -> pd.Series:
+    """Percent change against the absolute base, so a smaller loss counts as growth"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth = (current - previous) / previous.abs() * 100
+    return growth.replace([np.inf, -np.inf], np.nan)
+
+def ttm_frame(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    TTM values, margins and growth for every (symbol, quarter).
+    A TTM value needs four consecutive quarters; growth needs the matching
+    earlier quarter (one back for QoQ, four back for YoY, found by date so
+    a gap in between does not matter), otherwise NaN.
+    """
+    flows = quarterly_flows(long)
+    if flows.empty:
+        return flows
+    
+    grouped = flows.groupby(level='symbol', observed=True)
+    period_end = pd.Series(flows.index.get_level_values('period_end'), index=flows.index)
+    period_groups = period_end.groupby(level='symbol', observed=True)
+    
+    def spans(lag: int, quarters: Optional[int] = None) -> pd.Series:
+        """Whether the quarter `lag` rows back is exactly `quarters` (default: `lag`) quarters earlier"""
+        quarters = quarters or lag
+        days = (period_end - period_groups.shift(lag)).dt.days
+        return days.between(quarters * QUARTER_DAYS[0], quarters * QUARTER_DAYS[1])
+    
+    shifted = [grouped.shift(lag) for lag in range(1, 8)]
+    
+    def quarters_back(quarters: int) -> pd.DataFrame:
+        """Flows of the quarter exactly `quarters` earlier; with missing quarters it is fewer rows back"""
+        found = shifted[quarters - 1].where(spans(quarters), axis=0)
+        for lag in range(quarters - 1, 0, -1):
+            found = found.combine_first(shifted[lag - 1].where(spans(lag, quarters), axis=0))
+        return found
+    
+    ttm = (flows + shifted[0] + shifted[1] + shifted[2]).where(spans(3), axis=0)
+    ttm_year_ago = (shifted[3] + shifted[4] + shifted[5] + shifted[6]).where(spans(7), axis=0)
+    quarter_ago = quarters_back(1)
+    year_ago = quarters_back(4)
+    
+    result = ttm.add_prefix('ttm_')
+    result.columns.name = None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result['ttm_gross_margin'] = ttm['gross_profit'] / ttm['revenue'] * 100
+        result['ttm_operating_margin'] = ttm['operating_income'] / ttm['revenue'] * 100
+        result['ttm_net_margin'] = ttm['net_income'] / ttm['revenue'] * 100
+        result['ttm_fcf_margin'] = ttm['free_cashflow'] / ttm['revenue'] * 100
+    
+    for item in ('revenue', 'net_income', 'free_cashflow'):
+        result[f'{item}_qoq'] = _growth(flows[item], quarter_ago[item])
+        result[f'{item}_yoy'] = _growth(flows[item], year_ago[item])
+        result[f'ttm_{item}_yoy'] = _growth(ttm[item], ttm_year_ago[item])
+    result['quarter_revenue'] = flows['revenue']
+    return result.replace([np.inf, -np.inf], np.nan)
+
+def ttm_fundamentals(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Latest-quarter TTM fundamentals per symbol.
+    Returns: DataFrame indexed by symbol (see ttm_frame for columns) plus
+             latest_quarter and the number of quarters available
+    """
+    frame = ttm_frame(long)
+    if frame.empty:
+        return pd.DataFrame(index=pd.Index([], name='symbol'))
+    latest = frame.groupby(level='symbol', observed=True).tail(1)
+    quarters = frame.groupby(level='symbol', observed=True).size()
+    latest = latest.reset_index(level='period_end').rename(columns={'period_end': 'latest_quarter'})
+    latest.index = latest.index.astype(str)
+    latest['quarters'] = quarters.reindex(latest.index.astype(object)).to_numpy()
+    return latest
+
+def ttm_for_symbol(long: pd.DataFrame, symbol: str) -> Dict[str, Any]:
+    """One symbol's latest TTM fundamentals as a dict (empty without quarterly statements)"""
+    table = ttm_fundamentals(long)
+    if symbol.upper() not in table.index:
+        return {}
+    return table.loc[symbol.upper()].to_dict()
+
+def load_ttm(symbols: Optional[List[str]] = None) -> pd.DataFrame:
+    """Batch path: latest TTM fundamentals for stored symbols (default: all) from the statement store"""
+    if statement_store is None:
+        return ttm_fundamentals(normalize_financials('', {}))
+    return ttm_fundamentals(statement_store.load(symbols))
+
+def _present(value: Any) -> bool:
+    return value is not None and pd.notna(value)
+
+def format_growth(value: Any) -> str:
+    return f"{value:+.2f}%" if _present(value) else "N/A"
+
+def format_percent(value: Any) -> str:
+    return f"{value:.2f}%" if _present(value) else "N/A"
+
+def format_dollars(value: Any) -> str:
+    return f"${value:,.0f}" if _present(value) else "N/A"
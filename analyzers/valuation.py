@@ -5,6 +5,7 @@ from typing import Dict, Any, List
 import pandas as pd
 import numpy as np
 import config
+from analyzers.rules import evaluate_rule
 
 class ValuationAnalyzer:
     """Analyze valuation metrics of a stock"""
@@ -25,30 +26,8 @@ class ValuationAnalyzer:
         # Industry averages (approximate - would need external data for exact values)
         sector = self.info.get('sector', 'Unknown')
         
-        score = 50
-        assessment = "Fair valuation"
-        
-        # Score based on P/E ratio
-        if pe_ratio > 0:
-            if pe_ratio < 15:
-                score = 80
-                assessment = "Undervalued based on P/E"
-            elif pe_ratio < 25:
-                score = 60
-                assessment = "Fairly valued"
-            elif pe_ratio < 40:
-                score = 40
-                assessment = "Moderately overvalued"
-            else:
-                score = 25
-                assessment = "Highly overvalued"
-        
-        # Adjust for P/B ratio
-        if pb_ratio > 0:
-            if pb_ratio < 1:
-                score = min(100, score + 15)
-            elif pb_ratio > 5:
-                score = max(0, score - 10)
+        # P/E ladder adjusted for P/B (config.SCORING_RULES['pe_pb'])
+        score, assessment = evaluate_rule('pe_pb', self.info)
         
         return {
             'question_en': 'How do P/E and P/B ratios compare to industry average?',
@@ -72,26 +51,7 @@ class ValuationAnalyzer:
         fifty_two_week_high = self.info.get('fiftyTwoWeekHigh', 0)
         fifty_two_week_low = self.info.get('fiftyTwoWeekLow', 0)
         
-        score = 50
-        position = "Mid-range"
-        
-        if fifty_two_week_high > 0 and fifty_two_week_low > 0 and current_price > 0:
-            # Calculate position in 52-week range
-            range_span = fifty_two_week_high - fifty_two_week_low
-            position_pct = ((current_price - fifty_two_week_low) / range_span * 100) if range_span > 0 else 50
-            
-            if position_pct < 25:
-                score = 85
-                position = f"Near 52-week low ({position_pct:.1f}% of range) - Potentially undervalued"
-            elif position_pct < 50:
-                score = 65
-                position = f"Below mid-range ({position_pct:.1f}% of range) - Fair value"
-            elif position_pct < 75:
-                score = 45
-                position = f"Above mid-range ({position_pct:.1f}% of range) - Elevated"
-            else:
-                score = 25
-                position = f"Near 52-week high ({position_pct:.1f}% of range) - Potentially overvalued"
+        score, position = evaluate_rule('range_position', self.info)
         
         return {
             'question_en': 'Is it historically overvalued or undervalued? Where in historical range?',
@@ -117,27 +77,8 @@ class ValuationAnalyzer:
         
         ev_ebitda = (enterprise_value / ebitda) if ebitda and ebitda > 0 else 0
         
-        score = 50
-        assessment = "Average valuation metrics"
-        
-        # Score based on P/S ratio
-        if ps_ratio > 0:
-            if ps_ratio < 2:
-                score = 75
-                assessment = "Attractive P/S ratio"
-            elif ps_ratio < 5:
-                score = 55
-                assessment = "Moderate P/S ratio"
-            else:
-                score = 35
-                assessment = "High P/S ratio"
-        
-        # Adjust for PEG ratio (P/E to growth)
-        if peg_ratio > 0:
-            if peg_ratio < 1:
-                score = min(100, score + 15)
-            elif peg_ratio > 2:
-                score = max(0, score - 10)
+        # P/S ladder adjusted for PEG (config.SCORING_RULES['peer_valuation'])
+        score, assessment = evaluate_rule('peer_valuation', self.info)
         
         return {
             'question_en': 'How do P/S, P/CF ratios rank among peers?',
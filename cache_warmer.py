@@ -0,0 +1,219 @@
+"""
+Cache Warmer - resumable prefetch of a universe's datasets into the disk caches
+"""
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import argparse
+import json
+import os
+import threading
+import time
+import config
+from watchlist_daemon import load_watchlist
+from utils.data_fetcher import DataFetcher
+from colorama import init, Fore, Style
+
+# Dataset classes backed by a disk store: name -> (DataFetcher cache key getter, loader)
+WARM_DATASETS: Dict[str, Tuple[Callable[[], str], Callable[[DataFetcher], Any]]] = {
+    'history': (lambda: f"history_{config.WARM_PARAMS['history_period']}",
+                lambda f: f.get_historical_data(period=config.WARM_PARAMS['history_period'])),
+    'financials': (lambda: 'financials', lambda f: f.get_financials()),
+    'earnings': (lambda: 'earnings', lambda f: f.get_earnings()),
+    'news': (lambda: 'news', lambda f: f.get_news()),
+}
+
+# Datasets the analyses also read that have no disk store: they live only in the in-memory
+# cache of the process that fetched them, so warming cannot carry them over to a later run
+UNWARMED_DATASETS = ('info', 'dividends', 'recommendations', 'holders')
+
+class WarmCheckpoint:
+    """
+    Completed (symbol, dataset) pairs, appended as JSON lines as they finish
+    so an interrupted run resumes where it stopped. Pairs older than
+    checkpoint_hours count as not done, so the next night fetches again.
+    """
+    
+    def __init__(self, path: str, max_age_hours: float = None):
+        self.path = path
+        max_age = (max_age_hours or config.WARM_PARAMS['checkpoint_hours']) * 3600
+        self._done = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by an interrupted write
+                    if time.time() - item.get('at', 0) < max_age:
+                        self._done.add((item['symbol'], item['dataset']))
+    
+    def done(self, symbol: str, dataset: str) -> bool:
+        return (symbol, dataset) in self._done
+    
+    def mark(self, symbol: str, dataset: str):
+        with self._lock:
+            self._done.add((symbol, dataset))
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'symbol': symbol, 'dataset': dataset, 'at': time.time()}) + "\n")
+    
+    def reset(self):
+        with self._lock:
+            self._done.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+def default_checkpoint_path(universe_path: str) -> str:
+    name = os.path.splitext(os.path.basename(universe_path))[0]
+    return os.path.join(config.CACHE_DIR, 'warm', f"{name}.checkpoint.jsonl")
+
+class CacheWarmer:
+    """Prefetch (symbol, dataset) pairs with bounded concurrency, skipping checkpointed pairs"""
+    
+    def __init__(self, plan: Dict[str, List[str]], checkpoint: WarmCheckpoint, workers: int = None):
+        """
+        Args:
+            plan: Symbol -> dataset classes to warm for it
+        """
+        self.plan = plan
+        self.checkpoint = checkpoint
+        self.workers = workers or config.WARM_PARAMS['workers']
+        self.pending = {symbol: [d for d in datasets if not checkpoint.done(symbol, d)]
+                        for symbol, datasets in plan.items()}
+        self.pending = {symbol: todo for symbol, todo in self.pending.items() if todo}
+        self.total = sum(len(todo) for todo in self.pending.values())
+        self.skipped = sum(len(datasets) for datasets in plan.values()) - self.total
+        self.completed = 0
+        self.failures: List[Tuple[str, str, str]] = []
+        self.started = time.time()
+        self._last_progress = 0.0
+        self._lock = threading.Lock()
+    
+    def _warm_symbol(self, symbol: str):
+        """Fetch one symbol's pending datasets; each success is checkpointed immediately"""
+        fetcher = DataFetcher(symbol)
+        try:
+            for dataset in self.pending[symbol]:
+                key, loader = WARM_DATASETS[dataset]
+                loader(fetcher)
+                error = fetcher.errors.get(key())
+                if error is None:
+                    self.checkpoint.mark(symbol, dataset)
+                self._record(symbol, dataset, error)
+        finally:
+            # The data now lives in the disk stores; do not hold it in memory too
+            fetcher.clear_cache()
+    
+    def _record(self, symbol: str, dataset: str, error: Optional[str]):
+        with self._lock:
+            self.completed += 1
+            if error is not None:
+                self.failures.append((symbol, dataset, error))
+            now = time.time()
+            if now - self._last_progress >= config.WARM_PARAMS['progress_seconds'] or self.completed == self.total:
+                self._last_progress = now
+                print(self.progress_line())
+    
+    def progress_line(self) -> str:
+        elapsed = max(time.time() - self.started, 1e-9)
+        rate = self.completed / elapsed
+        remaining = (self.total - self.completed) / rate if rate > 0 else float('inf')
+        eta = f"{int(remaining // 60)}m{int(remaining % 60):02d}s" if remaining != float('inf') else "--"
+        percent = self.completed / self.total if self.total else 1.0
+        return (f"  {self.completed}/{self.total} pairs ({percent:.1%})  {rate:.1f} pairs/s  "
+                f"ETA {eta}  failed {len(self.failures)}")
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Warm every pending pair.
+        Returns: Counts of fetched, failed and skipped (already checkpointed) pairs and the elapsed time
+        """
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = {pool.submit(self._warm_symbol, symbol): symbol for symbol in self.pending}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error warming {futures[future]}: {e}")
+        except KeyboardInterrupt:
+            # Pairs finished so far are already checkpointed
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+        return {
+            'fetched': self.completed - len(self.failures),
+            'failed': len(self.failures),
+            'skipped': self.skipped,
+            'elapsed': time.time() - self.started,
+        }
+
+def run_warm(args):
+    """Prefetch a universe's datasets into the disk caches, resuming from the checkpoint"""
+    if not config.CACHE_ENABLED:
+        print(f"{Fore.RED}Error: CACHE_ENABLED is off, so there are no disk caches to warm.{Style.RESET_ALL}")
+        return
+    plan = {symbol: list(args.datasets) for symbol in load_watchlist(args.universe)}
+    if 'history' in args.datasets and config.RISK_PARAMS['benchmark'] not in plan:
+        # Every analysis reads the benchmark history for beta; its other datasets are never read
+        plan[config.RISK_PARAMS['benchmark']] = ['history']
+    
+    checkpoint = WarmCheckpoint(args.checkpoint or default_checkpoint_path(args.universe))
+    if args.restart:
+        checkpoint.reset()
+    warmer = CacheWarmer(plan, checkpoint, workers=args.workers)
+    print(f"{Fore.GREEN}Warming {', '.join(args.datasets)} for {len(plan)} symbols: "
+          f"{warmer.total} pairs to fetch, {warmer.skipped} already done{Style.RESET_ALL}")
+    print(f"{Fore.YELLOW}Not warmed (no disk store; fetched by each analysis): "
+          f"{', '.join(UNWARMED_DATASETS)}{Style.RESET_ALL}")
+    
+    try:
+        result = warmer.run()
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Interrupted after {warmer.completed} pairs; "
+              f"run again to resume from {checkpoint.path}{Style.RESET_ALL}")
+        return
+    
+    rate = result['fetched'] / result['elapsed'] if result['elapsed'] > 0 else 0.0
+    print(f"{Fore.GREEN}Done: {result['fetched']} fetched, {result['failed']} failed, "
+          f"{result['skipped']} skipped in {result['elapsed']:.0f}s ({rate:.1f} pairs/s){Style.RESET_ALL}")
+    for symbol, dataset, error in warmer.failures[:10]:
+        print(f"{Fore.RED}  {symbol} {dataset}: {error}{Style.RESET_ALL}")
+
+def parse_datasets(value: str) -> List[str]:
+    datasets = [d.strip().lower() for d in value.split(',') if d.strip()]
+    unknown = [d for d in datasets if d not in WARM_DATASETS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown dataset class {', '.join(unknown)} (choose from {', '.join(WARM_DATASETS)})")
+    return datasets
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Prefetch datasets into the StockWise disk caches')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    warm = commands.add_parser('warm', help='Prefetch a universe, resuming an interrupted run')
+    warm.add_argument('universe', help='Universe file (watchlist format: one symbol per line)')
+    warm.add_argument(
+        '--datasets',
+        type=parse_datasets,
+        default=list(config.WARM_PARAMS['datasets']),
+        help=f"Comma-separated dataset classes ({', '.join(WARM_DATASETS)}; "
+             f"default: {','.join(config.WARM_PARAMS['datasets'])})"
+    )
+    warm.add_argument('--workers', type=int, help='Symbols prefetched concurrently')
+    warm.add_argument('--checkpoint', type=str, help='Checkpoint file (default: CACHE_DIR/warm/<universe>.checkpoint.jsonl)')
+    warm.add_argument('--restart', action='store_true', help='Ignore the checkpoint and fetch everything again')
+    warm.set_defaults(handler=run_warm)
+    return parser
+
+def main(argv: Optional[List[str]] = None):
+    init()
+    args = build_parser().parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
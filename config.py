@@ -36,21 +36,229 @@ TECHNICAL_PARAMS = {
     'ma_long': 200,      # 200-day moving average
 }
 
+# Chart Pattern Detection Parameters
+PATTERN_PARAMS = {
+    'swing_order': 5,             # Bars on each side a swing high/low must dominate
+    'min_swing_pct': 0.03,        # Minimum zigzag leg size (3%)
+    'peak_tolerance': 0.03,       # Max difference between matching peaks/troughs (3%)
+    'breakout_pct': 0.02,         # Close beyond a level by 2% to confirm a break
+    'flat_slope': 0.001,          # Trendline slope (fraction of price per bar) treated as flat
+    'triangle_pivots': 6,         # Pivots used to fit triangle trendlines
+    'max_pattern_age': 60,        # Only match swings within the last 60 bars
+    'consolidation_window': 60,   # Bars checked for a tight trading range
+    'consolidation_range': 0.10,  # Range below 10% counts as tight consolidation
+}
+
 # Valuation Parameters
 VALUATION_PARAMS = {
-    'pe_high': 30,       # High P/E threshold
+    'pe_high': 40,       # High P/E threshold
+    'pe_fair': 25,       # Upper end of a fair P/E
     'pe_low': 15,        # Low P/E threshold
     'pb_high': 5,        # High P/B threshold
     'pb_low': 1,         # Low P/B threshold
 }
 
+# Scoring Rule Tables (compiled by analyzers/rules.py)
+# closed='left': bucket i covers bins[i-1] <= x < bins[i]; 'right': bins[i-1] < x <= bins[i]
+# An adjustment strict at both ends ("< low" / "> high") is written as two one-bin ladders
+SCORING_RULES = {
+    # Q3: YoY revenue growth (%)
+    'revenue_growth': {
+        'field': 'revenueGrowth', 'scale': 100, 'fill': 0,
+        'bins': [-5, 0, 10, 20], 'closed': 'right',
+        'scores': [25, 40, 55, 70, 85],
+        'labels': ['Declining', 'Stagnant', 'Modest growth', 'Healthy growth', 'Strong growth'],
+    },
+    # Q4: leverage, adjusted for liquidity
+    'balance_sheet': {
+        'field': 'debtToEquity', 'fill': 0,
+        'bins': [50, 100, 200], 'closed': 'left',
+        'scores': [85, 65, 45, 25],
+        'labels': ['Low leverage - Healthy', 'Moderate leverage - Acceptable',
+                   'High leverage - Caution', 'Very high leverage - Risky'],
+        'adjustments': [
+            {'field': 'currentRatio', 'fill': 0, 'bins': [1], 'closed': 'left', 'deltas': [-15, 0]},
+            {'field': 'currentRatio', 'fill': 0, 'bins': [2], 'closed': 'right', 'deltas': [0, 10]},
+        ],
+    },
+    # Q7: P/E ladder, adjusted for P/B
+    'pe_pb': {
+        'field': 'trailingPE', 'valid': 'positive',
+        'bins': [VALUATION_PARAMS['pe_low'], VALUATION_PARAMS['pe_fair'], VALUATION_PARAMS['pe_high']],
+        'closed': 'left',
+        'scores': [80, 60, 40, 25],
+        'labels': ['Undervalued based on P/E', 'Fairly valued', 'Moderately overvalued', 'Highly overvalued'],
+        'default_score': 50, 'default_label': 'Fair valuation',
+        'adjustments': [
+            {'field': 'priceToBook', 'valid': 'positive',
+             'bins': [VALUATION_PARAMS['pb_low']], 'closed': 'left', 'deltas': [15, 0]},
+            {'field': 'priceToBook', 'valid': 'positive',
+             'bins': [VALUATION_PARAMS['pb_high']], 'closed': 'right', 'deltas': [0, -10]},
+        ],
+    },
+    # Q8: position within the 52-week range (%)
+    'range_position': {
+        'field': 'range_position', 'valid': 'finite',
+        'bins': [25, 50, 75], 'closed': 'left',
+        'scores': [85, 65, 45, 25],
+        'labels': ['Near 52-week low ({value:.1f}% of range) - Potentially undervalued',
+                   'Below mid-range ({value:.1f}% of range) - Fair value',
+                   'Above mid-range ({value:.1f}% of range) - Elevated',
+                   'Near 52-week high ({value:.1f}% of range) - Potentially overvalued'],
+        'default_score': 50, 'default_label': 'Mid-range',
+    },
+    # Q9: P/S ladder, adjusted for PEG
+    'peer_valuation': {
+        'field': 'priceToSalesTrailing12Months', 'valid': 'positive',
+        'bins': [2, 5], 'closed': 'left',
+        'scores': [75, 55, 35],
+        'labels': ['Attractive P/S ratio', 'Moderate P/S ratio', 'High P/S ratio'],
+        'default_score': 50, 'default_label': 'Average valuation metrics',
+        'adjustments': [
+            {'field': 'pegRatio', 'valid': 'positive', 'bins': [1], 'closed': 'left', 'deltas': [15, 0]},
+            {'field': 'pegRatio', 'valid': 'positive', 'bins': [2], 'closed': 'right', 'deltas': [0, -10]},
+        ],
+    },
+    # Q11: dividend yield (%), adjusted for payout sustainability
+    'dividend': {
+        'field': 'dividendYield', 'scale': 100, 'valid': 'positive',
+        'bins': [2, 4], 'closed': 'right',
+        'scores': [55, 70, 85],
+        'labels': ['Low dividend yield', 'Good dividend yield',
+                   'High dividend yield - Attractive for income investors'],
+        'default_score': 45, 'default_label': 'No dividend - Growth-focused company',
+        'adjustments': [
+            {'field': 'payoutRatio', 'scale': 100, 'valid': 'positive', 'requires_base': True,
+             'bins': [60], 'closed': 'left', 'deltas': [10, 0], 'notes': [' (sustainable payout ratio)', '']},
+            {'field': 'payoutRatio', 'scale': 100, 'valid': 'positive', 'requires_base': True,
+             'bins': [80], 'closed': 'right', 'deltas': [0, -15],
+             'notes': ['', ' (high payout ratio - sustainability concern)']},
+        ],
+    },
+}
+
+# Portfolio Analysis Parameters
+PORTFOLIO_PARAMS = {
+    'workers': 8,                  # Holdings analyzed concurrently
+    'history_period': '1y',        # Price history used for covariance/correlation
+    'min_observations': 60,        # Daily returns a holding needs to enter the risk model
+    'cluster_correlation': 0.7,    # Link holdings whose return correlation is at least this
+    'cluster_weight': 0.20,        # Flag clusters holding at least 20% of the portfolio
+}
+
+# Price-based Risk Metrics (Q20)
+RISK_PARAMS = {
+    'benchmark': 'SPY',            # Beta is measured against this symbol
+    'history_period': '1y',
+    'min_observations': 60,        # Daily returns needed before metrics affect the score
+    'var_confidence': 0.95,        # VaR/CVaR confidence level
+    'high_volatility': 0.45,       # Annualized volatility at or above this lowers the score
+    'low_volatility': 0.20,        # ... at or below this raises it
+    'severe_drawdown': -0.40,      # Max drawdown at or below this lowers the score
+    'high_beta': 1.5,
+    'high_cvar': 0.05,             # One-day expected shortfall at or above 5%
+}
+
+# Cross-sectional Relative Strength
+RELATIVE_STRENGTH_PARAMS = {
+    'history_period': '2y',        # Must cover the longest lookback
+    'workers': 8,                  # Concurrent history fetches when loading a universe
+    'lookbacks': {'1m': 21, '3m': 63, '6m': 126, '12m': 252},  # Trading days
+    'composite_weights': {'1m': 0.1, '3m': 0.3, '6m': 0.3, '12m': 0.3},
+}
+
+# Dividend Growth and Income Metrics (Q11)
+DIVIDEND_PARAMS = {
+    'cagr_years': [1, 3, 5, 10],   # Dividend CAGR horizons over complete calendar years
+    'regularity_years': 5,         # Recent years used for payment frequency and regularity
+    'history_period': '1y',        # Price history for trailing yield in the batch path
+    'workers': 8,                  # Concurrent dividend fetches when loading a universe
+    'growth_bonus': 5,             # Q11 bonus when the longest available CAGR is positive
+    'streak_years': 10,            # Consecutive annual increases that earn streak_bonus
+    'streak_bonus': 5,
+    'min_regularity': 0.6,         # Below this share of regular years ...
+    'irregular_penalty': 5,        # ... the score is lowered
+}
+
+# Universe Summary (--universe)
+SUMMARY_PARAMS = {
+    'workers': 8,                  # Symbols analyzed concurrently
+    'top_n': 10,                   # Length of highest/lowest score and mover lists
+    'bin_width': 0.5,              # Score histogram resolution for streaming quantiles
+}
+
 # Language Settings
 DEFAULT_LANGUAGE = 'bilingual'  # Options: 'en', 'zh', 'bilingual'
 
 # Report Settings
 REPORT_FORMAT = 'markdown'  # Options: 'text', 'markdown', 'html'
 INCLUDE_CHARTS = False      # Set to True if you want to generate charts
+CHART_PARAMS = {
+    'directory': 'charts',         # One SVG per symbol: price/SMA20/50/200, volume, RSI, MACD
+    'history_period': '2y',        # Fetched so SMA200 is defined across the displayed range
+    'display_bars': 252,
+    'width': 900,
+    'workers': 2,                  # Render processes
+}
 
 # Cache Settings
 CACHE_ENABLED = True
 CACHE_DURATION_HOURS = 1
+CACHE_DIR = os.getenv('STOCKWISE_CACHE_DIR', '.stockwise_cache')
+PERSIST_SCORES = False      # Save per-question scores for what-if re-scoring (main.py --persist-scores)
+PERSIST_SCORE_HISTORY = False  # Record every run in the score history database (main.py --persist-scores)
+SCORE_DB_PATH = os.getenv('STOCKWISE_SCORE_DB', os.path.join(CACHE_DIR, 'score_history.db'))
+CACHE_MEMORY_MB = 256       # In-memory dataset cache budget shared by all DataFetchers (LRU eviction)
+CACHE_DOWNCAST_OHLCV = False  # Store price history as float32 prices and integer volumes
+FETCHER_REGISTRY_SIZE = 500   # Shared DataFetchers kept alive (least recently used are dropped)
+HISTORY_REFRESH_MINUTES = 15  # Stored price history is topped up with new bars at most this often
+
+# Statement-class datasets (financials, earnings) stay on disk under CACHE_DIR/filings until the
+# next expected earnings report; after it, the latest quarter in info is probed before refetching
+FILING_CACHE_PARAMS = {
+    'report_grace_hours': 12,      # Keep serving this long past the expected report time
+    'probe_interval_hours': 24,    # Re-probe this often while a report is due but not yet filed
+    'fallback_days': 7,            # Entry lifetime when no upcoming report date is known
+    'max_age_days': 120,           # Refetch regardless after this long
+}
+
+# Cache Warmer (python main.py warm <universe>)
+WARM_PARAMS = {
+    'datasets': ['history', 'financials', 'earnings'],  # Default dataset classes (also: news)
+    'history_period': '2y',        # Widest period the analyzers request; shorter ones are sliced from it
+    'workers': 8,                  # Symbols prefetched concurrently (the upstream rate limit still applies)
+    'checkpoint_hours': 12,        # Checkpointed pairs older than this are fetched again
+    'progress_seconds': 5,         # Progress line interval
+}
+
+# Threads used by one StockAnalyzer to fetch datasets and run analyzers concurrently
+ANALYSIS_WORKERS = 8
+
+# Upstream Fetch Settings (shared by all DataFetchers in the process)
+FETCH_PARAMS = {
+    'rate_per_second': 2.0,        # Sustained upstream requests per second
+    'burst': 5,                    # Requests allowed back-to-back before throttling
+    'max_retries': 4,              # Retries for transient errors (throttling, timeouts, 5xx)
+    'backoff_base': 0.5,           # Seconds; doubles each retry, full jitter
+    'backoff_max': 30.0,           # Cap on a single backoff sleep
+    'breaker_threshold': 5,        # Consecutive transient failures that open the circuit
+    'breaker_reset_seconds': 60,   # How long the circuit stays open before a trial call
+}
+
+# Watchlist Daemon Settings
+REFRESH_CADENCE_MINUTES = {   # How often each dataset class is refreshed
+    'info': 60,
+    'history': 60,
+    'financials': 24 * 60,
+    'dividends': 24 * 60,
+    'recommendations': 6 * 60,
+    'news': 30,
+    'holders': 7 * 24 * 60,
+}
+WATCHLIST_FETCH_BUDGET = 120   # Dataset refreshes allowed per minute across the watchlist
+WATCHLIST_TICK_SECONDS = 15    # Pause between scheduling rounds
+
+# News Settings
+NEWS_REFRESH_MINUTES = 30   # Re-query a symbol's news at most this often
+NEWS_MAX_PER_SYMBOL = 50    # Articles kept per symbol in the news store
+NEWS_MEMORY_MB = 32         # Articles held in memory (least recently used symbols are dropped past it)
@@ -0,0 +1,200 @@
+"""
+Load-test driver: runs analyses against the simulated data provider at a target rate
+"""
+import os
+import tempfile
+
+# Keep the stores written during a load test away from the real cache
+os.environ.setdefault('STOCKWISE_CACHE_DIR', tempfile.mkdtemp(prefix='stockwise_load_'))
+
+import argparse
+import contextlib
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+from unittest import mock
+import numpy as np
+from colorama import init, Fore, Style
+import config
+import main as stockwise
+from stock_analyzer import StockAnalyzer, CATEGORIES
+from utils import resilience
+from utils.data_fetcher import get_fetcher, set_ticker_factory, clear_registry
+from utils.simulated_provider import SimulatedProvider
+
+init()
+
+# Datasets each analysis reads through its own fetcher (the benchmark history belongs to another symbol)
+SYMBOL_DATASETS = {dataset for _, datasets, _ in CATEGORIES.values() for dataset in datasets} - {'benchmark'}
+
+def make_symbols(count: int) -> List[str]:
+    """Synthetic ticker symbols SIM0000, SIM0001, ..."""
+    return [f"SIM{i:04d}" for i in range(count)]
+
+class LoadDriver:
+    """
+    Load generator for the two ways analyses are run.
+    
+    Paths:
+        batch    main.py's --universe mode over the first `requests` symbols: every
+                 analysis starts at once, so latency is each symbol's completion time
+        service  open loop through the shared fetcher registry, symbols drawn with
+                 Zipf popularity (warm caches, repeated symbols). Requests are
+                 scheduled at a fixed rate regardless of how fast earlier ones finish,
+                 and latency is measured from the scheduled start, so queueing delay
+                 under overload shows up in the tail (no coordinated omission)
+    """
+    
+    def __init__(self, provider: SimulatedProvider, symbols: List[str], path: str = 'batch',
+                 rate: float = 5.0, workers: int = 16, seed: int = 0):
+        self.provider = provider
+        self.symbols = symbols
+        self.path = path
+        self.rate = rate
+        self.workers = workers
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.failures = 0
+        self.dataset_errors = 0
+        self.datasets = 0
+    
+    def _record(self, analyzer: StockAnalyzer, started: float, failed: bool):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.append(elapsed)
+            self.failures += failed
+            self.dataset_errors += len(analyzer.data_fetcher.errors)
+            self.datasets += len(SYMBOL_DATASETS)
+    
+    def _analyze(self, symbol: str, scheduled: float):
+        analyzer = StockAnalyzer(symbol, data_fetcher=get_fetcher(symbol), verbose=False)
+        failed = False
+        try:
+            analyzer.run_analysis()
+        except Exception:
+            failed = True
+        self._record(analyzer, scheduled, failed)
+    
+    def run(self, requests: int) -> Dict[str, Any]:
+        """Issue `requests` analyses and wait for them to finish"""
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if self.path == 'batch':
+                self._run_batch(self.symbols[:requests], started)
+            else:
+                self._run_service(requests, started)
+        return self.report(time.perf_counter() - started)
+    
+    def _run_batch(self, symbols: List[str], started: float):
+        driver = self
+        
+        class TimedAnalyzer(StockAnalyzer):
+            def run_analysis(self):
+                try:
+                    result = super().run_analysis()
+                except Exception:
+                    driver._record(self, started, True)
+                    raise
+                driver._record(self, started, False)
+                return result
+        
+        with tempfile.TemporaryDirectory(prefix='stockwise_batch_') as directory:
+            universe = os.path.join(directory, 'universe.txt')
+            with open(universe, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(symbols) + '\n')
+            args = argparse.Namespace(universe=universe, output=os.path.join(directory, 'summary.md'))
+            with mock.patch.object(stockwise, 'StockAnalyzer', TimedAnalyzer):
+                stockwise.run_universe(args)
+    
+    def _run_service(self, requests: int, started: float):
+        ranks = self._rng.zipf(1.3, size=requests)
+        schedule = [self.symbols[(rank - 1) % len(self.symbols)] for rank in ranks]
+        interval = 1.0 / self.rate
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for i, symbol in enumerate(schedule):
+                scheduled = started + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._analyze, symbol, scheduled)
+    
+    def report(self, wall_seconds: float) -> Dict[str, Any]:
+        latencies = np.array(self.latencies)
+        upstream = self.provider.stats.snapshot()
+        completed = len(latencies)
+        return {
+            'path': self.path,
+            'requests': completed,
+            'target_rate': self.rate if self.path == 'service' else None,
+            'throughput': completed / wall_seconds if wall_seconds else 0.0,
+            'latency_p50': float(np.percentile(latencies, 50)) if completed else 0.0,
+            'latency_p95': float(np.percentile(latencies, 95)) if completed else 0.0,
+            'latency_p99': float(np.percentile(latencies, 99)) if completed else 0.0,
+            'latency_max': float(latencies.max()) if completed else 0.0,
+            'failed_analyses': self.failures,
+            'dataset_error_rate': self.dataset_errors / self.datasets if self.datasets else 0.0,
+            'upstream': upstream,
+            'upstream_per_analysis': upstream['requests'] / completed if completed else 0.0,
+            # Upstream attempts per successful response; 1.0 means no retries were needed
+            'error_amplification': upstream['requests'] / upstream['successes'] if upstream['successes'] else float('inf'),
+        }
+
+def print_report(report: Dict[str, Any]):
+    upstream = report['upstream']
+    print(f"\n{Fore.CYAN}{'='*60}")
+    print(f"LOAD TEST | 压力测试 ({report['path']} path)")
+    print(f"{'='*60}{Style.RESET_ALL}")
+    if report['target_rate'] is None:
+        print(f"Requests:            {report['requests']} (one universe batch)")
+    else:
+        print(f"Requests:            {report['requests']} at target {report['target_rate']:.1f}/s")
+    print(f"Throughput:          {report['throughput']:.2f} symbols/s")
+    print(f"Latency p50/p95/p99: {report['latency_p50']:.2f}s / {report['latency_p95']:.2f}s / {report['latency_p99']:.2f}s")
+    print(f"Latency max:         {report['latency_max']:.2f}s")
+    print(f"Failed analyses:     {report['failed_analyses']}")
+    print(f"Dataset error rate:  {report['dataset_error_rate']:.2%}")
+    print(f"Upstream requests:   {upstream['requests']} ({report['upstream_per_analysis']:.1f} per analysis)")
+    print(f"  errors/throttled:  {upstream['errors']} / {upstream['throttled']}")
+    print(f"Error amplification: {report['error_amplification']:.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test StockWise against a simulated data provider')
+    parser.add_argument('--path', choices=['batch', 'service'], default='batch', help='Code path to exercise')
+    parser.add_argument('--rate', type=float, default=5.0, help='Service path: target symbols per second')
+    parser.add_argument('--requests', type=int, default=100, help='Number of analyses to issue')
+    parser.add_argument('--symbols', type=int, default=200, help='Size of the synthetic universe')
+    parser.add_argument('--workers', type=int, default=16, help='Concurrent analyses')
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='Median upstream latency')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Log-normal latency spread')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Probability of a transient 5xx')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Probability of a random 429')
+    parser.add_argument('--provider-limit', type=float, help='Upstream requests/s beyond which the provider returns 429')
+    parser.add_argument('--upstream-rate', type=float, default=1000.0,
+                        help='Client-side limiter rate (default 1000/s, so the simulated provider and '
+                             '--provider-limit set the pace rather than FETCH_PARAMS)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    resilience.rate_limiter = resilience.RateLimiter(args.upstream_rate, max(1, int(args.upstream_rate)))
+    config.PERSIST_SCORES = False
+    config.PERSIST_SCORE_HISTORY = False
+    config.SUMMARY_PARAMS['workers'] = args.workers
+    
+    provider = SimulatedProvider(args.latency_ms, args.latency_sigma, args.error_rate,
+                                 args.throttle_rate, args.provider_limit, args.seed)
+    set_ticker_factory(provider.ticker)
+    clear_registry()
+    try:
+        driver = LoadDriver(provider, make_symbols(args.symbols), args.path, args.rate, args.workers, args.seed)
+        pace = "as one batch" if args.path == 'batch' else f"at {args.rate}/s"
+        print(f"{Fore.GREEN}Running {args.requests} {args.path} analyses {pace} "
+              f"(cache dir: {config.CACHE_DIR}){Style.RESET_ALL}")
+        print_report(driver.run(args.requests))
+    finally:
+        set_ticker_factory(None)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,36 @@
 """
 Main entry point for StockWise Analysis System
 """
+import os
 import sys
+import tempfile
+
+# Record/replay runs get a throwaway cache directory: a warm cache would keep upstream
+# responses out of the cassette, and replays must not write to the real stores.
+# config reads the directory at import time, so this runs before anything imports it.
+# Spawned chart workers re-import this file as __mp_main__ and must not repeat it
+CASSETTE_CACHE_DIR = None
+if __name__ == "__main__" and any(arg.split('=', 1)[0] in ('--record', '--replay') for arg in sys.argv[1:]):
+    CASSETTE_CACHE_DIR = tempfile.mkdtemp(prefix='stockwise_cassette_')
+    os.environ['STOCKWISE_CACHE_DIR'] = CASSETTE_CACHE_DIR
+    os.environ['STOCKWISE_SCORE_DB'] = os.path.join(CASSETTE_CACHE_DIR, 'score_history.db')
+
 import argparse
+from datetime import datetime
 from stock_analyzer import StockAnalyzer
 from report_generator import ReportGenerator
+from watchlist_daemon import WatchlistDaemon, load_watchlist
+import cache_warmer
+from portfolio import PortfolioAnalyzer, load_holdings, format_portfolio_report
+from analyzers.relative_strength import RelativeStrength, load_panel, format_relative_strength
+from analyzers.sentiment import load_headline_scans
+from utils.profiling import RunProfiler
+from utils.score_db import ScoreDatabase, parse_date
+from utils.summary import UniverseSummary
+from utils.cassette import CassetteRecorder, CassettePlayer
+from utils.data_fetcher import set_ticker_factory
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import config
 from colorama import init, Fore, Style
 
 # Initialize colorama for cross-platform colored output
@@ -20,7 +46,7 @@ def print_banner():
   \___ \| __/ _ \ / __| | | |/\| | / __|/ _ \
   ____) | || (_) | (__| | \  /\  / \__ \  __/
  |_____/ \__\___/ \___|_|  \/  \/|_|___/\___|
-                                              
+        
         Comprehensive Stock Analysis System
         基于20个关键问题的股票分析系统
 {'='*100}{Style.RESET_ALL}
@@ -29,10 +55,107 @@ def print_banner():
     banner = banner.format(Fore=Fore, Style=Style)
     print(banner)
 
+def run_watchlist(args):
+    """Run the watchlist refresh daemon until interrupted"""
+    watchlist = load_watchlist(args.watchlist)
+    print(f"{Fore.GREEN}Watching {len(watchlist)} symbols. Press Ctrl+C to stop.{Style.RESET_ALL}")
+    
+    daemon = WatchlistDaemon(watchlist, fetches_per_minute=args.fetch_budget, changelog_path=args.changelog)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print(f"\n{Fore.YELLOW}Stopped after {daemon.fetch_count} dataset refreshes.{Style.RESET_ALL}")
+
+def run_portfolio(args):
+    """Analyze every holding of a portfolio file and print the aggregate report"""
+    holdings = load_holdings(args.portfolio)
+    print(f"{Fore.GREEN}Analyzing {len(holdings)} holdings...{Style.RESET_ALL}")
+    
+    result = PortfolioAnalyzer(holdings).run()
+    report = format_portfolio_report(result)
+    print(report)
+    
+    if args.save or args.output:
+        filename = args.output or f"portfolio_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"\n{Fore.GREEN}Report saved to: {filename}{Style.RESET_ALL}")
+
+def run_relative_strength(args):
+    """Rank a universe by trailing returns and print the table"""
+    symbols = list(load_watchlist(args.rank))
+    print(f"{Fore.GREEN}Loading price history for {len(symbols)} symbols...{Style.RESET_ALL}")
+    
+    panel = load_panel(symbols)
+    if panel.empty:
+        print(f"{Fore.RED}Error: No price history available for this universe.{Style.RESET_ALL}")
+        return
+    report = format_relative_strength(RelativeStrength(panel).table())
+    print(report)
+    
+    if args.save or args.output:
+        filename = args.output or f"relative_strength_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"\n{Fore.GREEN}Report saved to: {filename}{Style.RESET_ALL}")
+
+def run_universe(args):
+    """Analyze every symbol of a universe file and write one summary report"""
+    symbols = list(load_watchlist(args.universe))
+    filename = args.output or f"universe_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    # Score changes are reported against earlier recorded runs whenever there are any
+    history = ScoreDatabase() if os.path.exists(config.SCORE_DB_PATH) else None
+    # Runs recorded by this batch are not "previous"
+    started = datetime.now().isoformat(timespec='seconds')
+    summary = UniverseSummary(previous_scores=(lambda symbol: history.previous_score(symbol, started))
+                              if history else None)
+    print(f"{Fore.GREEN}Analyzing {len(symbols)} symbols...{Style.RESET_ALL}")
+    # Every symbol's headlines are keyword-scanned in one matcher pass
+    headlines = load_headline_scans(symbols)
+    
+    def analyze(symbol: str):
+        return StockAnalyzer(symbol, verbose=False, headline_scan=headlines.get(symbol)).run_analysis()
+    
+    with ThreadPoolExecutor(max_workers=config.SUMMARY_PARAMS['workers']) as pool:
+        futures = {pool.submit(analyze, symbol): symbol for symbol in symbols}
+        for done, future in enumerate(as_completed(futures), start=1):
+            symbol = futures.pop(future)
+            try:
+                summary.add(future.result())
+            except Exception as e:
+                summary.add_failure(symbol, str(e))
+            if done % 100 == 0 or done == len(symbols):
+                print(f"  {done}/{len(symbols)} complete")
+    
+    summary.write(filename)
+    print(f"\n{Fore.GREEN}Summary saved to: {filename}{Style.RESET_ALL}")
+
+def run_score_query(args):
+    """Print score history for a symbol or the top-scored symbols of a date"""
+    db = ScoreDatabase()
+    if args.history:
+        table = db.score_history(args.history)
+        title = f"Score history | 评分历史: {args.history.upper()}"
+    else:
+        run_date = parse_date(args.date) if args.date else None
+        table = db.top(args.top, run_date)
+        title = f"Top {args.top} by score | 评分排名: {run_date or db.latest_date() or 'N/A'}"
+    
+    print(f"{Fore.CYAN}{title}{Style.RESET_ALL}")
+    if table.empty:
+        print(f"{Fore.YELLOW}No recorded runs.{Style.RESET_ALL}")
+    else:
+        print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
 def main():
     """Main application entry point"""
     print_banner()
     
+    # `main.py warm ...` is handled by the cache warmer's own parser
+    if len(sys.argv) > 1 and sys.argv[1] == 'warm':
+        cache_warmer.main(sys.argv[1:])
+        return
+    
     # Set up argument parser
     parser = argparse.ArgumentParser(
         description='Analyze stocks based on 20 comprehensive questions',
@@ -42,6 +165,17 @@ Examples:
   python main.py --symbol AAPL
   python main.py --symbol MSFT --save
   python main.py --symbol TSLA --output tesla_report.txt
+  python main.py --watchlist watchlist.txt --changelog changes.jsonl
+  python main.py --portfolio holdings.csv --save
+  python main.py --rank universe.txt
+  python main.py --universe universe.txt --output summary.html
+  python main.py --universe universe.txt --persist-scores
+  python main.py --history NFLX
+  python main.py --top 50 --date yesterday
+  python main.py --symbol AAPL --profile --profile-memory
+  python main.py --universe universe.txt --record cassettes/
+  python main.py --universe universe.txt --replay cassettes/ --replay-latency 1
+  python main.py warm universe.txt --datasets history,financials
 
 Questions covered:
   1-6:   Fundamental Analysis (Business, Profitability, Growth, Balance Sheet, Cash Flow, Management)
@@ -70,8 +204,138 @@ Questions covered:
         help='Output filename for the report'
     )
     
+    parser.add_argument(
+        '--watchlist',
+        type=str,
+        help='Run the refresh daemon for a watchlist file (one symbol per line, optional ",importance")'
+    )
+    
+    parser.add_argument(
+        '--fetch-budget',
+        type=float,
+        help='Watchlist mode: dataset refreshes allowed per minute'
+    )
+    
+    parser.add_argument(
+        '--changelog',
+        type=str,
+        help='Watchlist mode: append recommendation changes to this JSON-lines file'
+    )
+    
+    parser.add_argument(
+        '--portfolio',
+        type=str,
+        help='Analyze a portfolio CSV (columns: symbol and weight, value or shares)'
+    )
+    
+    parser.add_argument(
+        '--universe',
+        type=str,
+        help='Analyze a universe file (watchlist format) and write one markdown/HTML summary'
+    )
+    
+    parser.add_argument(
+        '--rank',
+        type=str,
+        help='Rank a universe file (watchlist format) by 1/3/6/12-month relative strength'
+    )
+    
+    parser.add_argument(
+        '--history',
+        type=str,
+        metavar='SYMBOL',
+        help='Show the recorded daily score history of a symbol'
+    )
+    
+    parser.add_argument(
+        '--top',
+        type=int,
+        metavar='N',
+        help='Show the N highest-scored symbols of a run date'
+    )
+    
+    parser.add_argument(
+        '--date',
+        type=str,
+        help='Run date for --top (YYYY-MM-DD, today or yesterday; default: latest)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile CPU time: write a hotspot report and a collapsed-stack file for flamegraphs'
+    )
+    
+    parser.add_argument(
+        '--profile-memory',
+        action='store_true',
+        help='Profile memory with tracemalloc: write the top allocation sites'
+    )
+    
+    parser.add_argument(
+        '--record',
+        type=str,
+        metavar='DIR',
+        help='Record every upstream response into per-symbol cassettes in DIR'
+    )
+    
+    parser.add_argument(
+        '--replay',
+        type=str,
+        metavar='DIR',
+        help='Serve upstream data from cassettes in DIR instead of the network'
+    )
+    
+    parser.add_argument(
+        '--replay-latency',
+        type=float,
+        default=0.0,
+        metavar='SCALE',
+        help='Replay mode: sleep SCALE x each recorded latency (default 0: instant)'
+    )
+    
+    parser.add_argument(
+        '--persist-scores',
+        action='store_true',
+        help='Save per-question scores for what-if re-scoring and record each run in the score history database'
+    )
+    
     args = parser.parse_args()
     
+    if args.persist_scores:
+        config.PERSIST_SCORES = True
+        config.PERSIST_SCORE_HISTORY = True
+    
+    if (args.replay or args.record) and CASSETTE_CACHE_DIR is None:
+        # An abbreviated option (e.g. --rec) got past the check above
+        print(f"{Fore.RED}Error: spell out --record / --replay in full.{Style.RESET_ALL}")
+        sys.exit(1)
+    
+    if args.replay:
+        set_ticker_factory(CassettePlayer(args.replay, args.replay_latency).ticker)
+    elif args.record:
+        set_ticker_factory(CassetteRecorder(args.record).ticker)
+    
+    if args.watchlist:
+        run_watchlist(args)
+        return
+    
+    if args.portfolio:
+        run_portfolio(args)
+        return
+    
+    if args.universe:
+        run_universe(args)
+        return
+    
+    if args.rank:
+        run_relative_strength(args)
+        return
+    
+    if args.history or args.top:
+        run_score_query(args)
+        return
+    
     # Get stock symbol
     symbol = args.symbol
     
@@ -86,10 +350,16 @@ Questions covered:
     try:
         # Create analyzer
         print(f"\n{Fore.GREEN}Initializing analysis for {symbol}...{Style.RESET_ALL}")
-        analyzer = StockAnalyzer(symbol)
-        
-        # Run analysis
-        results = analyzer.run_analysis()
+        if args.profile or args.profile_memory:
+            prefix = f"profile_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            with RunProfiler(prefix, cpu=args.profile, memory=args.profile_memory) as profiler:
+                results = StockAnalyzer(symbol).run_analysis()
+            print(f"{Fore.GREEN}Profile written to: {', '.join(profiler.outputs)}{Style.RESET_ALL}")
+        else:
+            analyzer = StockAnalyzer(symbol)
+            
+            # Run analysis
+            results = analyzer.run_analysis()
         
         # Generate report
         print(f"\n{Fore.GREEN}Generating report...{Style.RESET_ALL}")
@@ -115,7 +385,7 @@ Questions covered:
         print(f"Recommendation: {summary['recommendation_en']} | {summary['recommendation_zh']}")
         print(f"Confidence: {summary['confidence']}")
         print(f"{Fore.CYAN}{'='*100}{Style.RESET_ALL}\n")
-        
+    
     except Exception as e:
         print(f"\n{Fore.RED}Error during analysis: {str(e)}{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}Please check that the symbol is valid and try again.{Style.RESET_ALL}")
@@ -0,0 +1,277 @@
+"""
+Portfolio Analysis - scores every holding and measures how the positions move together
+"""
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import numpy as np
+import pandas as pd
+import config
+from stock_analyzer import StockAnalyzer
+from analyzers.sentiment import load_headline_scans
+from utils.data_fetcher import get_fetcher
+from utils.scorer import Scorer
+
+TRADING_DAYS = 252
+
+def load_holdings(path: str) -> pd.DataFrame:
+    """
+    Read a holdings CSV with a `symbol` column and one sizing column:
+    `weight`, `value` (market value) or `shares` (valued at the current price).
+    Returns: DataFrame with symbol and the sizing column, one row per symbol
+    """
+    holdings = pd.read_csv(path)
+    holdings.columns = [c.strip().lower() for c in holdings.columns]
+    if 'symbol' not in holdings.columns:
+        raise ValueError("Holdings file needs a 'symbol' column")
+    sizing = [c for c in ('weight', 'value', 'shares') if c in holdings.columns]
+    if not sizing:
+        raise ValueError("Holdings file needs a 'weight', 'value' or 'shares' column")
+    
+    holdings = holdings[['symbol', sizing[0]]].dropna()
+    holdings['symbol'] = holdings['symbol'].astype(str).str.strip().str.upper()
+    return holdings.groupby('symbol', as_index=False, sort=False).sum()
+
+def returns_matrix(histories: Dict[str, pd.DataFrame], min_observations: int) -> Tuple[List[str], np.ndarray]:
+    """
+    Align daily closes on calendar date and convert to log returns.
+    Symbols with fewer than `min_observations` returns are dropped.
+    Returns: (symbols, T x N array of returns with NaN where a symbol did not trade)
+    """
+    closes = {}
+    for symbol, history in histories.items():
+        if history is None or history.empty or 'Close' not in history.columns:
+            continue
+        close = history['Close'].astype(float)
+        # Exchanges differ in time zone; align on the trading date only
+        index = close.index.tz_localize(None) if close.index.tz is not None else close.index
+        closes[symbol] = pd.Series(close.to_numpy(), index=index.normalize())
+    
+    if not closes:
+        return [], np.empty((0, 0))
+    prices = pd.concat(closes, axis=1).sort_index()
+    prices = prices.loc[:, ~prices.columns.duplicated()]
+    returns = np.diff(np.log(prices.to_numpy()), axis=0)
+    keep = np.isfinite(returns).sum(axis=0) >= min_observations
+    return [s for s, k in zip(prices.columns, keep) if k], returns[:, keep]
+
+def ledoit_wolf(returns: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Ledoit-Wolf shrinkage of the sample covariance toward a scaled identity.
+    
+    Missing returns are treated as zero after each column is demeaned, so one
+    matrix product gives every pairwise covariance.
+    Returns: (N x N shrunk covariance, shrinkage intensity in [0, 1])
+    """
+    X = returns - np.nanmean(returns, axis=0)
+    X = np.where(np.isfinite(X), X, 0.0)
+    n, p = X.shape
+    
+    sample = X.T @ X / n
+    X2 = X ** 2
+    variances = X2.sum(axis=0) / n
+    mu = variances.sum() / p
+    
+    # Squared Frobenius distance of the sample covariance to the target, and the
+    # estimation error of the sample covariance itself (Ledoit & Wolf, 2004)
+    delta_ = np.sum(sample ** 2)
+    beta_ = np.sum(X2.T @ X2) / n
+    beta = (beta_ - delta_) / (p * n)
+    delta = (delta_ - 2.0 * mu * variances.sum() + p * mu ** 2) / p
+    beta = min(beta, delta)
+    shrinkage = 0.0 if delta == 0 else beta / delta
+    
+    shrunk = (1.0 - shrinkage) * sample
+    shrunk.flat[::p + 1] += shrinkage * mu
+    return shrunk, float(shrinkage)
+
+def correlation_from_covariance(covariance: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = covariance / np.outer(std, std)
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+def correlated_clusters(correlation: np.ndarray, threshold: float) -> List[np.ndarray]:
+    """
+    Connected components of the graph linking positions with correlation >= threshold.
+    Labels are propagated as whole-matrix minimum passes until they stop changing.
+    Returns: Index arrays of every component with at least two members
+    """
+    p = correlation.shape[0]
+    adjacency = correlation >= threshold
+    labels = np.arange(p)
+    while True:
+        neighbor_min = np.where(adjacency, labels[None, :], p).min(axis=1)
+        updated = np.minimum(labels, neighbor_min)
+        # Jump to the label's own label so long chains collapse quickly
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    
+    clusters = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        if len(members) > 1:
+            clusters.append(members)
+    return clusters
+
+class PortfolioAnalyzer:
+    """Score every holding, aggregate by position weight and analyze co-movement"""
+    
+    def __init__(self, holdings: pd.DataFrame, params: Optional[Dict[str, Any]] = None):
+        self.holdings = holdings
+        self.params = dict(config.PORTFOLIO_PARAMS)
+        if params:
+            self.params.update(params)
+        self.analyses: Dict[str, Dict[str, Any]] = {}
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def _analyze(self, symbol: str, headline_scan: Optional[Dict[str, Any]] = None):
+        try:
+            analysis = StockAnalyzer(symbol, verbose=False, headline_scan=headline_scan).run_analysis()
+        except Exception as e:
+            with self._lock:
+                self.failed[symbol] = str(e)
+            return
+        with self._lock:
+            self.analyses[symbol] = analysis
+    
+    def run(self) -> Dict[str, Any]:
+        symbols = self.holdings['symbol'].tolist()
+        headlines = load_headline_scans(symbols, self.params['workers'])
+        with ThreadPoolExecutor(max_workers=self.params['workers']) as pool:
+            list(pool.map(lambda symbol: self._analyze(symbol, headlines.get(symbol)), symbols))
+        
+        weights = self._weights()
+        scores = self._aggregate_scores(weights)
+        risk = self._risk(weights)
+        return {
+            'positions': len(symbols),
+            'analyzed': len(self.analyses),
+            'failed': self.failed,
+            'weights': weights,
+            **scores,
+            **risk
+        }
+    
+    def _weights(self) -> pd.Series:
+        """Position weights normalized over successfully analyzed holdings"""
+        holdings = self.holdings[self.holdings['symbol'].isin(self.analyses)].set_index('symbol')
+        if 'weight' in holdings.columns:
+            raw = holdings['weight']
+        elif 'value' in holdings.columns:
+            raw = holdings['value']
+        else:
+            prices = {s: get_fetcher(s).get_stock_info().get('currentPrice') or 0 for s in holdings.index}
+            raw = holdings['shares'] * pd.Series(prices)
+        raw = raw.astype(float).clip(lower=0)
+        total = raw.sum()
+        return raw / total if total > 0 else raw
+    
+    def _aggregate_scores(self, weights: pd.Series) -> Dict[str, Any]:
+        symbols = list(weights.index)
+        overall = np.array([self.analyses[s]['summary']['overall_score'] for s in symbols])
+        categories = {
+            category: float(np.dot(weights, [self.analyses[s]['summary']['category_scores'][category]
+                                              for s in symbols]))
+            for category in config.WEIGHTS
+        }
+        score = float(np.dot(weights, overall)) if symbols else 50.0
+        rec_en, rec_zh, confidence = Scorer.recommendation_for(score)
+        holdings = pd.DataFrame({
+            'weight': weights,
+            'score': overall,
+            'recommendation': [self.analyses[s]['summary']['recommendation_en'] for s in symbols]
+        }, index=symbols).sort_values('weight', ascending=False)
+        return {
+            'overall_score': round(score, 2),
+            'recommendation_en': rec_en,
+            'recommendation_zh': rec_zh,
+            'confidence': confidence,
+            'category_scores': {k: round(v, 2) for k, v in categories.items()},
+            'holdings': holdings
+        }
+    
+    def _risk(self, weights: pd.Series) -> Dict[str, Any]:
+        histories = {s: get_fetcher(s).get_historical_data(period=self.params['history_period'])
+                     for s in weights.index}
+        symbols, returns = returns_matrix(histories, self.params['min_observations'])
+        if len(symbols) < 2:
+            return {'risk_symbols': symbols, 'covariance': None, 'correlation': None,
+                    'shrinkage': None, 'volatility': None, 'risk_contributions': None, 'clusters': []}
+        
+        covariance, shrinkage = ledoit_wolf(returns)
+        correlation = correlation_from_covariance(covariance)
+        w = weights.reindex(symbols).fillna(0).to_numpy()
+        w = w / w.sum() if w.sum() > 0 else w
+        
+        variance = float(w @ covariance @ w)
+        marginal = covariance @ w
+        contributions = w * marginal / variance if variance > 0 else np.zeros_like(w)
+        
+        clusters = []
+        for members in correlated_clusters(correlation, self.params['cluster_correlation']):
+            block = correlation[np.ix_(members, members)]
+            clusters.append({
+                'symbols': [symbols[i] for i in members],
+                'weight': float(w[members].sum()),
+                'average_correlation': float((block.sum() - len(members)) / (len(members) * (len(members) - 1))),
+                'risk_share': float(contributions[members].sum()),
+                'concentrated': bool(w[members].sum() >= self.params['cluster_weight'])
+            })
+        clusters.sort(key=lambda c: c['weight'], reverse=True)
+        
+        return {
+            'risk_symbols': symbols,
+            'covariance': pd.DataFrame(covariance * TRADING_DAYS, index=symbols, columns=symbols),
+            'correlation': pd.DataFrame(correlation, index=symbols, columns=symbols),
+            'shrinkage': shrinkage,
+            'volatility': float(np.sqrt(variance * TRADING_DAYS)),
+            'risk_contributions': pd.Series(contributions, index=symbols).sort_values(ascending=False),
+            'clusters': clusters
+        }
+
+def format_portfolio_report(result: Dict[str, Any], top: int = 15) -> str:
+    """Plain-text portfolio summary"""
+    lines = [
+        "=" * 100,
+        "PORTFOLIO ANALYSIS | 投资组合分析",
+        "=" * 100,
+        f"Positions | 持仓数: {result['positions']} (analyzed {result['analyzed']})",
+        f"Weighted Score | 加权评分: {result['overall_score']}/100",
+        f"Recommendation | 建议: {result['recommendation_en']} | {result['recommendation_zh']}",
+        "",
+        "Category Scores | 分类评分:",
+    ]
+    for category, score in result['category_scores'].items():
+        lines.append(f"  {category.title():<12} {score:6.2f}")
+    
+    lines += ["", f"Largest Holdings | 主要持仓 (top {top}):",
+              f"  {'Symbol':<10}{'Weight':>8}{'Score':>8}  Recommendation"]
+    for symbol, row in result['holdings'].head(top).iterrows():
+        lines.append(f"  {symbol:<10}{row['weight']:>8.1%}{row['score']:>8.1f}  {row['recommendation']}")
+    
+    if result['volatility'] is not None:
+        lines += ["", f"Annualized Volatility | 年化波动率: {result['volatility']:.1%} "
+                      f"(Ledoit-Wolf shrinkage {result['shrinkage']:.2f})",
+                  "Largest Risk Contributions | 风险贡献:"]
+        for symbol, share in result['risk_contributions'].head(5).items():
+            lines.append(f"  {symbol:<10}{share:>8.1%}")
+    
+    lines += ["", "Correlated Clusters | 高相关持仓组:"]
+    if not result['clusters']:
+        lines.append("  None above the correlation threshold")
+    for cluster in result['clusters'][:10]:
+        flag = "⚠️ CONCENTRATED | 集中" if cluster['concentrated'] else ""
+        members = ', '.join(cluster['symbols'][:12]) + (' ...' if len(cluster['symbols']) > 12 else '')
+        lines.append(f"  {cluster['weight']:.1%} weight, {cluster['risk_share']:.1%} of risk, "
+                     f"avg corr {cluster['average_correlation']:.2f}: {members} {flag}".rstrip())
+    
+    if result['failed']:
+        lines += ["", f"Not analyzed | 未能分析: {', '.join(sorted(result['failed']))}"]
+    lines.append("=" * 100)
+    return "\n".join(lines)
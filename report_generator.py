@@ -14,6 +14,7 @@ class ReportGenerator:
         self.company_name = analysis_results['company_name']
         self.summary = analysis_results['summary']
         self.all_results = analysis_results['results']
+        self.data_errors = analysis_results.get('data_errors', {})
     
     def generate_report(self) -> str:
         """Generate complete bilingual report"""
@@ -48,10 +49,26 @@ class ReportGenerator:
 Symbol | 股票代码: {self.symbol}
 Company | 公司名称: {self.company_name}
 Report Date | 报告日期: {timestamp}
-
+{self._generate_chart_line()}{self._generate_data_warning()}
 {'='*100}
 """
     
+    def _generate_chart_line(self) -> str:
+        """Path of the rendered chart, when charts are enabled"""
+        chart = self.results.get('chart')
+        return f"Chart | 图表: {chart}\n" if chart else ""
+    
+    def _generate_data_warning(self) -> str:
+        """List datasets that could not be fetched (their questions fall back to neutral scores)"""
+        if not self.data_errors:
+            return ""
+        
+        datasets = ', '.join(sorted(self.data_errors))
+        return f"""
+⚠️  Data unavailable | 数据缺失: {datasets}
+    Affected questions use neutral scores | 相关问题使用中性评分
+"""
+    
     def _generate_executive_summary(self) -> str:
         """Generate executive summary section"""
         rec_en = self.summary['recommendation_en']
@@ -1,78 +1,148 @@
 """
 Main Stock Analyzer - Orchestrates all analysis modules
 """
-from utils.data_fetcher import DataFetcher
+from utils.data_fetcher import DataFetcher, get_fetcher
 from utils.scorer import Scorer
+from utils.score_store import ScoreStore
+from utils.score_db import ScoreDatabase
+from utils.task_graph import TaskGraph
+from utils.charts import chart_renderer
 from analyzers.fundamental import FundamentalAnalyzer
 from analyzers.valuation import ValuationAnalyzer
 from analyzers.dividend import DividendAnalyzer
 from analyzers.technical import TechnicalAnalyzer
 from analyzers.sentiment import SentimentAnalyzer
-from typing import Dict, List, Any
+from analyzers.risk import benchmark_history
+from typing import Dict, List, Any, Optional
+import sqlite3
+import config
+
+# Category -> (analyzer class, datasets its constructor and questions read, progress message)
+CATEGORIES = {
+    'fundamental': (FundamentalAnalyzer, ['info', 'financials', 'holders'],
+                    "📊 Fundamental Analysis (Questions 1-6) complete"),
+    'valuation': (ValuationAnalyzer, ['info'], "💰 Valuation Analysis (Questions 7-10) complete"),
+    'dividend': (DividendAnalyzer, ['info', 'dividends', 'history'], "💵 Dividend Analysis (Question 11) complete"),
+    'technical': (TechnicalAnalyzer, ['info', 'history'], "📈 Technical Analysis (Questions 12-16) complete"),
+    'sentiment': (SentimentAnalyzer, ['info', 'news', 'recommendations', 'history', 'benchmark'],
+                  "📰 Sentiment Analysis (Questions 17-20) complete"),
+}
 
 class StockAnalyzer:
     """Main class that orchestrates all stock analysis"""
     
-    def __init__(self, symbol: str):
+    def __init__(self, symbol: str, data_fetcher: DataFetcher = None, verbose: bool = True,
+                 charts: Optional[bool] = None, headline_scan: Optional[Dict[str, Any]] = None):
         self.symbol = symbol.upper()
-        self.data_fetcher = DataFetcher(symbol)
+        self.data_fetcher = data_fetcher or get_fetcher(symbol)
+        self.verbose = verbose
+        # Render a chart alongside the analysis (default: config.INCLUDE_CHARTS)
+        self.charts = config.INCLUDE_CHARTS if charts is None else charts
+        # Headline keyword scan from a multi-symbol batch (see sentiment.scan_headlines)
+        self.headline_scan = headline_scan
         self.scorer = Scorer()
         
-        # Initialize all analyzers
-        self.fundamental = FundamentalAnalyzer(self.data_fetcher)
-        self.valuation = ValuationAnalyzer(self.data_fetcher)
-        self.dividend = DividendAnalyzer(self.data_fetcher)
-        self.technical = TechnicalAnalyzer(self.data_fetcher)
-        self.sentiment = SentimentAnalyzer(self.data_fetcher)
+        # Analyzers are created in run_analysis once the datasets they read are loaded
+        self.fundamental = None
+        self.valuation = None
+        self.dividend = None
+        self.technical = None
+        self.sentiment = None
         
         self.all_results = []
+        self.result_categories = []
     
     def run_analysis(self) -> Dict[str, Any]:
         """
         Run complete analysis covering all 20 questions
         Returns: Dictionary containing all analysis results and recommendation
         """
-        print(f"\n{'='*80}")
-        print(f"Starting comprehensive analysis for {self.symbol}...")
-        print(f"{'='*80}\n")
-        
-        # Run all analyses
-        print("📊 Running Fundamental Analysis (Questions 1-6)...")
-        fundamental_results = self.fundamental.get_all_analyses()
-        self._process_results(fundamental_results, 'fundamental')
-        
-        print("💰 Running Valuation Analysis (Questions 7-10)...")
-        valuation_results = self.valuation.get_all_analyses()
-        self._process_results(valuation_results, 'valuation')
-        
-        print("💵 Running Dividend Analysis (Question 11)...")
-        dividend_results = self.dividend.get_all_analyses()
-        self._process_results(dividend_results, 'dividend')
+        self._log(f"\n{'='*80}")
+        self._log(f"Starting comprehensive analysis for {self.symbol}...")
+        self._log(f"{'='*80}\n")
         
-        print("📈 Running Technical Analysis (Questions 12-16)...")
-        technical_results = self.technical.get_all_analyses()
-        self._process_results(technical_results, 'technical')
+        # All dataset fetches start at once; each analyzer runs as soon as its inputs are loaded
+        category_results = self._build_graph().run(
+            max_workers=config.ANALYSIS_WORKERS,
+            on_done=self._on_task_done
+        )
         
-        print("📰 Running Sentiment Analysis (Questions 17-20)...")
-        sentiment_results = self.sentiment.get_all_analyses()
-        self._process_results(sentiment_results, 'sentiment')
+        # Keep the Q1-Q20 order the report depends on, whatever order the tasks finished in
+        for category in CATEGORIES:
+            self._process_results(category_results[category], category)
         
-        print("\n✅ Analysis complete!\n")
+        self._log("\n✅ Analysis complete!\n")
         
         # Get final scoring summary
         summary = self.scorer.get_summary()
         
-        return {
+        analysis = {
             'symbol': self.symbol,
             'company_name': self.data_fetcher.get_stock_info().get('longName', self.symbol),
             'results': self.all_results,
-            'summary': summary
+            'summary': summary,
+            'chart': category_results.get('chart'),
+            'data_errors': dict(self.data_fetcher.errors)
         }
+        
+        if config.PERSIST_SCORES:
+            try:
+                ScoreStore().save(analysis, self.result_categories)
+            except OSError as e:
+                print(f"Error saving question scores: {e}")
+        
+        if config.PERSIST_SCORE_HISTORY:
+            try:
+                ScoreDatabase().save(analysis, self.result_categories)
+            except sqlite3.Error as e:
+                print(f"Error recording score history: {e}")
+        
+        return analysis
+    
+    def _build_graph(self) -> TaskGraph:
+        """Dataset fetch tasks plus one task per analyzer category that depends on them"""
+        fetcher = self.data_fetcher
+        graph = TaskGraph()
+        graph.add('info', fetcher.get_stock_info)
+        graph.add('financials', fetcher.get_financials)
+        graph.add('holders', fetcher.get_major_holders)
+        graph.add('dividends', fetcher.get_dividends)
+        graph.add('history', lambda: fetcher.get_historical_data(period="1y"))
+        graph.add('news', fetcher.get_news)
+        graph.add('recommendations', fetcher.get_recommendations)
+        graph.add('benchmark', benchmark_history)
+        
+        for category, (analyzer_class, datasets, _) in CATEGORIES.items():
+            graph.add(category, lambda c=category, cls=analyzer_class: self._run_category(c, cls), datasets)
+        
+        if self.charts:
+            graph.add('chart', self._render_chart)
+        return graph
+    
+    def _render_chart(self):
+        """Draw the price/indicator chart in the render pool while the analyzers run"""
+        history = self.data_fetcher.get_historical_data(period=config.CHART_PARAMS['history_period'])
+        return chart_renderer.render(self.symbol, history)
+    
+    def _run_category(self, category: str, analyzer_class) -> List[Dict]:
+        """Create one analyzer (its datasets are already cached) and answer its questions"""
+        if category == 'sentiment':
+            analyzer = analyzer_class(self.data_fetcher, headline_scan=self.headline_scan)
+        else:
+            analyzer = analyzer_class(self.data_fetcher)
+        setattr(self, category, analyzer)
+        return analyzer.get_all_analyses()
+    
+    def _on_task_done(self, name: str):
+        """Report progress as each analyzer category finishes"""
+        if name in CATEGORIES:
+            self._log(CATEGORIES[name][2])
     
     def _process_results(self, results: List[Dict], category: str):
         """Process results from an analyzer and add to scorer"""
         for result in results:
             self.all_results.append(result)
+            self.result_categories.append(category)
             
             # Add score if available
             if 'score' in result:
@@ -80,6 +150,11 @@ class StockAnalyzer:
                 question = result.get('question_en', '')
                 self.scorer.add_score(category, score, question)
     
+    def _log(self, message: str):
+        """Print progress output unless running quietly"""
+        if self.verbose:
+            print(message)
+    
     def get_stock_info(self) -> Dict[str, Any]:
         """Get basic stock information"""
         return self.data_fetcher.get_stock_info()
@@ -0,0 +1,28 @@
+"""
+Shared test setup: an isolated cache directory and the simulated data provider
+"""
+import os
+import sys
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# config reads the cache directory at import time, so set it before anything imports config
+os.environ.setdefault('STOCKWISE_CACHE_DIR', tempfile.mkdtemp(prefix='stockwise-tests-'))
+
+@pytest.fixture
+def provider():
+    """SimulatedProvider installed as the ticker factory, with the upstream rate limit lifted"""
+    from utils import resilience
+    from utils.data_fetcher import set_ticker_factory, clear_registry
+    from utils.simulated_provider import SimulatedProvider
+    
+    limiter = resilience.rate_limiter
+    resilience.rate_limiter = resilience.RateLimiter(5000, 5000)
+    simulated = SimulatedProvider(latency_ms=0.1)
+    set_ticker_factory(simulated.ticker)
+    clear_registry()
+    yield simulated
+    set_ticker_factory(None)
+    clear_registry()
+    resilience.rate_limiter = limiter
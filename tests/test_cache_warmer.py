@@ -0,0 +1,45 @@
+"""
+Cache warmer: resumable warm plan, with the benchmark warmed for history only
+"""
+import argparse
+import json
+import config
+from watchlist_daemon import DATASETS
+from cache_warmer import UNWARMED_DATASETS, WARM_DATASETS, run_warm
+
+def warm(tmp_path, datasets, restart=False):
+    universe = tmp_path / 'universe.txt'
+    universe.write_text("AAA\nBBB\n")
+    checkpoint = tmp_path / 'warm.jsonl'
+    run_warm(argparse.Namespace(universe=str(universe), datasets=datasets, checkpoint=str(checkpoint),
+                                restart=restart, workers=2))
+    with open(checkpoint, encoding='utf-8') as f:
+        return [(item['symbol'], item['dataset']) for item in map(json.loads, f)]
+
+def test_benchmark_is_warmed_for_history_only(provider, tmp_path):
+    pairs = warm(tmp_path, ['history', 'financials', 'news'])
+    benchmark = config.RISK_PARAMS['benchmark']
+    assert [dataset for symbol, dataset in pairs if symbol == benchmark] == ['history']
+    assert sorted(p for p in pairs if p[0] != benchmark) == sorted(
+        (s, d) for s in ('AAA', 'BBB') for d in ('history', 'financials', 'news'))
+
+def test_benchmark_is_skipped_without_history(provider, tmp_path):
+    pairs = warm(tmp_path, ['news'])
+    assert sorted(pairs) == [('AAA', 'news'), ('BBB', 'news')]
+
+def test_resumed_run_fetches_nothing_done(provider, tmp_path, capsys):
+    warm(tmp_path, ['history', 'news'])
+    requests = provider.stats.snapshot()['requests']
+    pairs = warm(tmp_path, ['history', 'news'])
+    assert provider.stats.snapshot()['requests'] == requests
+    assert len(pairs) == 5
+    assert '0 pairs to fetch, 5 already done' in capsys.readouterr().out
+
+def test_banner_names_the_datasets_without_a_disk_store(provider, tmp_path, capsys):
+    warm(tmp_path, ['news'])
+    banner = next(line for line in capsys.readouterr().out.splitlines() if 'Not warmed' in line)
+    for dataset in UNWARMED_DATASETS:
+        assert dataset in banner
+
+def test_every_analysis_dataset_is_warmed_or_listed():
+    assert set(WARM_DATASETS) | set(UNWARMED_DATASETS) >= set(DATASETS)
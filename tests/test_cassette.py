@@ -0,0 +1,70 @@
+"""
+Cassette round trip through main.py on top of a warm cache
+"""
+import os
+import re
+import subprocess
+import sys
+import textwrap
+from utils.cassette import cassette_path, load_cassette
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs main.py in a fresh process (the cache directory is fixed at import time)
+# with yfinance replaced by the simulated provider, or by nothing at all
+DRIVER = textwrap.dedent('''
+    import runpy
+    import sys
+    sys.path.insert(0, {repo!r})
+    sys.argv = ['main.py'] + {argv!r}
+    import yfinance
+    
+    def online(symbol):
+        # Anything importing config must wait until main.py has picked the cache directory
+        from utils import resilience
+        from utils.simulated_provider import SimulatedProvider
+        resilience.rate_limiter = resilience.RateLimiter(5000, 5000)
+        return SimulatedProvider(latency_ms=0.1).ticker(symbol)
+    
+    def offline(symbol):
+        raise AssertionError(f"network request for {{symbol}}")
+    
+    yfinance.Ticker = online if {online!r} else offline
+    runpy.run_path({main!r}, run_name='__main__')
+''')
+
+def run_main(tmp_path, cache_dir, argv, online=True):
+    script = tmp_path / 'driver.py'
+    script.write_text(DRIVER.format(repo=REPO, main=os.path.join(REPO, 'main.py'), argv=argv, online=online))
+    env = dict(os.environ, STOCKWISE_CACHE_DIR=str(cache_dir))
+    env.pop('STOCKWISE_SCORE_DB', None)
+    result = subprocess.run([sys.executable, str(script)], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return re.search(r"Overall Score: ([\d.]+)/100", result.stdout).group(1)
+
+def snapshot(directory):
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            files[os.path.relpath(path, directory)] = os.stat(path).st_mtime_ns
+    return files
+
+def test_record_and_replay_bypass_a_warm_cache(tmp_path):
+    cache = tmp_path / 'cache'
+    cassettes = tmp_path / 'cassettes'
+    score = run_main(tmp_path, cache, ['--symbol', 'AAA'])
+    warm = snapshot(cache)
+    assert any(name.startswith('history') for name in warm)
+    
+    assert run_main(tmp_path, cache, ['--symbol', 'AAA', '--record', str(cassettes)]) == score
+    # Datasets the warm stores would have served still reached the cassette
+    entries = load_cassette(cassette_path(str(cassettes), 'AAA'))['entries']
+    for key in ('info', 'news', 'quarterly_income_stmt', 'dividends'):
+        assert key in entries
+    assert any(key.startswith('history:') for key in entries)
+    
+    assert run_main(tmp_path, cache, ['--symbol', 'AAA', '--replay', str(cassettes)], online=False) == score
+    # Neither run touched the real cache or score history
+    assert snapshot(cache) == warm
@@ -0,0 +1,34 @@
+"""
+ChartRenderer: hash-skipped redraws and spawned workers re-importing main.py
+"""
+import os
+import runpy
+import sys
+from utils.charts import ChartRenderer
+from utils.data_fetcher import get_fetcher
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_unchanged_history_is_not_redrawn(provider, tmp_path):
+    history = get_fetcher('AAA').get_historical_data(period="1y")
+    renderer = ChartRenderer(str(tmp_path), workers=1)
+    try:
+        path = renderer.render('AAA', history)
+        written = os.stat(path).st_mtime_ns
+        assert renderer.render('aaa', history) == path
+        assert os.stat(path).st_mtime_ns == written
+        assert renderer.stats == {'rendered': 1, 'skipped': 1, 'failed': 0}
+        
+        # New data is drawn again
+        assert renderer.render('AAA', history.iloc[:-1]) == path
+        assert renderer.stats['rendered'] == 2
+    finally:
+        renderer.shutdown()
+
+def test_worker_import_of_main_keeps_the_cache_directory(monkeypatch):
+    # Spawned workers run the parent's main.py as __mp_main__ with the parent's argv
+    monkeypatch.setattr(sys, 'argv', ['main.py', '--symbol', 'AAA', '--record', 'cassettes'])
+    cache_dir = os.environ.get('STOCKWISE_CACHE_DIR')
+    namespace = runpy.run_path(os.path.join(REPO, 'main.py'), run_name='__mp_main__')
+    assert namespace['CASSETTE_CACHE_DIR'] is None
+    assert os.environ.get('STOCKWISE_CACHE_DIR') == cache_dir
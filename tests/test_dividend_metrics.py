@@ -0,0 +1,91 @@
+"""
+Dividend CAGR, increase streak and regularity on simulated and hand-built payment series
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from analyzers.dividend_metrics import dividend_metrics, dividend_adjustment
+
+AS_OF = pd.Timestamp('2025-06-30')
+
+def quarterly(first_year, last_year, amount_for_year, skip=()):
+    """Quarterly payments of amount_for_year(year) each, leaving out (year, quarter) pairs in skip"""
+    dates, amounts = [], []
+    for year in range(first_year, last_year + 1):
+        for quarter, month in enumerate((3, 6, 9, 12), 1):
+            if (year, quarter) not in skip:
+                dates.append(pd.Timestamp(year, month, 15))
+                amounts.append(amount_for_year(year))
+    return pd.Series(amounts, index=pd.DatetimeIndex(dates))
+
+def reference(payments, as_of):
+    """The same metrics computed year by year"""
+    payments = payments[payments.index <= as_of]
+    first_year = payments.index.year.min()
+    years = range(first_year + 1, as_of.year)
+    totals = {year: payments[payments.index.year == year].sum() for year in years}
+    counts = {year: int((payments.index.year == year).sum()) for year in years}
+    streak = 0
+    for year in reversed(list(years)[1:]):
+        if totals[year] > totals[year - 1]:
+            streak += 1
+        else:
+            break
+    last = as_of.year - 1
+    cagr = {n: (totals[last] / totals[last - n]) ** (1 / n) * 100 - 100
+            for n in (1, 3, 5, 10) if last - n in totals and totals[last - n] > 0}
+    recent = [counts[year] for year in list(years)[-5:]]
+    per_year = np.round(np.median(recent))
+    return cagr, streak, per_year, sum(c == per_year for c in recent) / len(recent)
+
+def _naive_last(series):
+    return series.index.tz_localize(None)[-1]
+
+def test_growing_payer():
+    payments = quarterly(2012, 2025, lambda year: 0.50 * 1.08 ** (year - 2012))
+    metrics = dividend_metrics({'AAA': payments}, {'AAA': 50.0}, as_of=AS_OF).loc['AAA']
+    
+    assert metrics['cagr_1y'] == pytest.approx(8.0)
+    assert metrics['cagr_10y'] == pytest.approx(8.0)
+    # 2012 is the first (assumed partial) year, so increases run 2014..2024
+    assert metrics['increase_streak'] == 11
+    assert metrics['frequency'] == 'quarterly' and metrics['regularity'] == 1.0
+    ttm = payments[(payments.index > AS_OF - pd.DateOffset(years=1)) & (payments.index <= AS_OF)].sum()
+    assert metrics['ttm_dividend'] == pytest.approx(ttm)
+    assert metrics['trailing_yield'] == pytest.approx(ttm / 50.0 * 100)
+    assert dividend_adjustment(metrics.to_dict()) == 10
+
+def test_missed_payment_breaks_streak_and_regularity():
+    payments = quarterly(2012, 2025, lambda year: 0.50 * 1.08 ** (year - 2012), skip={(2022, 3)})
+    metrics = dividend_metrics({'AAA': payments}, as_of=AS_OF).loc['AAA']
+    
+    assert metrics['increase_streak'] == 2   # 2023 and 2024 each beat the short 2022
+    assert metrics['payments_per_year'] == 4
+    assert metrics['regularity'] == pytest.approx(0.8)
+    assert metrics['cagr_10y'] == pytest.approx(8.0)
+    assert np.isnan(metrics['trailing_yield'])
+
+def test_short_history_has_no_long_cagr():
+    metrics = dividend_metrics({'AAA': quarterly(2021, 2025, lambda year: 1.0)}, as_of=AS_OF).loc['AAA']
+    assert np.isnan(metrics['cagr_5y']) and np.isnan(metrics['cagr_10y'])
+    assert metrics['cagr_1y'] == pytest.approx(0.0)
+    assert metrics['increase_streak'] == 0
+
+def test_simulated_payers_match_reference(provider):
+    symbols = ['AAA', 'BBB', 'CCC', 'DDD']
+    dividends = {symbol: provider.ticker(symbol).dividends for symbol in symbols}
+    as_of = max(_naive_last(s) for s in dividends.values())
+    batch = dividend_metrics(dividends, as_of=as_of)
+    
+    for symbol, payments in dividends.items():
+        payments = payments.copy()
+        payments.index = payments.index.tz_localize(None)
+        cagr, streak, per_year, regularity = reference(payments, as_of)
+        row = batch.loc[symbol]
+        for n, value in cagr.items():
+            assert row[f'cagr_{n}y'] == pytest.approx(value)
+        assert row['increase_streak'] == streak
+        assert row['payments_per_year'] == per_year
+        assert row['regularity'] == pytest.approx(regularity)
+        # One symbol at a time takes the same path
+        pd.testing.assert_series_equal(dividend_metrics({symbol: dividends[symbol]}, as_of=as_of).loc[symbol], row)
@@ -0,0 +1,63 @@
+"""
+Shared fetchers: one load per key under concurrency, replacement without clearing
+"""
+import threading
+import time
+import config
+from utils import data_fetcher
+from utils.data_fetcher import DataFetcher, get_fetcher
+from utils.memory_cache import memory_cache
+
+THREADS = 16
+
+def run_together(target):
+    """Start THREADS threads on `target` at the same moment; returns their results"""
+    barrier = threading.Barrier(THREADS)
+    results = [None] * THREADS
+    
+    def worker(i):
+        barrier.wait()
+        results[i] = target()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_misses_run_the_loader_once(provider):
+    fetcher = DataFetcher('AAA')
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return {'value': len(calls)}
+    results = run_together(lambda: fetcher._get('slow', loader, {}, 'slow'))
+    assert len(calls) == 1
+    assert all(result == {'value': 1} for result in results)
+
+def test_concurrent_registry_callers_share_one_fetch(provider):
+    results = run_together(lambda: get_fetcher('aaa').get_stock_info())
+    assert provider.stats.snapshot()['requests'] == 1
+    assert all(result is results[0] for result in results)
+
+def test_aged_out_fetcher_is_replaced_without_clearing_its_datasets(provider):
+    old = get_fetcher('AAA')
+    info = old.get_stock_info()
+    old.created_at -= config.CACHE_DURATION_HOURS * 3600 + 1
+    
+    new = get_fetcher('AAA')
+    assert new is not old
+    # A caller still holding the old fetcher keeps its data without refetching
+    assert memory_cache.get(old._namespace, 'info') == (True, info)
+    assert old.get_stock_info() is info
+    assert provider.stats.snapshot()['requests'] == 1
+
+def test_evicted_fetcher_keeps_its_datasets(provider, monkeypatch):
+    monkeypatch.setattr(config, 'FETCHER_REGISTRY_SIZE', 1)
+    first = get_fetcher('AAA')
+    first.get_stock_info()
+    get_fetcher('BBB')
+    assert 'AAA' not in data_fetcher._registry
+    assert memory_cache.get(first._namespace, 'info')[0]
@@ -0,0 +1,109 @@
+"""
+FilingCache: serve until the next report, probe cheaply after it, refetch only for a new quarter
+"""
+import pandas as pd
+import pytest
+from utils import filing_cache as filing_cache_module
+from utils.filing_cache import FilingCache, earnings_calendar, statements_cover
+
+DAY = 86400
+Q1 = pd.Timestamp('2025-03-31').timestamp()
+Q2 = pd.Timestamp('2025-06-30').timestamp()
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+    
+    def time(self):
+        return self.now
+
+class Upstream:
+    """Statements and an info dict whose reported quarter and filed columns can move independently"""
+    
+    def __init__(self, provider):
+        self.ticker = provider.ticker('AAA')
+        self.filed = [pd.Timestamp('2024-12-31'), pd.Timestamp('2025-03-31')]
+        self.info = {'mostRecentQuarter': Q1}
+        self.fetches = 0
+    
+    def load(self):
+        self.fetches += 1
+        frame = self.ticker.quarterly_income_stmt.iloc[:, :len(self.filed)]
+        frame.columns = self.filed[::-1]
+        return {'quarterly_income': frame}
+    
+    def calendar(self):
+        return earnings_calendar(self.info, now=filing_cache_module.time.time())
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(pd.Timestamp('2025-05-01').timestamp())
+    monkeypatch.setattr(filing_cache_module, 'time', clock)
+    return clock
+
+def test_probe_and_statement_lag_cycle(provider, clock, tmp_path):
+    cache = FilingCache(str(tmp_path / 'filings'))
+    upstream = Upstream(provider)
+    report = clock.now + 80 * DAY
+    upstream.info['earningsTimestamp'] = report
+    
+    def get():
+        return cache.get('AAA', 'financials', upstream.load, upstream.calendar, statements_cover)
+    
+    get()
+    assert upstream.fetches == 1
+    
+    # Before the report: served from disk
+    clock.now += 30 * DAY
+    get()
+    assert (upstream.fetches, cache.stats['hits']) == (1, 1)
+    
+    # Report date passed, but info still shows Q1: a probe, no fetch
+    clock.now = report + 13 * 3600
+    get()
+    assert (upstream.fetches, cache.stats['probes_unchanged']) == (1, 1)
+    
+    # Q2 reported but the statements lag: fetched, still without Q2
+    clock.now += 25 * 3600
+    upstream.info['mostRecentQuarter'] = Q2
+    stale = get()
+    assert upstream.fetches == 2
+    assert pd.Timestamp('2025-06-30') not in stale['quarterly_income'].columns
+    
+    # The next probe must not mistake the lagging entry for Q2 data
+    clock.now += 25 * 3600
+    upstream.filed.append(pd.Timestamp('2025-06-30'))
+    fresh = get()
+    assert upstream.fetches == 3
+    assert pd.Timestamp('2025-06-30') in fresh['quarterly_income'].columns
+    
+    # Complete again: served until the next report
+    clock.now += 30 * DAY
+    get()
+    assert upstream.fetches == 3
+
+def test_entries_survive_a_restart(provider, clock, tmp_path):
+    directory = str(tmp_path / 'filings')
+    upstream = Upstream(provider)
+    upstream.info['earningsTimestamp'] = clock.now + 80 * DAY
+    FilingCache(directory).get('AAA', 'financials', upstream.load, upstream.calendar, statements_cover)
+    
+    restarted = FilingCache(directory)
+    restarted.get('AAA', 'financials', upstream.load, upstream.calendar, statements_cover)
+    assert upstream.fetches == 1
+    assert restarted.calendar('AAA')['quarter'] == Q1
+
+def test_unknown_report_date_probes_after_fallback_lifetime(provider, clock, tmp_path):
+    cache = FilingCache(str(tmp_path / 'filings'))
+    upstream = Upstream(provider)
+    for days in (0, 6, 2):
+        clock.now += days * DAY
+        cache.get('AAA', 'financials', upstream.load, upstream.calendar, statements_cover)
+    assert upstream.fetches == 1
+    assert (cache.stats['hits'], cache.stats['probes_unchanged']) == (1, 1)
+    
+    clock.now += 2 * DAY
+    upstream.info['mostRecentQuarter'] = Q2
+    upstream.filed.append(pd.Timestamp('2025-06-30'))
+    cache.get('AAA', 'financials', upstream.load, upstream.calendar, statements_cover)
+    assert upstream.fetches == 2
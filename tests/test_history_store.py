@@ -0,0 +1,86 @@
+"""
+HistoryStore: tail merges, adjustment detection and head extension against simulated history
+"""
+import pandas as pd
+import pytest
+from utils.history_store import HistoryStore, period_start
+
+class Upstream:
+    """Simulated history endpoint that records its calls and can hide the latest bars"""
+    
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.calls = []
+        self.hide_last = 0
+    
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        frame = self.ticker.history(**kwargs)
+        if self.hide_last:
+            latest = self.ticker._full_history().index[-self.hide_last]
+            frame = frame.loc[frame.index < latest]
+        return frame
+
+@pytest.fixture
+def upstream(provider):
+    return Upstream(provider.ticker('AAA'))
+
+@pytest.fixture
+def store(tmp_path):
+    # Every read is past the refresh interval, so each get() updates the tail
+    return HistoryStore(str(tmp_path / 'history'), refresh_minutes=0)
+
+def _expected(upstream, period):
+    full = upstream.ticker._full_history()
+    return full.loc[full.index >= period_start(period, pd.Timestamp.now(tz=full.index.tz))]
+
+def test_tail_fetch_appends_only_new_bars(store, upstream):
+    upstream.hide_last = 5
+    first = store.get('AAA', '1y', upstream)
+    upstream.hide_last = 0
+    upstream.calls.clear()
+    
+    merged = store.get('AAA', '1y', upstream)
+    # One small fetch starting at the second-to-last stored bar
+    assert upstream.calls == [{'start': first.index[-2].strftime('%Y-%m-%d')}]
+    assert merged.index.is_unique and merged.index.is_monotonic_increasing
+    full = upstream.ticker._full_history()
+    pd.testing.assert_frame_equal(merged, full.loc[full.index >= first.index[0]])
+
+def test_changed_intraday_bar_is_replaced_without_full_refetch(store, upstream):
+    store.get('AAA', '1y', upstream)
+    history = upstream.ticker._full_history()
+    history.iloc[-1, history.columns.get_loc('Close')] *= 1.01
+    upstream.calls.clear()
+    
+    merged = store.get('AAA', '1y', upstream)
+    assert len(upstream.calls) == 1
+    assert merged['Close'].iloc[-1] == history['Close'].iloc[-1]
+
+def test_readjusted_history_is_fetched_again(store, upstream):
+    store.get('AAA', '1y', upstream)
+    # A 2-for-1 split re-adjusts every past close
+    history = upstream.ticker._full_history()
+    history['Close'] = history['Close'] / 2
+    upstream.calls.clear()
+    
+    refreshed = store.get('AAA', '1y', upstream)
+    assert len(upstream.calls) == 2
+    assert 'start' in upstream.calls[1] and 'end' not in upstream.calls[1]
+    pd.testing.assert_frame_equal(refreshed, _expected(upstream, '1y'))
+
+def test_longer_period_fetches_only_the_missing_head(store, upstream):
+    one_year = store.get('AAA', '1y', upstream)
+    upstream.calls.clear()
+    
+    two_years = store.get('AAA', '2y', upstream)
+    head_call = upstream.calls[-1]
+    assert head_call['end'] == one_year.index[0].strftime('%Y-%m-%d')
+    pd.testing.assert_frame_equal(two_years, _expected(upstream, '2y'))
+    # The shorter period is still served by slicing
+    pd.testing.assert_frame_equal(store.get('AAA', '1y', upstream), _expected(upstream, '1y'))
+
+def test_unhandled_periods_go_straight_upstream(store, upstream):
+    frame = store.get('AAA', '5d', upstream)
+    assert upstream.calls == [{'period': '5d'}]
+    assert len(frame) == 5
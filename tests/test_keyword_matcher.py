@@ -0,0 +1,76 @@
+"""
+KeywordMatcher: word boundaries, phrases and inflections
+"""
+import argparse
+from unittest import mock
+from utils.keyword_matcher import KeywordMatcher
+from analyzers import sentiment
+from analyzers.sentiment import HEADLINE_LEXICONS, HEADLINE_INFLECTIONS, scan_headlines, SentimentAnalyzer
+from utils.data_fetcher import get_fetcher
+
+matcher = KeywordMatcher(HEADLINE_LEXICONS, HEADLINE_INFLECTIONS)
+
+def hits(text):
+    return matcher.match_many([text])[0]
+
+def test_word_boundaries():
+    assert hits("Company tops bestseller list") == set()
+    assert hits("Proofread the misspelled memo") == set()
+    assert 'sell' in hits("Analysts say sell")
+
+def test_phrase_credits_contained_keywords():
+    assert hits("Strong buy rating reiterated") == {'strong buy', 'strong', 'buy'}
+
+def test_regular_and_silent_e_inflections():
+    assert 'rise' in hits("Shares rising on demand")
+    assert 'decline' in hits("Declining sales weigh on results")
+    assert 'gain' in hits("Stock gained 5%")
+    assert 'lawsuit' in hits("Two lawsuits filed")
+
+def test_comparative_and_derived_forms():
+    assert {'strong', 'profit'} <= hits("Stronger demand makes the unit profitable")
+    assert hits("Weakness persists, weaker outlook") == {'weak'}
+
+def test_unlisted_forms_do_not_match():
+    # Suffix rules would turn these into sentiment hits
+    assert hits("Buyers and sellers return") == set()
+    assert hits("A missable quarter for the bestsellers") == set()
+    assert hits("Beater, gainer and riser") == set()
+
+def test_only_listed_inflections_match():
+    assert KeywordMatcher({'up': ['gain']}).match_many(["Stock gains"]) == [set()]
+    assert KeywordMatcher({'up': ['gain']}, {'gain': ['gains']}).match_many(["Stock gains"]) == [{'gain'}]
+
+def test_inflected_keyword_credits_its_stem():
+    assert hits("Investors concerned about margins") == {'concerned', 'concern'}
+
+def test_irregular_forms_and_phrase_inflection():
+    assert 'fall' in hits("Shares fell sharply")
+    assert 'rise' in hits("Revenue rose again")
+    assert hits("Two strong buys") == {'strong buy', 'strong', 'buy'}
+
+def test_simulated_headlines_are_attributed_per_text(provider):
+    titles = [article['content']['title'] for article in provider.ticker('AAA').news]
+    per_text = matcher.match_many(titles)
+    assert len(per_text) == len(titles)
+    for title, found in zip(titles, per_text):
+        assert found == matcher.match_many([title])[0]
+
+def test_batch_scan_matches_per_symbol_scan(provider):
+    symbols = ['AAA', 'BBB', 'CCC']
+    news = {symbol: get_fetcher(symbol).get_news() for symbol in symbols}
+    batch = scan_headlines(news)
+    for symbol in symbols:
+        assert batch[symbol] == scan_headlines({symbol: news[symbol]})[symbol]
+        assert batch[symbol] == SentimentAnalyzer(get_fetcher(symbol)).headline_scan
+
+def test_universe_run_scans_headlines_once(provider, tmp_path):
+    import main
+    universe = tmp_path / 'universe.txt'
+    universe.write_text("AAA\nBBB\nCCC\n")
+    args = argparse.Namespace(universe=str(universe), output=str(tmp_path / 'summary.md'))
+    with mock.patch.object(sentiment._headline_matcher, 'match_many',
+                           wraps=sentiment._headline_matcher.match_many) as match_many:
+        main.run_universe(args)
+    assert match_many.call_count == 1
+    assert len(match_many.call_args[0][0]) > 3
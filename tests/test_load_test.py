@@ -0,0 +1,26 @@
+"""
+Load-test driver: both paths complete against the simulated provider
+"""
+import config
+from load_test import LoadDriver, SYMBOL_DATASETS, make_symbols
+
+def test_dataset_count_follows_the_categories():
+    assert SYMBOL_DATASETS == {'info', 'financials', 'holders', 'dividends', 'history', 'news', 'recommendations'}
+
+def test_batch_path_runs_the_universe_mode(provider, monkeypatch):
+    monkeypatch.setattr(config, 'PERSIST_SCORES', False)
+    monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', False)
+    driver = LoadDriver(provider, make_symbols(5), 'batch', workers=4)
+    report = driver.run(3)
+    assert report['requests'] == 3 and report['failed_analyses'] == 0
+    assert report['target_rate'] is None
+    assert driver.datasets == 3 * len(SYMBOL_DATASETS)
+    assert report['upstream']['requests'] > 0
+
+def test_service_path_reuses_shared_fetchers(provider, monkeypatch):
+    monkeypatch.setattr(config, 'PERSIST_SCORES', False)
+    monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', False)
+    report = LoadDriver(provider, make_symbols(2), 'service', rate=200, workers=4).run(6)
+    assert report['requests'] == 6 and report['failed_analyses'] == 0
+    # Six analyses of at most two symbols fetch each symbol's datasets once
+    assert report['upstream_per_analysis'] < 10
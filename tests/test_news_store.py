@@ -0,0 +1,94 @@
+"""
+NewsStore: publish-time watermarks, deduplication, replay from the log and the memory budget
+"""
+from utils.memory_cache import estimate_size
+from utils.news_store import NewsStore, normalize_article
+
+def item(uuid, published, tickers=('AAA',)):
+    return {'uuid': uuid, 'title': f"Headline {uuid}", 'publisher': 'Wire',
+            'providerPublishTime': published, 'relatedTickers': list(tickers)}
+
+def uuids(store, symbol='AAA'):
+    return [article['uuid'] for article in store.get(symbol, limit=100)]
+
+def test_unordered_feed_keeps_items_after_an_old_one():
+    store = NewsStore()
+    # Oldest first: a break at the first known item would drop everything after it
+    assert store.ingest('AAA', [item('a', 100), item('b', 200)]) == 2
+    assert store.ingest('AAA', [item('a', 100), item('c', 300), item('b', 200), item('d', 400)]) == 2
+    assert uuids(store) == ['d', 'c', 'b', 'a']
+
+def test_items_older_than_the_watermark_are_skipped():
+    store = NewsStore()
+    store.ingest('AAA', [item('b', 200)])
+    assert store.ingest('AAA', [item('late', 150), item('c', 300)]) == 1
+    assert uuids(store) == ['c', 'b']
+
+def test_new_item_at_the_watermark_is_kept_once():
+    store = NewsStore()
+    store.ingest('AAA', [item('b', 200)])
+    assert store.ingest('AAA', [item('b', 200), item('b2', 200)]) == 1
+    assert store.ingest('AAA', [item('b', 200), item('b2', 200)]) == 0
+    assert sorted(uuids(store)) == ['b', 'b2']
+
+def test_log_replay_restores_articles_and_watermarks(tmp_path):
+    path = str(tmp_path / 'news.jsonl')
+    store = NewsStore(path)
+    store.ingest('AAA', [item('a', 100), item('c', 300, ('AAA', 'BBB')), item('b', 200)])
+    
+    reloaded = NewsStore(path)
+    assert uuids(reloaded) == ['c', 'b', 'a']
+    assert uuids(reloaded, 'BBB') == ['c']
+    assert reloaded.ingest('AAA', [item('old', 250), item('d', 400)]) == 1
+
+def stored_bytes(store):
+    return sum(estimate_size(article) for article in store._articles.values())
+
+def test_bytes_track_stored_articles():
+    store = NewsStore(max_per_symbol=2)
+    store.ingest('AAA', [item('a', 100), item('b', 200, ('AAA', 'BBB'))])
+    assert store.total_bytes == stored_bytes(store) > 0
+    
+    # 'a' falls out of AAA's two-article window and is referenced nowhere else
+    store.ingest('AAA', [item('c', 300)])
+    assert 'a' not in store._articles
+    assert store.total_bytes == stored_bytes(store)
+    
+    # 'b' is still in BBB's window
+    store.ingest('AAA', [item('d', 400)])
+    assert 'b' in store._articles and uuids(store, 'BBB') == ['b']
+    assert store.total_bytes == stored_bytes(store)
+
+def test_least_recently_used_symbols_are_evicted_past_the_budget():
+    size = estimate_size(normalize_article(item('x1', 100)))
+    store = NewsStore(max_bytes=int(size * 4.5))
+    store.ingest('AAA', [item('a1', 100), item('a2', 200)])
+    store.ingest('BBB', [item('b1', 100, ('BBB',)), item('b2', 200, ('BBB',))])
+    store.get('AAA')
+    
+    store.ingest('CCC', [item('c1', 100, ('CCC',))])
+    assert store.stats()['evictions'] == 1
+    assert uuids(store, 'BBB') == [] and not store.is_fresh('BBB')
+    assert uuids(store, 'AAA') == ['a2', 'a1'] and uuids(store, 'CCC') == ['c1']
+    assert store.total_bytes == stored_bytes(store) <= store.max_bytes
+
+def test_shared_article_survives_eviction_of_one_symbol():
+    size = estimate_size(normalize_article(item('x', 100, ('AAA', 'BBB'))))
+    store = NewsStore(max_bytes=int(size * 2.5))
+    store.ingest('AAA', [item('shared', 100, ('AAA', 'BBB')), item('a', 50)])
+    store.ingest('BBB', [item('b', 200)])
+    assert store.stats()['evictions'] == 1
+    assert uuids(store, 'BBB') == ['b', 'shared']
+    assert store.total_bytes == stored_bytes(store)
+
+def test_reload_fits_the_budget(tmp_path):
+    path = str(tmp_path / 'news.jsonl')
+    store = NewsStore(path)
+    for symbol in ('AAA', 'BBB', 'CCC'):
+        store.ingest(symbol, [item(f"{symbol}{i}", 100 + i, (symbol,)) for i in range(3)])
+    
+    size = estimate_size(normalize_article(item('AAA0', 100)))
+    reloaded = NewsStore(path, max_bytes=int(size * 6.5))
+    assert reloaded.stats()['articles'] == 6
+    # The symbol fetched first is the least recently used
+    assert uuids(reloaded, 'AAA') == [] and len(uuids(reloaded, 'CCC')) == 3
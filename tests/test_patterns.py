@@ -0,0 +1,75 @@
+"""
+Chart pattern matchers on synthetic piecewise-linear price paths
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from analyzers.patterns import PatternDetector, describe_pattern
+
+def path(*legs, start=100.0):
+    """OHLC history walking linearly through (bars, target price) legs"""
+    closes = [start]
+    for bars, target in legs:
+        closes.extend(np.linspace(closes[-1], target, bars + 1)[1:])
+    closes = np.array(closes)
+    index = pd.bdate_range('2024-01-01', periods=len(closes))
+    return pd.DataFrame({'Open': closes, 'High': closes * 1.001, 'Low': closes * 0.999, 'Close': closes},
+                        index=index)
+
+def names(history, **params):
+    return {p['name']: p for p in PatternDetector(params).detect(history)}
+
+def test_double_top_forming_and_confirmed():
+    forming = names(path((20, 120), (20, 105), (20, 120), (10, 110)))
+    assert forming['Double top']['status'] == 'forming'
+    confirmed = names(path((20, 120), (20, 105), (20, 120), (15, 100)))
+    assert confirmed['Double top']['status'] == 'confirmed'
+    assert confirmed['Double top']['level'] == pytest.approx(105 * 0.999)
+
+def test_double_bottom():
+    found = names(path((20, 80), (20, 95), (20, 80), (15, 100)))
+    assert found['Double bottom']['bias'] == 'bullish'
+    assert found['Double bottom']['status'] == 'confirmed'
+
+def test_head_and_shoulders_and_inverse():
+    top = names(path((15, 115), (15, 105), (15, 130), (15, 105), (15, 115), (15, 98)))
+    assert top['Head and shoulders']['status'] == 'confirmed'
+    bottom = names(path((15, 85), (15, 95), (15, 70), (15, 95), (15, 85), (15, 102)))
+    assert bottom['Inverse head and shoulders']['bias'] == 'bullish'
+
+def test_ascending_triangle():
+    found = names(path((10, 120), (10, 100), (10, 120), (10, 106), (10, 120), (10, 112), (6, 117)))
+    assert found['Ascending triangle']['status'] == 'forming'
+
+def test_fresh_breakout_is_reported():
+    found = names(path((20, 120), (20, 100), (15, 130)))
+    breakout = found['Breakout above resistance']
+    assert breakout['level'] == pytest.approx(120 * 1.001)
+    assert 'Breakout above resistance (bullish, confirmed)' in describe_pattern(breakout)
+
+def test_stale_breakout_is_not_reported():
+    # Broke resistance, then kept grinding higher for 150 bars without a new swing high
+    history = path((20, 120), (20, 100), (15, 130), (150, 200))
+    assert 'Breakout above resistance' not in names(history)
+    assert 'Breakout above resistance' in names(history, max_pattern_age=200)
+
+def test_breakdown_below_support():
+    found = names(path((20, 80), (20, 100), (15, 70)))
+    assert found['Breakdown below support']['bias'] == 'bearish'
+
+def test_consolidation_only_looks_within_pattern_age():
+    history = path((30, 130), (10, 101), (60, 104))
+    assert 'Tight consolidation' in names(history)
+    # A 60-bar window that reaches back into the rally is not tight
+    assert 'Tight consolidation' not in names(history, consolidation_window=90, max_pattern_age=90)
+    # The same window capped at the pattern age only sees the recent range
+    assert 'Tight consolidation' in names(history, consolidation_window=90, max_pattern_age=40)
+
+def test_batch_scan_matches_single_detection():
+    histories = {'TOP': path((20, 120), (20, 105), (20, 120), (15, 100)),
+                 'BRK': path((20, 120), (20, 100), (15, 130)),
+                 'SHORT': path((5, 101))}
+    batch = PatternDetector().scan(histories)
+    for symbol, history in histories.items():
+        assert batch[symbol] == PatternDetector().detect(history)
+    assert batch['SHORT'] == []
@@ -0,0 +1,54 @@
+"""
+Ledoit-Wolf shrinkage on simulated returns, checked against the per-observation definition
+"""
+import numpy as np
+import pytest
+from portfolio import ledoit_wolf, returns_matrix
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE', 'FFF']
+
+def reference_ledoit_wolf(returns):
+    """Ledoit & Wolf (2004) written out one observation at a time"""
+    X = returns - returns.mean(axis=0)
+    n, p = X.shape
+    sample = X.T @ X / n
+    mu = np.trace(sample) / p
+    target = mu * np.eye(p)
+    d2 = np.sum((sample - target) ** 2)
+    pi = sum(np.sum((np.outer(x, x) - sample) ** 2) for x in X) / n
+    b2 = min(pi / n, d2)
+    shrinkage = b2 / d2
+    return shrinkage * target + (1 - shrinkage) * sample, shrinkage
+
+@pytest.fixture
+def returns(provider):
+    histories = {symbol: provider.ticker(symbol).history(period='1y') for symbol in SYMBOLS}
+    symbols, returns = returns_matrix(histories, min_observations=60)
+    assert symbols == SYMBOLS
+    return returns
+
+def test_matches_reference_definition(returns):
+    shrunk, shrinkage = ledoit_wolf(returns)
+    expected, expected_shrinkage = reference_ledoit_wolf(returns)
+    assert shrinkage == pytest.approx(expected_shrinkage)
+    np.testing.assert_allclose(shrunk, expected, rtol=1e-9, atol=1e-15)
+
+def test_short_windows_shrink_harder_and_stay_positive_definite(returns):
+    _, long_shrinkage = ledoit_wolf(returns)
+    short, short_shrinkage = ledoit_wolf(returns[-20:])
+    assert 0 <= long_shrinkage < short_shrinkage <= 1
+    assert np.all(np.linalg.eigvalsh(short) > 0)
+
+def test_missing_returns_count_as_zero_after_demeaning(returns):
+    gappy = returns.copy()
+    gappy[:30, 0] = np.nan
+    filled = gappy.copy()
+    filled[:30, 0] = np.nanmean(gappy[:, 0])
+    np.testing.assert_allclose(ledoit_wolf(gappy)[0], ledoit_wolf(filled)[0])
+
+def test_identical_variances_need_no_estimate():
+    # A scaled identity sample covariance is already the target
+    returns = np.array([[1.0, 0.0], [-1.0, 0.0], [0.0, 1.0], [0.0, -1.0]])
+    shrunk, shrinkage = ledoit_wolf(returns)
+    np.testing.assert_allclose(shrunk, 0.5 * np.eye(2))
+    assert shrinkage == 0.0
@@ -0,0 +1,29 @@
+"""
+RunProfiler covers the TaskGraph worker threads an analysis runs on
+"""
+import config
+from stock_analyzer import StockAnalyzer
+from utils.profiling import RunProfiler
+
+def test_threaded_run_is_profiled(provider, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'ANALYSIS_WORKERS', 4)
+    monkeypatch.setattr(config, 'PERSIST_SCORES', False)
+    monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', False)
+    prefix = str(tmp_path / 'run')
+    with RunProfiler(prefix, cpu=True) as profiler:
+        StockAnalyzer('AAA', verbose=False, charts=False).run_analysis()
+    
+    assert profiler.outputs == [f"{prefix}_cpu.txt", f"{prefix}.collapsed"]
+    with open(f"{prefix}_cpu.txt", encoding='utf-8') as f:
+        report = f.read()
+    breakdown = report.split('\nHotspots\n')[0]
+    # Every analyzer runs on a worker thread, never on the calling one
+    for component in ('fundamental.py: FundamentalAnalyzer.get_all_analyses',
+                      'technical.py: TechnicalAnalyzer.get_all_analyses',
+                      'sentiment.py: SentimentAnalyzer.get_all_analyses',
+                      'data_fetcher.py: DataFetcher.get_stock_info'):
+        assert component in breakdown
+    
+    with open(f"{prefix}.collapsed", encoding='utf-8') as f:
+        stacks = f.read()
+    assert 'thread.py:_worker' in stacks
@@ -0,0 +1,61 @@
+"""
+RelativeStrength ring buffer: bar-by-bar updates past capacity against a pandas rolling reference
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from analyzers.relative_strength import RelativeStrength
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+LOOKBACKS = {'short': 2, 'long': 5}
+WEIGHTS = {'short': 0.25, 'long': 0.75}
+
+def reference(closes):
+    """Returns, percentile ranks and composite from the full close history"""
+    filled = closes.ffill()
+    returns = pd.DataFrame({
+        horizon: filled.rolling(lag + 1).apply(lambda window: window[-1] / window[0] - 1, raw=True).iloc[-1]
+        for horizon, lag in LOOKBACKS.items()
+    })
+    ranks = returns.rank(axis=0, pct=True) * 100
+    weights = pd.Series(WEIGHTS)
+    total = (ranks.notna() * weights).sum(axis=1)
+    composite = ((ranks.fillna(0.0) * weights).sum(axis=1) / total).where(total > 0)
+    return returns, ranks, composite
+
+@pytest.fixture
+def closes(provider):
+    closes = pd.DataFrame({symbol: provider.ticker(symbol).history(period='6mo')['Close'] for symbol in SYMBOLS})
+    closes = closes.iloc[:40].astype(float)
+    # A late listing and scattered days without a trade
+    closes.iloc[:12, 4] = np.nan
+    rng = np.random.default_rng(7)
+    gaps = rng.random(closes.shape) < 0.1
+    gaps[:12] = False
+    closes = closes.mask(gaps)
+    return closes
+
+def check(rs, history):
+    returns, ranks, composite = reference(history)
+    pd.testing.assert_frame_equal(rs.returns, returns, check_names=False)
+    pd.testing.assert_frame_equal(rs.ranks, ranks, check_names=False)
+    pd.testing.assert_series_equal(rs.composite, composite, check_names=False)
+
+def test_updates_past_capacity_match_rolling_reference(closes):
+    start = 3
+    rs = RelativeStrength(closes.iloc[:start], LOOKBACKS, WEIGHTS)
+    check(rs, closes.iloc[:start])
+    
+    # 37 more bars roll the 6-slot buffer around several times
+    for i in range(start, len(closes)):
+        bar = closes.iloc[i].dropna().to_dict()
+        rs.update(bar, closes.index[i])
+        check(rs, closes.iloc[:i + 1])
+    assert rs.last_date == closes.index[-1]
+
+def test_loaded_history_longer_than_the_window(closes):
+    rs = RelativeStrength(closes.iloc[:30], LOOKBACKS, WEIGHTS)
+    check(rs, closes.iloc[:30])
+    rs.update({'AAA': 1.0, 'ZZZ': 5.0})
+    expected = pd.concat([closes.iloc[:30], pd.DataFrame({'AAA': [1.0]}, index=[closes.index[30]])])
+    check(rs, expected)
@@ -0,0 +1,77 @@
+"""
+Rescorer parity with Scorer on stored simulated analyses
+"""
+import numpy as np
+import pytest
+from unittest import mock
+import config
+from stock_analyzer import StockAnalyzer, CATEGORIES
+from utils.score_db import ScoreDatabase
+from utils.score_store import ScoreStore
+from utils.scorer import Scorer
+from utils.rescorer import Rescorer, RECOMMENDATIONS, weights_matrix, thresholds_matrix, weight_grid
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD']
+
+@pytest.fixture
+def stored(provider, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'PERSIST_SCORES', False)
+    monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', False)
+    store = ScoreStore(str(tmp_path / 'scores'))
+    analyses = {}
+    for symbol in SYMBOLS:
+        analyzer = StockAnalyzer(symbol, verbose=False, charts=False)
+        analyses[symbol] = analyzer.run_analysis()
+        store.save(analyses[symbol], analyzer.result_categories)
+    symbols, categories, matrix = store.load_matrix()
+    return analyses, symbols, categories, matrix
+
+def _scorer_for(matrix_row, categories):
+    scorer = Scorer()
+    for category, score in zip(categories, matrix_row):
+        if not np.isnan(score):
+            scorer.add_score(category, score)
+    return scorer
+
+def test_default_configuration_matches_the_analyses(stored):
+    analyses, symbols, categories, matrix = stored
+    overall, recommendations = Rescorer(matrix, categories).rescore()
+    for column, symbol in enumerate(symbols):
+        summary = analyses[symbol]['summary']
+        # The summary rounds to two decimals
+        assert overall[0, column] == pytest.approx(summary['overall_score'], abs=0.01)
+        assert RECOMMENDATIONS[recommendations[0, column]] == summary['recommendation_en']
+
+def test_alternative_weights_and_thresholds_match_scorer(stored, monkeypatch):
+    _, symbols, categories, matrix = stored
+    grid = weight_grid(step=25)
+    thresholds = {'strong_buy': 60, 'buy': 52, 'hold': 45, 'sell': 35}
+    overall, recommendations = Rescorer(matrix, categories).rescore(grid, thresholds_matrix(thresholds))
+    monkeypatch.setattr(config, 'THRESHOLDS', thresholds)
+    
+    for k, row in enumerate(grid):
+        monkeypatch.setattr(config, 'WEIGHTS', dict(zip(config.WEIGHTS, row)))
+        for column in range(len(symbols)):
+            scorer = _scorer_for(matrix[column], categories)
+            assert overall[k, column] == pytest.approx(scorer.get_weighted_score())
+            assert RECOMMENDATIONS[recommendations[k, column]] == scorer.get_recommendation()[0]
+
+def test_clipping_and_empty_categories_follow_scorer(monkeypatch):
+    categories = ['fundamental', 'fundamental', 'valuation', 'dividend']
+    matrix = np.array([[140.0, -20.0, np.nan, 70.0]])
+    overall, _ = Rescorer(matrix, categories).rescore(weights_matrix(config.WEIGHTS))
+    assert overall[0, 0] == pytest.approx(_scorer_for(matrix[0], categories).get_weighted_score())
+
+def test_scores_are_persisted_only_when_enabled(provider, monkeypatch):
+    with mock.patch.object(ScoreStore, 'save') as store_save, mock.patch.object(ScoreDatabase, 'save') as db_save:
+        StockAnalyzer('AAA', verbose=False, charts=False).run_analysis()
+        assert not store_save.called and not db_save.called
+        
+        monkeypatch.setattr(config, 'PERSIST_SCORES', True)
+        monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', True)
+        StockAnalyzer('AAA', verbose=False, charts=False).run_analysis()
+        assert store_save.call_count == 1 and db_save.call_count == 1
+
+def test_dividend_category_waits_for_price_history():
+    # Trailing yield reads the price history
+    assert 'history' in CATEGORIES['dividend'][1]
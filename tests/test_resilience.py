@@ -0,0 +1,184 @@
+"""
+Retry, circuit breaking and rate limiting against a fake clock; empty upstream answers
+"""
+import pandas as pd
+import pytest
+from utils import resilience
+from utils.resilience import (RateLimiter, CircuitBreaker, CircuitOpenError, FetchError,
+                              call_with_retry, is_empty)
+from utils.data_fetcher import DataFetcher, set_ticker_factory
+from utils.memory_cache import memory_cache
+
+class Clock:
+    """Stands in for the time module: sleeping advances the clock instantly"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def time(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience, 'time', clock)
+    # Full jitter always picks the longest allowed backoff
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    return clock
+
+class Flaky:
+    """Raises `error` (or answers `empty`) for the first `failures` calls, then returns 'ok'"""
+    
+    NOT_EMPTY = object()
+    
+    def __init__(self, failures, error=None, empty=NOT_EMPTY):
+        self.failures = failures
+        self.error = error if error is not None else ConnectionError("reset by peer")
+        self.empty = empty
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            if self.empty is not self.NOT_EMPTY:
+                return self.empty
+            raise self.error
+        return 'ok'
+
+def run(fn, clock, **kwargs):
+    params = dict(limiter=RateLimiter(1000, 1000), breaker=CircuitBreaker(100, 60),
+                  max_retries=3, backoff_base=0.5, backoff_max=1.5)
+    params.update(kwargs)
+    return call_with_retry(fn, **params)
+
+def test_transient_failures_back_off_exponentially_up_to_the_cap(clock):
+    fn = Flaky(3)
+    assert run(fn, clock) == 'ok'
+    assert fn.calls == 4
+    assert clock.sleeps == [0.5, 1.0, 1.5]
+
+def test_gives_up_after_max_retries(clock):
+    fn = Flaky(10)
+    with pytest.raises(FetchError, match="after 4 attempts"):
+        run(fn, clock)
+    assert fn.calls == 4
+
+def test_non_transient_errors_are_not_retried(clock):
+    fn = Flaky(1, error=KeyError('symbol'))
+    with pytest.raises(KeyError):
+        run(fn, clock)
+    assert fn.calls == 1 and clock.sleeps == []
+
+def test_empty_results_are_retried_only_when_rejected(clock):
+    for empty in ({}, None, pd.DataFrame()):
+        fn = Flaky(2, empty=empty)
+        assert run(fn, clock, reject_empty=True) == 'ok'
+        assert fn.calls == 3
+    
+    fn = Flaky(1, empty={})
+    assert run(fn, clock) == {}
+    assert fn.calls == 1
+
+def test_empty_results_count_toward_the_breaker(clock):
+    breaker = CircuitBreaker(3, 60)
+    with pytest.raises(FetchError):
+        run(Flaky(10, empty=pd.DataFrame()), clock, breaker=breaker, max_retries=2, reject_empty=True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+def test_breaker_opens_rejects_then_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(2, 60)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    
+    clock.now += 59
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    clock.now += 2
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError, match="trial"):
+        breaker.before_call()
+    
+    # A failed trial re-opens for a full reset period
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 30
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+def test_open_breaker_fails_fast_without_calling_upstream(clock):
+    breaker = CircuitBreaker(1, 60)
+    breaker.record_failure()
+    fn = Flaky(0)
+    with pytest.raises(CircuitOpenError):
+        run(fn, clock, breaker=breaker)
+    assert fn.calls == 0
+
+def test_rate_limiter_allows_a_burst_then_paces(clock):
+    limiter = RateLimiter(2.0, 3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == []
+    assert not limiter.try_acquire()
+    
+    limiter.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+    
+    clock.now += 10
+    # Refill is capped at the burst size
+    assert sum(limiter.try_acquire() for _ in range(5)) == 3
+
+def test_is_empty():
+    assert is_empty(None) and is_empty({}) and is_empty(pd.DataFrame()) and is_empty([])
+    assert is_empty({'a': None, 'b': pd.Series(dtype=float)})
+    assert not is_empty({'a': 1}) and not is_empty(pd.Series([1.0])) and not is_empty(0)
+
+class EmptyInfoTicker:
+    """Answers `info` with {} until `ready`, like a throttled yfinance session"""
+    
+    def __init__(self, symbol):
+        self.ready = False
+        self.requests = 0
+        self.dividends = pd.Series(dtype=float)
+    
+    @property
+    def info(self):
+        self.requests += 1
+        return {'symbol': 'AAA'} if self.ready else {}
+
+def test_fetcher_does_not_cache_empty_results(provider, monkeypatch):
+    monkeypatch.setattr(resilience, 'rate_limiter', RateLimiter(5000, 5000))
+    monkeypatch.setattr(resilience, 'circuit_breaker', CircuitBreaker(100, 60))
+    monkeypatch.setattr(resilience.time, 'sleep', lambda seconds: None)
+    set_ticker_factory(EmptyInfoTicker)
+    fetcher = DataFetcher('AAA')
+    
+    assert fetcher.get_stock_info() == {}
+    assert fetcher.ticker.requests == 1 + resilience.config.FETCH_PARAMS['max_retries']
+    assert 'info' in fetcher.errors
+    assert memory_cache.get(fetcher._namespace, 'info') == (False, None)
+    
+    fetcher.ticker.ready = True
+    assert fetcher.get_stock_info() == {'symbol': 'AAA'}
+    assert 'info' not in fetcher.errors
+    
+    # Legitimately empty datasets are returned but asked for again next time
+    assert fetcher.get_dividends().empty
+    assert memory_cache.get(fetcher._namespace, 'dividends') == (False, None)
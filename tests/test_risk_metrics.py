@@ -0,0 +1,73 @@
+"""
+Vectorized risk metrics against a per-symbol pandas loop on simulated histories
+"""
+import warnings
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+import pytest
+from analyzers.risk import risk_metrics, METRIC_COLUMNS, TRADING_DAYS
+
+SYMBOLS = ['AAA', 'BBB', 'CCC', 'DDD']
+CONFIDENCE = 0.95
+
+def reference_metrics(close, benchmark):
+    """One symbol's metrics written with plain pandas operations"""
+    returns = close.pct_change(fill_method=None).iloc[1:].dropna()
+    if returns.empty:
+        return {column: np.nan for column in METRIC_COLUMNS} | {'observations': 0}
+    alpha = 1 - CONFIDENCE
+    quantile = returns.quantile(alpha)
+    mean, std = returns.mean(), returns.std()
+    z = NormalDist().inv_cdf(alpha)
+    filled = close.ffill()
+    both = pd.concat([returns, benchmark.pct_change(fill_method=None)], axis=1, join='inner').dropna()
+    return {
+        'volatility': std * np.sqrt(TRADING_DAYS),
+        'max_drawdown': (filled / filled.cummax() - 1).min(),
+        'beta': both.iloc[:, 0].cov(both.iloc[:, 1]) / both.iloc[:, 1].var(),
+        'var_historical': -quantile,
+        'cvar_historical': -returns[returns <= quantile].mean(),
+        'var_parametric': -(mean + z * std),
+        'cvar_parametric': -(mean - std * NormalDist().pdf(z) / alpha),
+        'observations': len(returns),
+    }
+
+@pytest.fixture
+def panel(provider):
+    closes = {symbol: provider.ticker(symbol).history(period='1y')['Close'] for symbol in SYMBOLS}
+    panel = pd.DataFrame(closes)
+    panel.index = panel.index.tz_localize(None).normalize()
+    # Scattered gaps, a late listing and a symbol with no prices at all
+    panel.iloc[[10, 11, 50, 120], 0] = np.nan
+    panel.iloc[:100, 1] = np.nan
+    panel['EMPTY'] = np.nan
+    benchmark = provider.ticker('SPY').history(period='1y')['Close']
+    benchmark.index = benchmark.index.tz_localize(None).normalize()
+    return panel, benchmark
+
+def test_matches_per_symbol_loop(panel):
+    prices, benchmark = panel
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        metrics = risk_metrics(prices, benchmark, confidence=CONFIDENCE)
+    
+    for symbol in prices.columns:
+        expected = reference_metrics(prices[symbol], benchmark)
+        for column in METRIC_COLUMNS:
+            assert metrics.loc[symbol, column] == pytest.approx(expected[column], rel=1e-9, nan_ok=True), \
+                f"{symbol} {column}"
+
+def test_all_nan_symbol_yields_nan_metrics_without_warnings(panel):
+    prices, benchmark = panel
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        metrics = risk_metrics(prices[['EMPTY']], benchmark)
+    assert metrics.loc['EMPTY', 'observations'] == 0
+    assert metrics.loc['EMPTY'].drop('observations').isna().all()
+
+def test_single_symbol_equals_its_panel_column(panel):
+    prices, benchmark = panel
+    together = risk_metrics(prices, benchmark)
+    alone = risk_metrics(prices['AAA'], benchmark)
+    pd.testing.assert_series_equal(alone.iloc[0], together.loc['AAA'], check_names=False)
@@ -0,0 +1,144 @@
+"""
+Rule ladders score exactly like the if/elif chains they replaced, boundaries included
+"""
+import itertools
+import pytest
+from analyzers.rules import evaluate_rule, score_universe
+
+def legacy_revenue_growth(info):
+    growth = info.get('revenueGrowth', 0) * 100
+    if growth > 20:
+        return 85
+    elif growth > 10:
+        return 70
+    elif growth > 0:
+        return 55
+    elif growth > -5:
+        return 40
+    return 25
+
+def legacy_balance_sheet(info):
+    debt_to_equity = info.get('debtToEquity', 0)
+    current_ratio = info.get('currentRatio', 0)
+    if debt_to_equity < 50:
+        score = 85
+    elif debt_to_equity < 100:
+        score = 65
+    elif debt_to_equity < 200:
+        score = 45
+    else:
+        score = 25
+    if current_ratio > 2:
+        score = min(100, score + 10)
+    elif current_ratio < 1:
+        score = max(0, score - 15)
+    return score
+
+def legacy_pe_pb(info):
+    pe_ratio = info.get('trailingPE', 0)
+    pb_ratio = info.get('priceToBook', 0)
+    score = 50
+    if pe_ratio > 0:
+        if pe_ratio < 15:
+            score = 80
+        elif pe_ratio < 25:
+            score = 60
+        elif pe_ratio < 40:
+            score = 40
+        else:
+            score = 25
+    if pb_ratio > 0:
+        if pb_ratio < 1:
+            score = min(100, score + 15)
+        elif pb_ratio > 5:
+            score = max(0, score - 10)
+    return score
+
+def legacy_peer_valuation(info):
+    ps_ratio = info.get('priceToSalesTrailing12Months', 0)
+    peg_ratio = info.get('pegRatio', 0)
+    score = 50
+    if ps_ratio > 0:
+        if ps_ratio < 2:
+            score = 75
+        elif ps_ratio < 5:
+            score = 55
+        else:
+            score = 35
+    if peg_ratio > 0:
+        if peg_ratio < 1:
+            score = min(100, score + 15)
+        elif peg_ratio > 2:
+            score = max(0, score - 10)
+    return score
+
+def legacy_dividend(info):
+    dividend_yield = info['dividendYield'] * 100 if info.get('dividendYield') else 0
+    payout_ratio = info['payoutRatio'] * 100 if info.get('payoutRatio') else 0
+    if dividend_yield <= 0:
+        return 45
+    if dividend_yield > 4:
+        score = 85
+    elif dividend_yield > 2:
+        score = 70
+    else:
+        score = 55
+    if payout_ratio > 0:
+        if payout_ratio > 80:
+            score = max(0, score - 15)
+        elif payout_ratio < 60:
+            score = min(100, score + 10)
+    return score
+
+def legacy_range_position(info):
+    price, high, low = info['currentPrice'], info['fiftyTwoWeekHigh'], info['fiftyTwoWeekLow']
+    position = (price - low) / (high - low) * 100
+    if position < 25:
+        return 85
+    elif position < 50:
+        return 65
+    elif position < 75:
+        return 45
+    return 25
+
+# Each field sampled on and either side of every breakpoint
+CASES = {
+    'revenue_growth': (legacy_revenue_growth, {
+        'revenueGrowth': [-0.06, -0.05, -0.04, 0.0, 0.05, 0.10, 0.15, 0.20, 0.25]}),
+    'balance_sheet': (legacy_balance_sheet, {
+        'debtToEquity': [0, 49, 50, 99, 100, 199, 200, 300],
+        'currentRatio': [0, 0.5, 1, 1.5, 2, 2.5]}),
+    'pe_pb': (legacy_pe_pb, {
+        'trailingPE': [-5, 0, 10, 15, 20, 25, 30, 40, 50],
+        'priceToBook': [-1, 0, 0.5, 1, 3, 5, 6]}),
+    'peer_valuation': (legacy_peer_valuation, {
+        'priceToSalesTrailing12Months': [-1, 0, 1, 2, 3, 5, 8],
+        'pegRatio': [-1, 0, 0.5, 1, 1.5, 2, 3]}),
+    'dividend': (legacy_dividend, {
+        'dividendYield': [0, 0.01, 0.02, 0.03, 0.04, 0.05],
+        'payoutRatio': [0, 0.5, 0.6, 0.7, 0.8, 0.9]}),
+    'range_position': (legacy_range_position, {
+        'currentPrice': [100, 125, 150, 175, 200],
+        'fiftyTwoWeekLow': [100], 'fiftyTwoWeekHigh': [200]}),
+}
+
+def _infos(fields):
+    names = list(fields)
+    return [dict(zip(names, values)) for values in itertools.product(*fields.values())]
+
+@pytest.mark.parametrize('rule', list(CASES))
+def test_single_symbol_matches_legacy_chain(rule):
+    legacy, fields = CASES[rule]
+    for info in _infos(fields):
+        assert evaluate_rule(rule, info)[0] == legacy(info), info
+
+@pytest.mark.parametrize('rule', list(CASES))
+def test_universe_matches_legacy_chain(rule):
+    legacy, fields = CASES[rule]
+    infos = {f"S{i}": info for i, info in enumerate(_infos(fields))}
+    scores = score_universe(infos)[f'{rule}_score']
+    assert scores.to_dict() == {symbol: legacy(info) for symbol, info in infos.items()}
+
+def test_payout_notes_follow_strict_boundaries():
+    assert evaluate_rule('dividend', {'dividendYield': 0.03, 'payoutRatio': 0.8})[1] == 'Good dividend yield'
+    assert evaluate_rule('dividend', {'dividendYield': 0.03, 'payoutRatio': 0.81})[1].endswith('sustainability concern)')
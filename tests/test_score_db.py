@@ -0,0 +1,97 @@
+"""
+ScoreDatabase: every run kept, latest-run queries and schema recovery
+"""
+import os
+import sqlite3
+from datetime import datetime
+from utils.score_db import ScoreDatabase
+
+CATEGORIES = ['fundamental', 'valuation', 'sentiment']
+
+def analysis(symbol, overall, question_scores=(60.0, 55.0, None)):
+    results = [{'question_en': f"Question {i}", 'question_zh': f"问题 {i}", 'score': score}
+               for i, score in enumerate(question_scores, 1)]
+    return {
+        'symbol': symbol,
+        'company_name': f"{symbol} Corp",
+        'results': results,
+        'summary': {
+            'overall_score': overall,
+            'recommendation_en': 'Buy' if overall >= 60 else 'Hold',
+            'confidence': 'Medium',
+            'category_scores': {'fundamental': overall + 1, 'valuation': overall - 1, 'sentiment': overall},
+        },
+    }
+
+def save(db, symbol, overall, when, **kwargs):
+    db.save(analysis(symbol, overall, **kwargs), CATEGORIES, when=datetime.fromisoformat(when))
+
+def test_every_run_of_a_day_is_kept(tmp_path):
+    db = ScoreDatabase(str(tmp_path / 'scores.db'))
+    save(db, 'AAA', 50.0, '2026-03-02T09:30:00')
+    save(db, 'AAA', 62.0, '2026-03-02T16:00:00')
+    save(db, 'AAA', 58.0, '2026-03-03T09:30:00')
+    
+    history = db.score_history('aaa')
+    assert list(history['overall_score']) == [50.0, 62.0, 58.0]
+    assert list(history['run_date']) == ['2026-03-02', '2026-03-02', '2026-03-03']
+    assert list(history['fundamental']) == [51.0, 63.0, 59.0]
+    assert len(db.score_history('AAA', start='2026-03-03')) == 1
+
+def test_top_uses_each_symbols_latest_run_of_the_day(tmp_path):
+    db = ScoreDatabase(str(tmp_path / 'scores.db'))
+    save(db, 'AAA', 90.0, '2026-03-02T09:30:00')
+    save(db, 'AAA', 40.0, '2026-03-02T16:00:00')
+    save(db, 'BBB', 70.0, '2026-03-02T12:00:00')
+    save(db, 'CCC', 99.0, '2026-03-01T12:00:00')
+    
+    top = db.top(10)
+    assert db.latest_date() == '2026-03-02'
+    assert list(top['symbol']) == ['BBB', 'AAA']
+    assert list(top['overall_score']) == [70.0, 40.0]
+    assert list(db.top(1, '2026-03-01')['symbol']) == ['CCC']
+
+def test_previous_score_picks_the_latest_earlier_run(tmp_path):
+    db = ScoreDatabase(str(tmp_path / 'scores.db'))
+    assert db.previous_score('AAA') is None
+    save(db, 'AAA', 50.0, '2026-03-01T09:30:00')
+    save(db, 'AAA', 55.0, '2026-03-01T16:00:00')
+    save(db, 'AAA', 62.0, '2026-03-02T10:00:00')
+    
+    assert db.previous_score('AAA') == 62.0
+    # A bare date excludes that day's runs
+    assert db.previous_score('AAA', '2026-03-02') == 55.0
+    assert db.previous_score('AAA', '2026-03-01T12:00:00') == 50.0
+    assert db.previous_score('AAA', '2026-03-01') is None
+
+def test_question_history_round_trip(tmp_path):
+    db = ScoreDatabase(str(tmp_path / 'scores.db'))
+    save(db, 'AAA', 50.0, '2026-03-01T09:30:00', question_scores=(60.0, 55.0, None))
+    save(db, 'AAA', 52.0, '2026-03-01T16:00:00', question_scores=(65.0, 50.0, 40.0))
+    
+    questions = db.question_history('AAA')
+    assert list(questions.index) == ['2026-03-01T09:30:00', '2026-03-01T16:00:00']
+    assert questions.loc['2026-03-01T16:00:00', 3] == 40.0
+    assert questions.loc['2026-03-01T09:30:00', 1] == 60.0
+
+def test_schema_is_recreated_when_the_file_is_deleted(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    db = ScoreDatabase(path)
+    save(db, 'AAA', 50.0, '2026-03-01T09:30:00')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    
+    save(ScoreDatabase(path), 'BBB', 60.0, '2026-03-02T09:30:00')
+    assert list(db.top(5)['symbol']) == ['BBB']
+
+def test_databases_with_one_run_per_day_accept_more_runs(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    save(ScoreDatabase(path), 'AAA', 50.0, '2026-03-01T09:30:00')
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE UNIQUE INDEX idx_runs_symbol_date ON runs (symbol_id, run_date)")
+    connection.close()
+    
+    db = ScoreDatabase(path)
+    save(db, 'AAA', 55.0, '2026-03-01T16:00:00')
+    assert len(db.score_history('AAA')) == 2
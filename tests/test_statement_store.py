@@ -0,0 +1,64 @@
+"""
+StatementStore: ingest, merging across fetches and reloading partitions from disk
+"""
+import pandas as pd
+import pytest
+from utils.statement_store import StatementStore, normalize_financials
+
+def statements(provider, symbol):
+    ticker = provider.ticker(symbol)
+    return {
+        'income_stmt': ticker.income_stmt,
+        'quarterly_income': ticker.quarterly_income_stmt,
+    }
+
+def rows(long):
+    return long.astype({'symbol': str, 'statement': str, 'line_item': str, 'frequency': str}).sort_values(
+        ['symbol', 'statement', 'frequency', 'line_item', 'period_end'], ignore_index=True)
+
+def test_ingest_persists_the_normalized_rows(provider, tmp_path):
+    financials = statements(provider, 'AAA')
+    store = StatementStore(str(tmp_path))
+    stored = store.ingest('aaa', financials)
+    
+    pd.testing.assert_frame_equal(rows(stored), rows(normalize_financials('AAA', financials)))
+    assert store.symbols() == ['AAA']
+    # Nothing to store leaves the partition alone
+    assert store.ingest('AAA', {}).empty
+    pd.testing.assert_frame_equal(rows(store.load()), rows(stored))
+
+def test_fetches_merge_into_the_partition(provider, tmp_path):
+    financials = statements(provider, 'AAA')
+    quarterly = financials['quarterly_income']
+    newest, oldest = quarterly.columns[0], quarterly.columns[-1]
+    store = StatementStore(str(tmp_path))
+    
+    # The first fetch predates the newest quarter; the second has lost the oldest one
+    # and restates revenue for a quarter both fetches cover
+    store.ingest('AAA', {'quarterly_income': quarterly.drop(columns=newest)})
+    restated = quarterly.drop(columns=oldest)
+    restated.loc['Total Revenue', quarterly.columns[1]] += 1000.0
+    store.ingest('AAA', {'quarterly_income': restated})
+    
+    merged = store.load(['AAA'])
+    assert not merged.duplicated(['statement', 'line_item', 'period_end', 'frequency']).any()
+    assert set(merged['period_end']) == set(pd.to_datetime(quarterly.columns))
+    revenue = merged[merged['line_item'] == 'Total Revenue'].set_index('period_end')['value']
+    assert revenue[pd.Timestamp(quarterly.columns[1])] == pytest.approx(
+        quarterly.loc['Total Revenue', quarterly.columns[1]] + 1000.0)
+    assert revenue[pd.Timestamp(oldest)] == pytest.approx(quarterly.loc['Total Revenue', oldest])
+    pd.testing.assert_frame_equal(rows(merged), rows(normalize_financials('AAA', {
+        'quarterly_income': pd.concat([restated, quarterly[[oldest]]], axis=1)})))
+
+def test_reload_from_disk_spans_every_symbol(provider, tmp_path):
+    expected = {symbol: StatementStore(str(tmp_path)).ingest(symbol, statements(provider, symbol))
+                for symbol in ('AAA', 'BBB')}
+    
+    # A fresh store (as in a new process) reads the partitions back
+    store = StatementStore(str(tmp_path))
+    assert store.symbols() == ['AAA', 'BBB']
+    loaded = store.load()
+    assert isinstance(loaded['line_item'].dtype, pd.CategoricalDtype)
+    assert set(loaded['symbol'].cat.categories) == {'AAA', 'BBB'}
+    pd.testing.assert_frame_equal(rows(loaded), rows(pd.concat(expected.values(), ignore_index=True)))
+    pd.testing.assert_frame_equal(rows(store.load(['BBB', 'ZZZ'])), rows(expected['BBB']))
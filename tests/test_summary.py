@@ -0,0 +1,51 @@
+"""
+UniverseSummary: sketch quantiles and the bounded top/bottom lists against exact answers
+"""
+import numpy as np
+import pytest
+import config
+from utils.summary import ScoreSketch, UniverseSummary
+
+def analysis(symbol, score, categories):
+    return {
+        'symbol': symbol,
+        'company_name': f"{symbol} Inc.",
+        'summary': {'overall_score': score, 'recommendation_en': 'Hold', 'category_scores': categories}
+    }
+
+@pytest.mark.parametrize('bin_width', [0.5, 2.0])
+def test_sketch_quantiles_within_one_bin_of_numpy(bin_width):
+    rng = np.random.default_rng(7)
+    # Clumped at the ends of the range as well as spread through it
+    scores = np.concatenate([rng.normal(55, 15, 4000).clip(0, 100), np.zeros(50), np.full(50, 100.0)])
+    sketch = ScoreSketch(bin_width)
+    for score in scores:
+        sketch.add(score)
+    
+    qs = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+    assert np.abs(np.array(sketch.quantiles(qs)) - np.quantile(scores, qs)).max() <= bin_width
+    assert sketch.count == len(scores)
+    assert sketch.mean == pytest.approx(scores.mean())
+    assert (sketch.minimum, sketch.maximum) == (scores.min(), scores.max())
+
+def test_empty_sketch_has_no_quantiles():
+    assert all(np.isnan(q) for q in ScoreSketch().quantiles([0.1, 0.5]))
+
+def test_top_and_bottom_lists_match_a_sort():
+    rng = np.random.default_rng(11)
+    # Rounded so ties occur; they break on the symbol
+    scores = {f"S{i:04d}": round(float(rng.uniform(0, 100)), 0) for i in range(2000)}
+    previous = {symbol: round(float(rng.uniform(0, 100)), 0) for symbol in list(scores)[::2]}
+    summary = UniverseSummary(top_n=10, previous_scores=previous.get)
+    for symbol, score in scores.items():
+        summary.add(analysis(symbol, score, {category: score for category in config.WEIGHTS}))
+    
+    highest = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)[:10]
+    assert [(symbol, key) for key, symbol, _ in summary.highest.items()] == highest
+    lowest = sorted(scores.items(), key=lambda item: (-item[1], item[0]), reverse=True)[:10]
+    assert [(symbol, -key) for key, symbol, _ in summary.lowest.items()] == lowest
+    
+    changes = {symbol: scores[symbol] - before for symbol, before in previous.items()}
+    gainers = sorted(changes.items(), key=lambda item: (item[1], item[0]), reverse=True)[:10]
+    assert [(symbol, key) for key, symbol, _ in summary.gainers.items()] == gainers
+    assert summary.analyzed == len(scores)
@@ -0,0 +1,61 @@
+"""
+TTM engine on simulated quarterly statements: sums, growth and the consecutive-quarter rule
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from analyzers.ttm import ttm_frame, ttm_fundamentals, ttm_for_symbol
+from utils.statement_store import normalize_financials
+
+def statements(provider, symbol):
+    ticker = provider.ticker(symbol)
+    return {
+        'quarterly_income': ticker.quarterly_income_stmt,
+        'quarterly_cashflow': ticker.quarterly_cashflow,
+    }
+
+def revenue(financials):
+    # Oldest quarter first
+    return financials['quarterly_income'].loc['Total Revenue'].sort_index()
+
+def test_latest_quarter_sums_and_growth(provider):
+    financials = statements(provider, 'AAA')
+    quarters = revenue(financials)
+    ttm = ttm_for_symbol(normalize_financials('AAA', financials), 'AAA')
+    
+    assert ttm['quarters'] == 5
+    assert ttm['latest_quarter'] == quarters.index[-1]
+    assert ttm['ttm_revenue'] == pytest.approx(quarters.iloc[-4:].sum())
+    assert ttm['revenue_qoq'] == pytest.approx((quarters.iloc[-1] - quarters.iloc[-2]) / abs(quarters.iloc[-2]) * 100)
+    assert ttm['revenue_yoy'] == pytest.approx((quarters.iloc[-1] - quarters.iloc[-5]) / abs(quarters.iloc[-5]) * 100)
+    # Eight quarters are needed for TTM-over-TTM growth
+    assert np.isnan(ttm['ttm_revenue_yoy'])
+    gross = financials['quarterly_income'].loc['Gross Profit'].sort_index().iloc[-4:].sum()
+    assert ttm['ttm_gross_margin'] == pytest.approx(gross / quarters.iloc[-4:].sum() * 100)
+
+def test_missing_quarter_breaks_the_window(provider):
+    financials = statements(provider, 'AAA')
+    # Drop the second-newest quarter: the last four rows now span five quarters
+    gap = {key: frame.drop(columns=frame.columns[1]) for key, frame in financials.items()}
+    frame = ttm_frame(normalize_financials('AAA', gap)).loc['AAA']
+    
+    latest = frame.iloc[-1]
+    assert np.isnan(latest['ttm_revenue'])
+    assert np.isnan(latest['revenue_qoq'])
+    # The quarter a year back is still exactly four quarters earlier
+    quarters = revenue(gap)
+    assert latest['revenue_yoy'] == pytest.approx((quarters.iloc[-1] - quarters.iloc[-4]) / abs(quarters.iloc[-4]) * 100)
+    # Before the gap, consecutive quarters still chain
+    assert frame['revenue_qoq'].iloc[1:3].notna().all()
+
+def test_batch_matches_single_symbol(provider):
+    long = pd.concat([normalize_financials(s, statements(provider, s)) for s in ('AAA', 'BBB')],
+                     ignore_index=True)
+    batch = ttm_fundamentals(long)
+    assert list(batch.index) == ['AAA', 'BBB']
+    for symbol in ('AAA', 'BBB'):
+        single = ttm_for_symbol(normalize_financials(symbol, statements(provider, symbol)), symbol)
+        pd.testing.assert_series_equal(batch.loc[symbol], pd.Series(single, name=symbol), check_dtype=False)
+
+def test_no_quarterly_statements_gives_empty_result():
+    assert ttm_for_symbol(normalize_financials('AAA', {}), 'AAA') == {}
@@ -0,0 +1,103 @@
+"""
+WatchlistDaemon: budgeted refreshes, shared fetchers and watchlist validation
+"""
+import time
+import pytest
+from unittest import mock
+import config
+from watchlist_daemon import WatchlistDaemon, load_watchlist
+from utils.data_fetcher import get_fetcher
+from utils.memory_cache import memory_cache
+
+def test_rescoring_fetches_nothing_outside_the_budget(provider, monkeypatch):
+    monkeypatch.setattr(config, 'INCLUDE_CHARTS', True)
+    monkeypatch.setattr(config, 'PERSIST_SCORES', False)
+    monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', False)
+    daemon = WatchlistDaemon({'AAA': 1.0, 'BBB': 2.0}, fetches_per_minute=10000)
+    
+    with mock.patch.object(WatchlistDaemon, '_rescore', autospec=True,
+                           side_effect=WatchlistDaemon._rescore) as rescore:
+        before = {}
+        original = rescore.side_effect
+        
+        def counted(self, symbol, *args):
+            before[symbol] = provider.stats.snapshot()['requests']
+            result = original(self, symbol, *args)
+            assert provider.stats.snapshot()['requests'] == before[symbol], f"{symbol} rescore hit upstream"
+            return result
+        rescore.side_effect = counted
+        daemon.tick()
+    
+    assert set(before) == {'AAA', 'BBB'}
+    assert daemon.fetchers['AAA'] is get_fetcher('AAA')
+    assert (config.RISK_PARAMS['benchmark'], 'benchmark') in daemon.last_refresh
+
+def refreshed_datasets(daemon):
+    """Run one tick; returns the datasets it refreshed and the symbols it rescored"""
+    refreshed, rescored = [], []
+    refresh, rescore = daemon._refresh, daemon._rescore
+    
+    def spy_refresh(symbol, dataset):
+        refreshed.append((symbol, dataset))
+        return refresh(symbol, dataset)
+    
+    def spy_rescore(symbol, *args):
+        rescored.append(symbol)
+        return rescore(symbol, *args)
+    with mock.patch.object(daemon, '_refresh', spy_refresh), mock.patch.object(daemon, '_rescore', spy_rescore):
+        daemon.tick()
+    return refreshed, rescored
+
+def test_tick_after_fetcher_replacement_refetches_only_due_datasets(provider, monkeypatch):
+    monkeypatch.setattr(config, 'PERSIST_SCORES', False)
+    monkeypatch.setattr(config, 'PERSIST_SCORE_HISTORY', False)
+    daemon = WatchlistDaemon({'AAA': 1.0}, fetches_per_minute=10000)
+    daemon.tick()
+    
+    # An hour and a minute later: every registry fetcher has aged out
+    elapsed = 61 * 60
+    for item in daemon.last_refresh:
+        daemon.last_refresh[item] -= elapsed
+    for fetcher in daemon.fetchers.values():
+        fetcher.created_at -= elapsed
+    old = daemon.fetchers['AAA']
+    
+    refreshed, rescored = refreshed_datasets(daemon)
+    assert daemon.fetchers['AAA'] is not old
+    datasets = {dataset for _, dataset in refreshed}
+    assert datasets == {'info', 'history', 'news', 'benchmark'}
+    assert rescored == ['AAA']
+
+def test_evicted_dataset_is_requeued_before_rescoring(provider):
+    daemon = WatchlistDaemon({'AAA': 1.0}, fetches_per_minute=10000)
+    daemon.tick()
+    assert daemon._is_ready('AAA')
+    
+    memory_cache.pop(daemon.fetchers['AAA']._namespace, 'holders')
+    assert not daemon._is_ready('AAA')
+    assert [item[3] for item in daemon.due_items(time.time())] == ['holders']
+    
+    # Disk-backed datasets stay readable after eviction
+    memory_cache.pop(daemon.fetchers['AAA']._namespace, 'financials')
+    assert [item[3] for item in daemon.due_items(time.time())] == ['holders']
+
+def test_financials_refresh_bypasses_the_filing_cache(provider):
+    fetcher = get_fetcher('AAA')
+    fetcher.get_stock_info()
+    fetcher.get_financials()
+    before = provider.stats.snapshot()['requests']
+    fetcher.invalidate('financials')
+    fetcher.get_financials()
+    assert provider.stats.snapshot()['requests'] - before == 6
+
+@pytest.mark.parametrize('weight', ['0', '-1', 'nan'])
+def test_non_positive_importance_is_rejected(tmp_path, weight):
+    path = tmp_path / 'watchlist.txt'
+    path.write_text(f"AAPL\nMSFT,{weight}\n")
+    with pytest.raises(ValueError):
+        load_watchlist(str(path))
+
+def test_importance_defaults_to_one(tmp_path):
+    path = tmp_path / 'watchlist.txt'
+    path.write_text("aapl  # core\nMSFT,2.5\n\n")
+    assert load_watchlist(str(path)) == {'AAPL': 1.0, 'MSFT': 2.5}
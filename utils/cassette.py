@@ -0,0 +1,210 @@
+"""
+Record/replay cassettes of upstream ticker traffic for offline, deterministic runs
+"""
+from typing import Dict, Any, Optional, Callable
+from datetime import datetime
+import copy
+import gzip
+import json
+import os
+import pickle
+import threading
+import time
+import pandas as pd
+import yfinance as yf
+from utils.history_store import PERIOD_OFFSETS, period_start
+
+# yf.Ticker properties DataFetcher reads (history() is a method and recorded per call)
+RECORDED_ATTRIBUTES = (
+    'info', 'income_stmt', 'balance_sheet', 'cashflow',
+    'quarterly_income_stmt', 'quarterly_balance_sheet', 'quarterly_cashflow',
+    'dividends', 'recommendations', 'news',
+    'major_holders', 'institutional_holders', 'mutualfund_holders',
+    'earnings', 'quarterly_earnings',
+)
+
+class CassetteMiss(LookupError):
+    """The cassette has no recording for a requested dataset"""
+
+def cassette_path(directory: str, symbol: str) -> str:
+    return os.path.join(directory, f"{symbol.upper()}.pkl.gz")
+
+def history_key(kwargs: Dict[str, Any]) -> str:
+    return 'history:' + json.dumps(kwargs, sort_keys=True, default=str)
+
+def load_cassette(path: str) -> Dict[str, Any]:
+    """Read one cassette: {'symbol', 'recorded_at', 'entries': {key: {'value', 'latency'}}}"""
+    with gzip.open(path, 'rb') as f:
+        return pickle.load(f)
+
+def save_cassette(path: str, cassette: Dict[str, Any]):
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(temp_path, 'wb', compresslevel=6) as f:
+        pickle.dump(cassette, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+class CassetteRecorder:
+    """
+    Ticker factory that passes every request to the real provider and records
+    the response and its latency into one compressed cassette per symbol.
+    Cassettes are rewritten after each new response, so an interrupted run
+    keeps everything recorded so far.
+    
+    Install with data_fetcher.set_ticker_factory(recorder.ticker).
+    """
+    
+    def __init__(self, directory: str, factory: Optional[Callable[[str], Any]] = None):
+        self.directory = directory
+        self.factory = factory or yf.Ticker
+        self._cassettes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def ticker(self, symbol: str) -> 'RecordingTicker':
+        return RecordingTicker(symbol.upper(), self.factory(symbol), self)
+    
+    def record(self, symbol: str, key: str, value: Any, latency: float):
+        with self._lock:
+            cassette = self._cassettes.get(symbol)
+            if cassette is None:
+                path = cassette_path(self.directory, symbol)
+                # Add to an existing recording rather than starting over
+                cassette = load_cassette(path) if os.path.exists(path) else {'symbol': symbol, 'entries': {}}
+                self._cassettes[symbol] = cassette
+            cassette['entries'][key] = {'value': value, 'latency': latency}
+            cassette['recorded_at'] = datetime.now().isoformat(timespec='seconds')
+            save_cassette(cassette_path(self.directory, symbol), cassette)
+
+class RecordingTicker:
+    """Wraps a real ticker; recorded attributes and history() calls are captured"""
+    
+    def __init__(self, symbol: str, inner: Any, recorder: CassetteRecorder):
+        self.ticker = symbol
+        self._inner = inner
+        self._recorder = recorder
+    
+    def _capture(self, key: str, fn: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        value = fn()
+        self._recorder.record(self.ticker, key, value, time.perf_counter() - started)
+        return value
+    
+    def history(self, **kwargs) -> pd.DataFrame:
+        return self._capture(history_key(kwargs), lambda: self._inner.history(**kwargs))
+    
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if name in RECORDED_ATTRIBUTES:
+            return self._capture(name, lambda: getattr(self._inner, name))
+        return getattr(self._inner, name)
+
+class CassettePlayer:
+    """
+    Ticker factory that serves recorded responses, never touching the network.
+    
+    history() calls are matched exactly when possible; otherwise every recorded
+    bar for the symbol is merged and sliced to the requested range, with
+    periods measured back from the last recorded bar so results do not depend
+    on today's date.
+    
+    Install with data_fetcher.set_ticker_factory(player.ticker).
+    """
+    
+    def __init__(self, directory: str, latency_scale: float = 0.0):
+        """
+        Args:
+            directory: Cassette directory written by CassetteRecorder
+            latency_scale: Sleep this multiple of each recorded latency (0 = replay instantly)
+        """
+        self.directory = directory
+        self.latency_scale = latency_scale
+        self.stats = {'hits': 0, 'misses': 0}
+        self._cassettes: Dict[str, Dict[str, Any]] = {}
+        self._bars: Dict[str, Optional[pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+    
+    def ticker(self, symbol: str) -> 'ReplayTicker':
+        return ReplayTicker(symbol.upper(), self)
+    
+    def _cassette(self, symbol: str) -> Dict[str, Any]:
+        with self._lock:
+            if symbol not in self._cassettes:
+                path = cassette_path(self.directory, symbol)
+                self._cassettes[symbol] = (load_cassette(path) if os.path.exists(path)
+                                           else {'symbol': symbol, 'entries': {}})
+            return self._cassettes[symbol]
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+    
+    def _replay(self, entry: Dict[str, Any]) -> Any:
+        if self.latency_scale > 0:
+            time.sleep(entry['latency'] * self.latency_scale)
+        self._count('hits')
+        # Callers may modify what they get back; the cassette must stay as recorded
+        return copy.deepcopy(entry['value'])
+    
+    def serve(self, symbol: str, key: str) -> Any:
+        entry = self._cassette(symbol)['entries'].get(key)
+        if entry is None:
+            self._count('misses')
+            raise CassetteMiss(f"No recording of {key} for {symbol}")
+        return self._replay(entry)
+    
+    def serve_history(self, symbol: str, kwargs: Dict[str, Any]) -> pd.DataFrame:
+        entries = self._cassette(symbol)['entries']
+        entry = entries.get(history_key(kwargs))
+        if entry is not None:
+            return self._replay(entry)
+        
+        bars = self._all_bars(symbol, entries)
+        if bars is None:
+            self._count('misses')
+            raise CassetteMiss(f"No recorded price history for {symbol}")
+        
+        period = kwargs.get('period')
+        if period in PERIOD_OFFSETS:
+            bars = bars.loc[bars.index >= period_start(period, bars.index[-1])]
+        if kwargs.get('start') is not None:
+            bars = bars.loc[bars.index >= _localize(kwargs['start'], bars.index)]
+        if kwargs.get('end') is not None:
+            bars = bars.loc[bars.index < _localize(kwargs['end'], bars.index)]
+        
+        latencies = [e['latency'] for k, e in entries.items() if k.startswith('history:')]
+        return self._replay({'value': bars, 'latency': sorted(latencies)[len(latencies) // 2]})
+    
+    def _all_bars(self, symbol: str, entries: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """Union of every recorded history response, newest recording winning on overlap"""
+        with self._lock:
+            if symbol not in self._bars:
+                frames = [e['value'] for k, e in entries.items()
+                          if k.startswith('history:') and isinstance(e['value'], pd.DataFrame) and not e['value'].empty]
+                if frames:
+                    merged = pd.concat(frames)
+                    self._bars[symbol] = merged[~merged.index.duplicated(keep='last')].sort_index()
+                else:
+                    self._bars[symbol] = None
+            return self._bars[symbol]
+
+def _localize(value: Any, index: pd.DatetimeIndex) -> pd.Timestamp:
+    timestamp = pd.Timestamp(value)
+    if index.tz is not None and timestamp.tz is None:
+        return timestamp.tz_localize(index.tz)
+    return timestamp
+
+class ReplayTicker:
+    """Stand-in for yf.Ticker that answers from a CassettePlayer"""
+    
+    def __init__(self, symbol: str, player: CassettePlayer):
+        self.ticker = symbol
+        self._player = player
+    
+    def history(self, **kwargs) -> pd.DataFrame:
+        return self._player.serve_history(self.ticker, kwargs)
+    
+    def __getattr__(self, name: str) -> Any:
+        if name in RECORDED_ATTRIBUTES:
+            return self._player.serve(self.ticker, name)
+        raise AttributeError(name)
@@ -0,0 +1,255 @@
+"""
+Chart rendering - price/SMA, volume, RSI and MACD panels as standalone SVG
+"""
+from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import multiprocessing
+import os
+import threading
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator
+from ta.trend import MACD
+import config
+
+# Bump when the drawing changes so existing charts are re-rendered
+CHART_VERSION = 1
+
+COLORS = {
+    'close': '#1f2937', 'sma_20': '#2563eb', 'sma_50': '#f59e0b', 'sma_200': '#dc2626',
+    'volume': '#94a3b8', 'rsi': '#7c3aed', 'macd': '#2563eb', 'signal': '#f59e0b',
+    'hist_up': '#16a34a', 'hist_down': '#dc2626', 'grid': '#e5e7eb', 'text': '#374151'
+}
+
+def data_hash(symbol: str, history: pd.DataFrame) -> str:
+    """Digest of everything a chart is drawn from"""
+    params = config.CHART_PARAMS
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{CHART_VERSION}|{symbol}|{params['display_bars']}|{params['width']}".encode())
+    digest.update(history.index.asi8.tobytes())
+    for column in ('Close', 'Volume'):
+        digest.update(np.ascontiguousarray(history[column].to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+def indicator_frame(history: pd.DataFrame) -> pd.DataFrame:
+    """Close, SMA20/50/200, volume, RSI(14) and MACD(12, 26, 9), computed over the full history"""
+    close = history['Close'].astype(float)
+    macd = MACD(close=close)
+    return pd.DataFrame({
+        'close': close,
+        'sma_20': close.rolling(20).mean(),
+        'sma_50': close.rolling(50).mean(),
+        'sma_200': close.rolling(200).mean(),
+        'volume': history['Volume'].astype(float),
+        'rsi': RSIIndicator(close=close, window=14).rsi(),
+        'macd': macd.macd(),
+        'signal': macd.macd_signal(),
+        'hist': macd.macd_diff()
+    }, index=history.index)
+
+def _line_path(x: np.ndarray, y: np.ndarray) -> str:
+    """SVG path for a series; NaN gaps start a new subpath"""
+    valid = np.isfinite(y)
+    if not valid.any():
+        return ''
+    starts = valid & ~np.concatenate(([False], valid[:-1]))
+    commands = np.where(starts, 'M', 'L')[valid]
+    return ''.join(f"{c}{px:.1f},{py:.1f}" for c, px, py in zip(commands, x[valid], y[valid]))
+
+def _bar_path(x: np.ndarray, y_from: np.ndarray, y_to) -> str:
+    """Vertical bars drawn as one stroked path"""
+    y_to = np.broadcast_to(y_to, y_from.shape)
+    valid = np.isfinite(y_from)
+    return ''.join(f"M{px:.1f},{a:.1f}V{b:.1f}" for px, a, b in zip(x[valid], y_to[valid], y_from[valid]))
+
+class _Panel:
+    """Vertical band of the chart with its own y scale"""
+    
+    def __init__(self, top: float, height: float, low: float, high: float):
+        self.top, self.height = top, height
+        if not np.isfinite(low) or not np.isfinite(high) or high <= low:
+            low, high = (low - 1, low + 1) if np.isfinite(low) else (0.0, 1.0)
+        self.low, self.high = low, high
+    
+    def y(self, values) -> np.ndarray:
+        return self.top + self.height * (self.high - np.asarray(values, dtype=float)) / (self.high - self.low)
+
+def render_svg(symbol: str, history: pd.DataFrame, digest: str = '',
+               params: Optional[Dict[str, Any]] = None) -> str:
+    """Complete SVG document for one symbol"""
+    params = params or config.CHART_PARAMS
+    frame = indicator_frame(history).iloc[-params['display_bars']:]
+    width, margin = params['width'], 60
+    n = len(frame)
+    x = margin + (width - 2 * margin) * (np.arange(n) + 0.5) / max(n, 1)
+    bar_width = max(1.0, 0.7 * (width - 2 * margin) / max(n, 1))
+    
+    price_cols = ['close', 'sma_20', 'sma_50', 'sma_200']
+    prices = frame[price_cols].to_numpy()
+    price = _Panel(40, 280, np.nanmin(prices), np.nanmax(prices))
+    volume = _Panel(330, 70, 0.0, np.nanmax(frame['volume'].to_numpy()))
+    rsi = _Panel(420, 90, 0.0, 100.0)
+    macd_values = frame[['macd', 'signal', 'hist']].to_numpy()
+    macd_extent = np.nanmax(np.abs(macd_values)) if np.isfinite(macd_values).any() else 1.0
+    macd = _Panel(530, 110, -macd_extent, macd_extent)
+    height = 660
+    
+    parts = [
+        f"<!-- data:{digest} -->",
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="11">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        f'<text x="{margin}" y="22" font-size="15" fill="{COLORS["text"]}">{symbol}</text>',
+    ]
+    if n:
+        first, last = frame.index[0], frame.index[-1]
+        parts.append(f'<text x="{width - margin}" y="22" text-anchor="end" fill="{COLORS["text"]}">'
+                     f'{first:%Y-%m-%d} – {last:%Y-%m-%d}  close {frame["close"].iloc[-1]:.2f}</text>')
+    
+    # Panel frames and axis labels
+    for panel, label, fmt in ((price, 'Price', '.2f'), (volume, 'Volume', 'volume'), (rsi, 'RSI', '.0f'),
+                              (macd, 'MACD', '.2f')):
+        parts.append(f'<rect x="{margin}" y="{panel.top}" width="{width - 2 * margin}" height="{panel.height}" '
+                     f'fill="none" stroke="{COLORS["grid"]}"/>')
+        parts.append(f'<text x="{margin - 6}" y="{panel.top + 10}" text-anchor="end" fill="{COLORS["text"]}">'
+                     f'{_format_axis(panel.high, fmt)}</text>')
+        parts.append(f'<text x="{margin - 6}" y="{panel.top + panel.height}" text-anchor="end" '
+                     f'fill="{COLORS["text"]}">{_format_axis(panel.low, fmt)}</text>')
+        parts.append(f'<text x="{width - margin + 6}" y="{panel.top + 10}" fill="{COLORS["text"]}">{label}</text>')
+    
+    for level in (config.TECHNICAL_PARAMS['rsi_oversold'], config.TECHNICAL_PARAMS['rsi_overbought']):
+        parts.append(f'<path d="M{margin},{rsi.y(level):.1f}H{width - margin}" stroke="{COLORS["grid"]}" '
+                     f'stroke-dasharray="4 3"/>')
+    parts.append(f'<path d="M{margin},{macd.y(0):.1f}H{width - margin}" stroke="{COLORS["grid"]}"/>')
+    
+    for column in price_cols:
+        stroke = 1.6 if column == 'close' else 1.0
+        parts.append(f'<path d="{_line_path(x, price.y(frame[column]))}" fill="none" '
+                     f'stroke="{COLORS[column]}" stroke-width="{stroke}"/>')
+    parts.append(f'<path d="{_bar_path(x, volume.y(frame["volume"]), volume.y(0))}" '
+                 f'stroke="{COLORS["volume"]}" stroke-width="{bar_width:.1f}"/>')
+    parts.append(f'<path d="{_line_path(x, rsi.y(frame["rsi"]))}" fill="none" stroke="{COLORS["rsi"]}"/>')
+    
+    hist = frame['hist'].to_numpy()
+    for color, mask in (('hist_up', hist >= 0), ('hist_down', hist < 0)):
+        parts.append(f'<path d="{_bar_path(x[mask], macd.y(hist[mask]), macd.y(0))}" '
+                     f'stroke="{COLORS[color]}" stroke-width="{bar_width:.1f}"/>')
+    for column in ('macd', 'signal'):
+        parts.append(f'<path d="{_line_path(x, macd.y(frame[column]))}" fill="none" stroke="{COLORS[column]}"/>')
+    
+    # Legend
+    legend_x = margin + 60
+    for column, label in (('close', 'Close'), ('sma_20', 'SMA20'), ('sma_50', 'SMA50'), ('sma_200', 'SMA200')):
+        parts.append(f'<path d="M{legend_x},{price.top + 12}h14" stroke="{COLORS[column]}" stroke-width="2"/>'
+                     f'<text x="{legend_x + 18}" y="{price.top + 16}" fill="{COLORS["text"]}">{label}</text>')
+        legend_x += 70
+    
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+def _format_axis(value: float, fmt: str) -> str:
+    if fmt == 'volume':
+        for divisor, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'K')):
+            if abs(value) >= divisor:
+                return f"{value / divisor:.1f}{suffix}"
+        return f"{value:.0f}"
+    return format(value, fmt)
+
+def write_chart(symbol: str, history: pd.DataFrame, digest: str, path: str, params: Dict[str, Any]) -> str:
+    """Render and atomically write one chart (runs in a worker process)"""
+    svg = render_svg(symbol, history, digest, params)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(svg)
+    os.replace(temp_path, path)
+    return path
+
+class ChartRenderer:
+    """
+    Renders charts on a process pool so drawing overlaps with data fetching.
+    A chart whose stored data hash matches the current history is not redrawn.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, workers: Optional[int] = None):
+        self.directory = directory or config.CHART_PARAMS['directory']
+        self.workers = workers or config.CHART_PARAMS['workers']
+        self.stats = {'rendered': 0, 'skipped': 0, 'failed': 0}
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    def path_for(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}.svg")
+    
+    @staticmethod
+    def stored_hash(path: str) -> Optional[str]:
+        """Data hash recorded on the first line of an existing chart"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                first = f.readline()
+        except OSError:
+            return None
+        if first.startswith('<!-- data:') and first.rstrip().endswith('-->'):
+            return first.strip()[len('<!-- data:'):-len('-->')].strip()
+        return None
+    
+    def submit(self, symbol: str, history: pd.DataFrame) -> Tuple[str, Optional[Future]]:
+        """
+        Queue a chart for rendering.
+        Returns: (chart path, Future of the render, or None when the chart is already current)
+        """
+        symbol = symbol.upper()
+        path = self.path_for(symbol)
+        digest = data_hash(symbol, history)
+        if self.stored_hash(path) == digest:
+            self._count('skipped')
+            return path, None
+        
+        os.makedirs(self.directory, exist_ok=True)
+        columns = history[['Close', 'Volume']]
+        # Workers are separate processes, so they get the parameters rather than reading config
+        return path, self._executor().submit(write_chart, symbol, columns, digest, path,
+                                             dict(config.CHART_PARAMS))
+    
+    def render(self, symbol: str, history: pd.DataFrame) -> Optional[str]:
+        """Render one chart (or reuse the current one) and return its path"""
+        if history is None or history.empty or not {'Close', 'Volume'} <= set(history.columns):
+            return None
+        try:
+            path, future = self.submit(symbol, history)
+            if future is not None:
+                future.result()
+                self._count('rendered')
+            return path
+        except BrokenProcessPool as e:
+            # A worker died; start a fresh pool for the next chart
+            with self._lock:
+                self._pool = None
+            self._count('failed')
+            print(f"Error rendering chart for {symbol}: {e}")
+            return None
+        except Exception as e:
+            self._count('failed')
+            print(f"Error rendering chart for {symbol}: {e}")
+            return None
+    
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned workers: forking a process that runs fetch threads is unsafe
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+    
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+chart_renderer = ChartRenderer()
@@ -4,113 +4,207 @@ Data fetching utilities for stock information
 import yfinance as yf
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
+from collections import OrderedDict
+import itertools
 import json
 import os
+import threading
+import time
+import config
+from utils.history_store import history_store
+from utils.memory_cache import memory_cache, downcast_ohlcv
+from utils.news_store import news_store
+from utils.statement_store import statement_store
+from utils.filing_cache import filing_cache, earnings_calendar, statements_cover
+from utils.resilience import call_with_retry, is_empty
+from utils.singleflight import SingleFlight
+
+# Distinguishes fetchers of the same symbol in the shared memory cache
+_fetcher_ids = itertools.count()
+
+# Datasets loaded through the filing cache (see DataFetcher._filing)
+FILING_DATASETS = ('financials', 'earnings')
+
+# Builds the upstream ticker object for a symbol (replaced by tests and the load-test provider)
+_ticker_factory: Callable[[str], Any] = yf.Ticker
+
+def set_ticker_factory(factory: Optional[Callable[[str], Any]] = None):
+    """Use `factory(symbol)` instead of yf.Ticker for fetchers created from now on (None restores yfinance)"""
+    global _ticker_factory
+    _ticker_factory = factory or yf.Ticker
 
 class DataFetcher:
     """Centralized data fetching with caching support"""
     
     def __init__(self, symbol: str):
         self.symbol = symbol.upper()
-        self.ticker = yf.Ticker(self.symbol)
-        self._cache = {}
-        
+        self.ticker = _ticker_factory(self.symbol)
+        # Datasets live in the process-wide, byte-budgeted LRU cache under this namespace
+        self._namespace = (self.symbol, next(_fetcher_ids))
+        # Datasets whose last fetch failed: key -> error message
+        self.errors = {}
+        self.created_at = time.time()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+    
+    def _call(self, fn: Callable[[], Any], allow_empty: bool = True) -> Any:
+        """
+        Make one upstream request through the shared rate limiter, retry and circuit breaker.
+        Requests that always have data pass allow_empty=False so an empty answer is retried.
+        """
+        return call_with_retry(fn, reject_empty=not allow_empty)
+    
+    def _get(self, key: str, loader: Callable[[], Any], default: Any, label: str) -> Any:
+        """
+        Return a cached dataset, loading it on a miss.
+        Concurrent misses for the same key share a single in-flight load.
+        Failed or empty loads are never cached, so the next call retries.
+        """
+        found, value = memory_cache.get(self._namespace, key)
+        if found:
+            return value
+        try:
+            return self._flight.do(key, lambda: self._load(key, loader))
+        except Exception as e:
+            print(f"Error fetching {label}: {e}")
+            with self._lock:
+                self.errors[key] = str(e)
+            return default
+    
+    def _load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Run a loader and cache its result (called once per in-flight key)"""
+        # A flight for this key may have completed between the miss and now
+        found, value = memory_cache.get(self._namespace, key)
+        if found:
+            return value
+        value = loader()
+        if is_empty(value):
+            # Nothing worth keeping (e.g. no dividends yet); ask upstream again next time
+            return value
+        memory_cache.put(self._namespace, key, value)
+        with self._lock:
+            self.errors.pop(key, None)
+        return value
+    
     def get_stock_info(self) -> Dict[str, Any]:
         """Get basic stock information"""
-        if 'info' not in self._cache:
-            try:
-                self._cache['info'] = self.ticker.info
-            except Exception as e:
-                print(f"Error fetching stock info: {e}")
-                self._cache['info'] = {}
-        return self._cache['info']
+        return self._get('info', lambda: self._call(lambda: self.ticker.info, allow_empty=False),
+                         {}, 'stock info')
     
     def get_historical_data(self, period: str = "1y") -> Any:
-        """Get historical price data"""
-        cache_key = f'history_{period}'
-        if cache_key not in self._cache:
-            try:
-                self._cache[cache_key] = self.ticker.history(period=period)
-            except Exception as e:
-                print(f"Error fetching historical data: {e}")
-                self._cache[cache_key] = None
-        return self._cache[cache_key]
+        """Get historical price data (served from the range-aware history store when enabled)"""
+        def fetch(**kwargs):
+            # A whole period always has bars; start/end gap fills may legitimately be empty
+            return self._call(lambda: self.ticker.history(**kwargs), allow_empty='period' not in kwargs)
+        
+        def load():
+            if history_store is not None:
+                history = history_store.get(self.symbol, period, fetch)
+            else:
+                history = fetch(period=period)
+            return downcast_ohlcv(history) if config.CACHE_DOWNCAST_OHLCV else history
+        return self._get(f'history_{period}', load, None, 'historical data')
     
     def get_financials(self) -> Dict[str, Any]:
         """Get financial statements"""
-        if 'financials' not in self._cache:
-            try:
-                self._cache['financials'] = {
-                    'income_stmt': self.ticker.income_stmt,
-                    'balance_sheet': self.ticker.balance_sheet,
-                    'cash_flow': self.ticker.cashflow,
-                    'quarterly_income': self.ticker.quarterly_income_stmt,
-                    'quarterly_balance': self.ticker.quarterly_balance_sheet,
-                    'quarterly_cashflow': self.ticker.quarterly_cashflow
-                }
-            except Exception as e:
-                print(f"Error fetching financials: {e}")
-                self._cache['financials'] = {}
-        return self._cache['financials']
+        def load():
+            financials = {
+                'income_stmt': self._call(lambda: self.ticker.income_stmt),
+                'balance_sheet': self._call(lambda: self.ticker.balance_sheet),
+                'cash_flow': self._call(lambda: self.ticker.cashflow),
+                'quarterly_income': self._call(lambda: self.ticker.quarterly_income_stmt),
+                'quarterly_balance': self._call(lambda: self.ticker.quarterly_balance_sheet),
+                'quarterly_cashflow': self._call(lambda: self.ticker.quarterly_cashflow)
+            }
+            # Keep a long-format copy for cross-company queries
+            if statement_store is not None:
+                statement_store.ingest(self.symbol, financials)
+            return financials
+        return self._get('financials', lambda: self._filing('financials', load, statements_cover),
+                         {}, 'financials')
     
     def get_dividends(self) -> Any:
         """Get dividend history"""
-        if 'dividends' not in self._cache:
-            try:
-                self._cache['dividends'] = self.ticker.dividends
-            except Exception as e:
-                print(f"Error fetching dividends: {e}")
-                self._cache['dividends'] = None
-        return self._cache['dividends']
+        return self._get('dividends', lambda: self._call(lambda: self.ticker.dividends), None, 'dividends')
     
     def get_recommendations(self) -> Any:
         """Get analyst recommendations"""
-        if 'recommendations' not in self._cache:
-            try:
-                self._cache['recommendations'] = self.ticker.recommendations
-            except Exception as e:
-                print(f"Error fetching recommendations: {e}")
-                self._cache['recommendations'] = None
-        return self._cache['recommendations']
+        return self._get(
+            'recommendations', lambda: self._call(lambda: self.ticker.recommendations),
+            None, 'recommendations'
+        )
     
     def get_news(self, limit: int = 10) -> list:
-        """Get recent news about the stock"""
-        if 'news' not in self._cache:
-            try:
-                self._cache['news'] = self.ticker.news[:limit] if self.ticker.news else []
-            except Exception as e:
-                print(f"Error fetching news: {e}")
-                self._cache['news'] = []
-        return self._cache['news']
+        """Get recent news about the stock (deduplicated via the shared news store)"""
+        def load():
+            if not news_store.is_fresh(self.symbol):
+                news_store.ingest(self.symbol, self._call(lambda: self.ticker.news))
+            return news_store.get(self.symbol, limit)
+        return self._get('news', load, [], 'news')
     
     def get_major_holders(self) -> Any:
         """Get major shareholders information"""
-        if 'holders' not in self._cache:
-            try:
-                self._cache['holders'] = {
-                    'major_holders': self.ticker.major_holders,
-                    'institutional_holders': self.ticker.institutional_holders,
-                    'mutualfund_holders': self.ticker.mutualfund_holders
-                }
-            except Exception as e:
-                print(f"Error fetching holders: {e}")
-                self._cache['holders'] = {}
-        return self._cache['holders']
+        def load():
+            return {
+                'major_holders': self._call(lambda: self.ticker.major_holders),
+                'institutional_holders': self._call(lambda: self.ticker.institutional_holders),
+                'mutualfund_holders': self._call(lambda: self.ticker.mutualfund_holders)
+            }
+        return self._get('holders', load, {}, 'holders')
     
     def get_earnings(self) -> Any:
         """Get earnings data"""
-        if 'earnings' not in self._cache:
-            try:
-                self._cache['earnings'] = {
-                    'earnings': self.ticker.earnings,
-                    'quarterly_earnings': self.ticker.quarterly_earnings
-                }
-            except Exception as e:
-                print(f"Error fetching earnings: {e}")
-                self._cache['earnings'] = {}
-        return self._cache['earnings']
+        def load():
+            return {
+                'earnings': self._call(lambda: self.ticker.earnings),
+                'quarterly_earnings': self._call(lambda: self.ticker.quarterly_earnings)
+            }
+        return self._get('earnings', lambda: self._filing('earnings', load), {}, 'earnings')
+    
+    def _filing(self, key: str, loader: Callable[[], Any], covers: Optional[Callable] = None) -> Any:
+        """Load a statement-class dataset through the earnings-aware disk cache when enabled"""
+        if filing_cache is None:
+            return loader()
+        return filing_cache.get(self.symbol, key, loader, lambda: earnings_calendar(self.get_stock_info()), covers)
+    
+    def invalidate(self, key: str):
+        """Drop one cached dataset so the next call refetches it"""
+        memory_cache.pop(self._namespace, key)
+        if key in FILING_DATASETS and filing_cache is not None:
+            filing_cache.invalidate(self.symbol, key)
     
     def clear_cache(self):
         """Clear the data cache"""
-        self._cache = {}
+        memory_cache.clear_namespace(self._namespace)
+
+# Process-wide registry of shared fetchers, one per symbol, least recently used first
+_registry: "OrderedDict[str, DataFetcher]" = OrderedDict()
+_registry_lock = threading.Lock()
+
+def get_fetcher(symbol: str) -> DataFetcher:
+    """
+    Get the shared DataFetcher for a symbol, creating it on first use.
+    Fetchers older than CACHE_DURATION_HOURS are replaced so long-running
+    processes do not serve stale data forever, and at most FETCHER_REGISTRY_SIZE
+    are kept (each holds a yfinance Ticker with its own internal state).
+    Replaced fetchers keep their datasets, since callers may still hold them;
+    nothing reads that namespace again, so the memory cache LRU evicts it.
+    """
+    symbol = symbol.upper()
+    max_age = config.CACHE_DURATION_HOURS * 3600
+    with _registry_lock:
+        fetcher = _registry.get(symbol)
+        if fetcher is None or not config.CACHE_ENABLED or time.time() - fetcher.created_at > max_age:
+            fetcher = _registry[symbol] = DataFetcher(symbol)
+        _registry.move_to_end(symbol)
+        while len(_registry) > config.FETCHER_REGISTRY_SIZE:
+            _registry.popitem(last=False)
+        return fetcher
+
+def clear_registry():
+    """Drop all shared fetchers and their cached datasets"""
+    with _registry_lock:
+        for fetcher in _registry.values():
+            fetcher.clear_cache()
+        _registry.clear()
@@ -0,0 +1,178 @@
+"""
+Earnings-calendar-aware disk cache for statement-class datasets
+"""
+from typing import Dict, Any, Optional, Callable
+import os
+import pickle
+import threading
+import time
+import pandas as pd
+import config
+from utils.resilience import is_empty
+
+# info fields carrying earnings report times (epoch seconds)
+EARNINGS_FIELDS = ('earningsTimestamp', 'earningsTimestampStart', 'earningsTimestampEnd', 'earningsCallTimestampStart')
+
+def earnings_calendar(info: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Optional[float]]:
+    """
+    Last and next earnings report times and the latest reported quarter end,
+    read from a stock info dict.
+    Returns: {'last_report', 'next_report', 'quarter'} as epoch seconds (None if unknown)
+    """
+    now = time.time() if now is None else now
+    times = []
+    for field in EARNINGS_FIELDS:
+        value = (info or {}).get(field)
+        if isinstance(value, (int, float)) and value > 0:
+            times.append(float(value))
+    quarter = (info or {}).get('mostRecentQuarter')
+    return {
+        'last_report': max((t for t in times if t <= now), default=None),
+        'next_report': min((t for t in times if t > now), default=None),
+        'quarter': float(quarter) if isinstance(quarter, (int, float)) and quarter > 0 else None,
+    }
+
+def statements_cover(financials: Dict[str, Any], quarter: Optional[float]) -> bool:
+    """True if the quarterly statements include the quarter ending at `quarter` (or it is unknown)"""
+    if quarter is None:
+        return True
+    frame = (financials or {}).get('quarterly_income')
+    if not isinstance(frame, pd.DataFrame) or frame.empty:
+        return False
+    latest = pd.to_datetime(frame.columns, errors='coerce').max()
+    # Quarter-end dates from info and the statements can differ by a few days
+    return pd.notna(latest) and latest.timestamp() >= quarter - 7 * 86400
+
+class FilingCache:
+    """
+    Statement-class datasets (financials, earnings) kept on disk until the
+    symbol's next expected earnings report.
+    
+    Once the report time passes, a cheap probe compares the latest reported
+    quarter in the (separately cached) stock info with the latest quarter the
+    entry's statements include. Only a new quarter triggers a refetch; otherwise the
+    entry keeps being served and re-probed every probe_interval_hours.
+    Without a known report date entries live for fallback_days.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(config.CACHE_DIR, 'filings')
+        self.stats = {'hits': 0, 'probes_unchanged': 0, 'fetches': 0}
+        self._symbols: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{symbol}.pkl")
+    
+    def _record(self, symbol: str) -> Dict[str, Any]:
+        """Per-symbol record {'calendar': {...}, 'datasets': {key: entry}}, loaded on first use"""
+        record = self._symbols.get(symbol)
+        if record is None:
+            record = {'calendar': {}, 'datasets': {}}
+            path = self._path(symbol)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'rb') as f:
+                        record = pickle.load(f)
+                except Exception as e:
+                    print(f"Error reading filing cache for {symbol}: {e}")
+            self._symbols[symbol] = record
+        return record
+    
+    def _save(self, symbol: str, record: Dict[str, Any]):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(symbol)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving filing cache for {symbol}: {e}")
+    
+    def calendar(self, symbol: str) -> Dict[str, Optional[float]]:
+        """The symbol's last known earnings calendar ({} if never seen)"""
+        with self._lock:
+            return dict(self._record(symbol.upper())['calendar'])
+    
+    def _valid_until(self, calendar: Dict[str, Optional[float]], now: float, complete: bool) -> float:
+        params = config.FILING_CACHE_PARAMS
+        if not complete:
+            # The statements lag the report; look again soon
+            return now + params['probe_interval_hours'] * 3600
+        if calendar.get('next_report'):
+            return calendar['next_report'] + params['report_grace_hours'] * 3600
+        return now + params['fallback_days'] * 86400
+    
+    def get(self, symbol: str, key: str, loader: Callable[[], Any],
+            calendar: Callable[[], Dict[str, Optional[float]]],
+            covers: Optional[Callable[[Any, Optional[float]], bool]] = None) -> Any:
+        """
+        Serve a dataset from disk while it is current, otherwise load and store it.
+        Args:
+            loader: Fetches the dataset upstream
+            calendar: Returns the current earnings_calendar() (called only to probe or store)
+            covers: (value, quarter) -> whether a fetched value already includes that quarter
+        """
+        symbol = symbol.upper()
+        params = config.FILING_CACHE_PARAMS
+        now = time.time()
+        with self._lock:
+            entry = self._record(symbol)['datasets'].get(key)
+        
+        if entry is not None and now - entry['fetched_at'] < params['max_age_days'] * 86400:
+            if now < entry['valid_until']:
+                self._count('hits')
+                return entry['value']
+            
+            # Report date passed: has a new quarter been reported since this entry was fetched?
+            current = calendar()
+            if current.get('quarter') is not None and current['quarter'] == entry.get('quarter'):
+                with self._lock:
+                    entry['valid_until'] = max(now + params['probe_interval_hours'] * 3600,
+                                               self._valid_until(current, now, True)
+                                               if current.get('next_report') else 0)
+                    record = self._record(symbol)
+                    record['calendar'] = current
+                    self._save(symbol, record)
+                self._count('probes_unchanged')
+                return entry['value']
+        
+        value = loader()
+        self._count('fetches')
+        if is_empty(value):
+            return value
+        current = calendar()
+        complete = covers(value, current.get('quarter')) if covers else True
+        # Record the quarter the value actually includes: statements that lag the report
+        # keep the previous quarter, so the next probe sees a new quarter and refetches
+        quarter = current.get('quarter') if complete else (entry or {}).get('quarter')
+        with self._lock:
+            record = self._record(symbol)
+            record['calendar'] = current
+            record['datasets'][key] = {
+                'value': value,
+                'fetched_at': now,
+                'quarter': quarter,
+                'valid_until': self._valid_until(current, now, complete),
+            }
+            self._save(symbol, record)
+        return value
+    
+    def invalidate(self, symbol: str, key: Optional[str] = None):
+        """Forget one dataset (or all of a symbol's datasets) so the next get() refetches"""
+        symbol = symbol.upper()
+        with self._lock:
+            record = self._record(symbol)
+            if key is None:
+                record['datasets'].clear()
+            else:
+                record['datasets'].pop(key, None)
+            self._save(symbol, record)
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+# Process-wide filing cache used by DataFetcher.get_financials and get_earnings
+filing_cache = FilingCache() if config.CACHE_ENABLED else None
@@ -0,0 +1,164 @@
+"""
+Range-aware price history cache persisted across runs
+"""
+from typing import Any, Callable, Dict, Optional
+import os
+import pickle
+import threading
+import time
+import pandas as pd
+import config
+
+# Periods served from the store; shorter ones count trading days upstream and are fetched directly
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# Relative close difference on an overlapping bar that signals a new split/dividend adjustment
+ADJUSTMENT_TOLERANCE = 1e-6
+
+def period_start(period: str, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+    """First date covered by a yfinance period string, or None if the store does not handle it"""
+    if period == 'max':
+        return pd.Timestamp('1900-01-01', tz=now.tz)
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz=now.tz)
+    offset = PERIOD_OFFSETS.get(period)
+    return (now - offset).normalize() if offset is not None else None
+
+class HistoryStore:
+    """
+    Daily OHLCV per symbol, stored once for the widest range ever requested.
+    
+    A request for any period is answered by slicing the stored range. Missing
+    dates are fetched only at the edges: the tail since the last stored bar, and
+    the head when a longer period is requested than was ever fetched. The tail
+    fetch re-reads the last two stored bars; if the completed one of them
+    changed (a split or dividend re-adjusted past prices) the whole range is
+    fetched again.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, refresh_minutes: float = None):
+        self.directory = directory or os.path.join(config.CACHE_DIR, 'history')
+        self.refresh_seconds = (refresh_minutes if refresh_minutes is not None
+                                else config.HISTORY_REFRESH_MINUTES) * 60
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+    
+    def get(self, symbol: str, period: str, fetch: Callable[..., pd.DataFrame]) -> pd.DataFrame:
+        """
+        History for a period, fetching only what the store is missing.
+        Args:
+            fetch: Calls the upstream history endpoint with yfinance keyword
+                   arguments (period=..., or start=/end=)
+        """
+        if period not in PERIOD_OFFSETS and period not in ('max', 'ytd'):
+            return fetch(period=period)
+        
+        with self._lock_for(symbol):
+            record = self._read(symbol)
+            if record is None or len(record['frame']) < 2:
+                frame = fetch(period=period)
+                if frame is None or frame.empty:
+                    return frame
+                now = pd.Timestamp.now(tz=frame.index.tz)
+                record = {'frame': frame, 'covered_from': period_start(period, now), 'fetched_at': time.time()}
+                self._write(symbol, record)
+                return frame
+            
+            frame = record['frame']
+            now = pd.Timestamp.now(tz=frame.index.tz)
+            start = period_start(period, now)
+            changed = False
+            
+            if time.time() - record['fetched_at'] >= self.refresh_seconds:
+                record = self._update_tail(record, fetch)
+                changed = True
+            
+            if start < record['covered_from']:
+                record = self._extend_head(record, start, fetch)
+                changed = True
+            
+            if changed:
+                self._write(symbol, record)
+            frame = record['frame']
+            return frame.loc[frame.index >= start]
+    
+    def _update_tail(self, record: Dict[str, Any], fetch: Callable[..., pd.DataFrame]) -> Dict[str, Any]:
+        """Append bars since the last stored one, or refetch everything if adjustments changed"""
+        frame = record['frame']
+        # The last stored bar may have been captured intraday; the one before it is final
+        anchor, last = frame.index[-2], frame.index[-1]
+        tail = fetch(start=anchor.strftime('%Y-%m-%d'))
+        if tail is None or tail.empty:
+            record['fetched_at'] = time.time()
+            return record
+        
+        if anchor in tail.index and self._adjustment_changed(frame.loc[anchor], tail.loc[anchor]):
+            full = fetch(start=record['covered_from'].strftime('%Y-%m-%d'))
+            if full is not None and not full.empty:
+                return {'frame': full, 'covered_from': record['covered_from'], 'fetched_at': time.time()}
+        
+        merged = pd.concat([frame.loc[frame.index < last], tail.loc[tail.index >= last]])
+        return {'frame': merged, 'covered_from': record['covered_from'], 'fetched_at': time.time()}
+    
+    def _extend_head(self, record: Dict[str, Any], start: pd.Timestamp,
+                     fetch: Callable[..., pd.DataFrame]) -> Dict[str, Any]:
+        """Prepend the dates between a longer requested period's start and the stored range"""
+        frame = record['frame']
+        head = fetch(start=start.strftime('%Y-%m-%d'), end=frame.index[0].strftime('%Y-%m-%d'))
+        if head is not None and not head.empty:
+            frame = pd.concat([head.loc[head.index < frame.index[0]], frame])
+        return {'frame': frame, 'covered_from': start, 'fetched_at': record['fetched_at']}
+    
+    @staticmethod
+    def _adjustment_changed(stored: pd.Series, fresh: pd.Series) -> bool:
+        old, new = stored.get('Close'), fresh.get('Close')
+        if old is None or new is None or pd.isna(old) or pd.isna(new) or old == 0:
+            return False
+        return abs(new - old) / abs(old) > ADJUSTMENT_TOLERANCE
+    
+    def invalidate(self, symbol: str):
+        """Forget a symbol's stored history"""
+        with self._lock_for(symbol):
+            path = self._path(symbol)
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def _lock_for(self, symbol: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(symbol, threading.Lock())
+    
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}.pkl")
+    
+    def _read(self, symbol: str) -> Optional[Dict[str, Any]]:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Error reading stored history for {symbol}: {e}")
+            return None
+    
+    def _write(self, symbol: str, record: Dict[str, Any]):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(symbol)
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error saving history for {symbol}: {e}")
+
+# Process-wide history store shared by all DataFetchers
+history_store = HistoryStore() if config.CACHE_ENABLED else None
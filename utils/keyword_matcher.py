@@ -0,0 +1,91 @@
+"""
+Compiled multi-lexicon keyword matching for headline text
+"""
+from typing import Dict, List, Iterable, Optional, Set
+import re
+import numpy as np
+
+def phrase_forms(phrase: str, inflections: Dict[str, Iterable[str]]) -> Set[str]:
+    """
+    A keyword phrase plus its listed inflections: those listed for the whole
+    phrase, and those listed for its last word ("strong buy" -> "strong buys").
+    """
+    words = phrase.split()
+    forms = {phrase} | set(inflections.get(phrase, ()))
+    if len(words) > 1:
+        forms |= {' '.join(words[:-1] + [form]) for form in inflections.get(words[-1], ())}
+    return forms
+
+class KeywordMatcher:
+    """
+    Match several keyword lexicons against many texts with one compiled regex.
+    
+    Keywords are word-bounded (so "sell" does not match "bestseller") and may be
+    multi-word phrases. A phrase match also credits every keyword it contains,
+    e.g. "strong buy" counts for "strong" and "buy" as well.
+    
+    Inflections are an explicit keyword -> forms table rather than suffix rules,
+    which would also accept non-words and forms with another meaning
+    ("missable", "buyers"). A listed form credits its keyword ("concerned"
+    also counts for "concern").
+    """
+    
+    def __init__(self, lexicons: Dict[str, Iterable[str]],
+                 inflections: Optional[Dict[str, Iterable[str]]] = None):
+        self.lexicons = {name: [kw.lower() for kw in words] for name, words in lexicons.items()}
+        self.inflections = {kw.lower(): [form.lower() for form in forms]
+                            for kw, forms in (inflections or {}).items()}
+        
+        keywords = sorted({kw for words in self.lexicons.values() for kw in words},
+                          key=lambda kw: (-len(kw), kw))
+        
+        # Every inflected form maps to the keywords it is a form of
+        self._forms: Dict[str, Set[str]] = {}
+        for kw in keywords:
+            for form in phrase_forms(kw, self.inflections):
+                self._forms.setdefault(form, set()).add(kw)
+        forms = sorted(self._forms, key=lambda form: (-len(form), form))
+        alternation = '|'.join(r'[^\S\n]+'.join(map(re.escape, form.split())) for form in forms)
+        self.pattern = re.compile(rf'\b({alternation})\b', re.IGNORECASE)
+        
+        # Keywords credited by each matched keyword (itself plus contained sub-phrases)
+        self._expansions = {kw: self._contained_keywords(kw, keywords) for kw in keywords}
+    
+    def _contained_keywords(self, phrase: str, keywords: List[str]) -> Set[str]:
+        words = phrase.split()
+        contained = {phrase}
+        for kw in keywords:
+            if kw != phrase and phrase in phrase_forms(kw, self.inflections):
+                contained.add(kw)
+            size = len(kw.split())
+            if size < len(words) and any(' '.join(words[i:i + size]) == kw
+                                         for i in range(len(words) - size + 1)):
+                contained.add(kw)
+        return contained
+    
+    def match_many(self, texts: List[str]) -> List[Set[str]]:
+        """
+        Scan all texts in a single regex pass.
+        Returns: For each text, the set of keywords found in it
+        """
+        hits = [set() for _ in texts]
+        if not texts:
+            return hits
+        
+        joined = '\n'.join(texts)
+        starts = np.cumsum([0] + [len(text) + 1 for text in texts[:-1]])
+        
+        matches = list(self.pattern.finditer(joined))
+        if not matches:
+            return hits
+        
+        owners = np.searchsorted(starts, [m.start() for m in matches], side='right') - 1
+        for owner, match in zip(owners, matches):
+            form = ' '.join(match.group(1).lower().split())
+            for keyword in self._forms[form]:
+                hits[owner].update(self._expansions[keyword])
+        return hits
+    
+    def lexicon_hits(self, keywords: Set[str], lexicon: str) -> Set[str]:
+        """Restrict a set of matched keywords to one lexicon"""
+        return keywords.intersection(self.lexicons[lexicon])
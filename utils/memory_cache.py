@@ -0,0 +1,122 @@
+"""
+Byte-budgeted LRU cache for fetched datasets
+"""
+from typing import Any, Dict, Hashable, Tuple
+from collections import OrderedDict
+import sys
+import threading
+import numpy as np
+import pandas as pd
+import config
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory held by a cached value, in bytes (pandas objects measured deeply)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+def downcast_ohlcv(history: pd.DataFrame) -> pd.DataFrame:
+    """Store prices as float32 and volumes as the smallest integer type that fits"""
+    if history is None or history.empty:
+        return history
+    history = history.copy()
+    for column in PRICE_COLUMNS:
+        if column in history.columns:
+            history[column] = history[column].astype(np.float32)
+    if 'Volume' in history.columns and not history['Volume'].isna().any():
+        history['Volume'] = pd.to_numeric(history['Volume'].round(), downcast='unsigned'
+                                          if (history['Volume'] >= 0).all() else 'integer')
+    return history
+
+class MemoryCache:
+    """
+    Thread-safe LRU cache bounded by the total estimated byte size of its entries.
+    
+    Keys are (namespace, key) pairs so each DataFetcher can drop its own
+    entries; the budget is shared by all of them. A value larger than the whole
+    budget is returned to the caller but not retained.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, str], Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, namespace: Hashable, key: str) -> Tuple[bool, Any]:
+        """Returns: (found, value); a hit marks the entry most recently used"""
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            return True, entry[0]
+    
+    def contains(self, namespace: Hashable, key: str) -> bool:
+        """Whether an entry is cached, without counting a hit or refreshing its recency"""
+        with self._lock:
+            return (namespace, key) in self._entries
+    
+    def put(self, namespace: Hashable, key: str, value: Any):
+        """Store a value, evicting least recently used entries until the budget is met"""
+        size = estimate_size(value)
+        with self._lock:
+            self._remove((namespace, key))
+            if size > self.max_bytes:
+                return
+            self._entries[(namespace, key)] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+    
+    def pop(self, namespace: Hashable, key: str):
+        """Drop one entry"""
+        with self._lock:
+            self._remove((namespace, key))
+    
+    def clear_namespace(self, namespace: Hashable):
+        """Drop every entry of one namespace"""
+        with self._lock:
+            for full_key in [k for k in self._entries if k[0] == namespace]:
+                self._remove(full_key)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+    
+    def _remove(self, full_key: Tuple[Hashable, str]):
+        entry = self._entries.pop(full_key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+# Process-wide dataset cache shared by all DataFetchers
+memory_cache = MemoryCache(int(config.CACHE_MEMORY_MB * 1024 * 1024))
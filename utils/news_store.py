@@ -0,0 +1,279 @@
+"""
+Deduplicated, incremental news storage shared by all DataFetchers
+"""
+from typing import Dict, Any, List, Optional, Iterable
+from collections import OrderedDict
+from datetime import datetime
+import json
+import os
+import threading
+import time
+import config
+from utils.memory_cache import estimate_size
+
+def normalize_article(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Reduce a raw yfinance news item (legacy flat or newer nested 'content'
+    layout) to the slim record used by the analyzers: uuid, title, publisher,
+    link, providerPublishTime and relatedTickers.
+    Returns: Normalized article dict, or None if it has no identifier
+    """
+    content = item.get('content')
+    if isinstance(content, dict):
+        pub_date = content.get('pubDate') or content.get('displayTime')
+        published = 0
+        if pub_date:
+            try:
+                published = int(datetime.fromisoformat(pub_date.replace('Z', '+00:00')).timestamp())
+            except ValueError:
+                published = 0
+        url = (content.get('canonicalUrl') or {}).get('url') or (content.get('clickThroughUrl') or {}).get('url', '')
+        tickers = [t.get('symbol') for t in (content.get('finance') or {}).get('stockTickers') or []]
+        article = {
+            'uuid': item.get('id') or content.get('id'),
+            'title': content.get('title', ''),
+            'publisher': (content.get('provider') or {}).get('displayName', 'Unknown'),
+            'link': url,
+            'providerPublishTime': published,
+            'relatedTickers': tickers
+        }
+    else:
+        article = {
+            'uuid': item.get('uuid') or item.get('id'),
+            'title': item.get('title', ''),
+            'publisher': item.get('publisher', 'Unknown'),
+            'link': item.get('link', ''),
+            'providerPublishTime': int(item.get('providerPublishTime') or 0),
+            'relatedTickers': list(item.get('relatedTickers') or [])
+        }
+    
+    if not article['uuid']:
+        return None
+    article['relatedTickers'] = sorted({t.upper() for t in article['relatedTickers'] if t})
+    return article
+
+class NewsStore:
+    """
+    News articles keyed by uuid with a per-symbol index.
+    
+    Each article is stored once and shared by every symbol it mentions, and
+    dropped once no symbol's window references it. Per-symbol high-water marks
+    (newest publish time seen) skip already-known items, and the last fetch
+    time throttles re-queries. Articles held in memory are bounded by
+    `max_bytes`: past it, the least recently used symbols are forgotten and
+    fetched again on their next use. The store is persisted as an append-only
+    JSON-lines log.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_per_symbol: int = None, max_bytes: int = None):
+        self.path = path
+        self.max_per_symbol = max_per_symbol or config.NEWS_MAX_PER_SYMBOL
+        self.max_bytes = max_bytes or int(config.NEWS_MEMORY_MB * 1024 * 1024)
+        self._articles: Dict[str, Dict[str, Any]] = {}
+        # Symbols least recently used first
+        self._by_symbol: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._watermarks: Dict[str, int] = {}
+        self._fetched_at: Dict[str, float] = {}
+        # Per article: estimated size and number of symbol windows referencing it
+        self._sizes: Dict[str, int] = {}
+        self._refs: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+    
+    def is_fresh(self, symbol: str) -> bool:
+        """True if the symbol's news was fetched within NEWS_REFRESH_MINUTES"""
+        self._ensure_loaded()
+        fetched_at = self._fetched_at.get(symbol.upper())
+        return fetched_at is not None and time.time() - fetched_at < config.NEWS_REFRESH_MINUTES * 60
+    
+    def ingest(self, symbol: str, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Merge freshly fetched raw news items for a symbol.
+        Items may arrive in any order; each one older than the symbol's
+        high-water mark is skipped.
+        Returns: Number of articles not seen before
+        """
+        self._ensure_loaded()
+        symbol = symbol.upper()
+        log = []
+        
+        with self._lock:
+            watermark = self._watermarks.get(symbol, 0)
+            new_count = 0
+            
+            for item in items or []:
+                article = normalize_article(item)
+                if article is None:
+                    continue
+                # Items published at the mark itself may be new, the uuid check below dedupes them
+                if watermark and article['providerPublishTime'] and article['providerPublishTime'] < watermark:
+                    continue
+                
+                existing = self._articles.get(article['uuid'])
+                if existing is None:
+                    existing = self._add(article)
+                    new_count += 1
+                    log.append({'article': article})
+                
+                for related in set(existing['relatedTickers']) | {symbol}:
+                    if self._link(related, existing):
+                        log.append({'link': existing['uuid'], 'symbol': related})
+                # Older than every article in the symbol's full window
+                self._release(existing['uuid'], 0)
+                
+                self._watermarks[symbol] = max(self._watermarks.get(symbol, 0),
+                                               existing['providerPublishTime'])
+            
+            self._fetched_at[symbol] = time.time()
+            log.append({'fetched': symbol, 'at': self._fetched_at[symbol],
+                        'watermark': self._watermarks.get(symbol, 0)})
+            self._append(log)
+            self._touch(symbol)
+            self._evict()
+        
+        return new_count
+    
+    def get(self, symbol: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Most recent articles for a symbol, newest first"""
+        self._ensure_loaded()
+        symbol = symbol.upper()
+        with self._lock:
+            uuids = self._by_symbol.get(symbol, [])[:limit]
+            if symbol in self._by_symbol:
+                self._touch(symbol)
+            return [self._articles[uuid] for uuid in uuids]
+    
+    def stats(self) -> Dict[str, int]:
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                'articles': len(self._articles),
+                'symbols': len(self._by_symbol),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+    
+    def _add(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a new, not yet referenced article. Caller holds the lock."""
+        uuid = article['uuid']
+        self._articles[uuid] = article
+        self._sizes[uuid] = estimate_size(article)
+        self._refs[uuid] = 0
+        self.total_bytes += self._sizes[uuid]
+        return article
+    
+    def _release(self, uuid: str, count: int = 1):
+        """Drop `count` references to an article, and the article with the last one. Caller holds the lock."""
+        if uuid not in self._refs:
+            return
+        self._refs[uuid] -= count
+        if self._refs[uuid] <= 0:
+            del self._articles[uuid], self._refs[uuid]
+            self.total_bytes -= self._sizes.pop(uuid)
+    
+    def _link(self, symbol: str, article: Dict[str, Any]) -> bool:
+        """Index an article under a symbol, keeping newest first. Caller holds the lock."""
+        uuids = self._by_symbol.setdefault(symbol, [])
+        if article['uuid'] in uuids:
+            return False
+        
+        published = article['providerPublishTime']
+        position = len(uuids)
+        for i, uuid in enumerate(uuids):
+            if self._articles[uuid]['providerPublishTime'] < published:
+                position = i
+                break
+        uuids.insert(position, article['uuid'])
+        self._refs[article['uuid']] += 1
+        for uuid in uuids[self.max_per_symbol:]:
+            self._release(uuid)
+        del uuids[self.max_per_symbol:]
+        return True
+    
+    def _touch(self, symbol: str):
+        """Mark a symbol most recently used. Caller holds the lock."""
+        self._by_symbol.setdefault(symbol, [])
+        self._by_symbol.move_to_end(symbol)
+    
+    def _evict(self):
+        """Forget least recently used symbols until the articles fit the budget. Caller holds the lock."""
+        while self.total_bytes > self.max_bytes and len(self._by_symbol) > 1:
+            symbol, uuids = self._by_symbol.popitem(last=False)
+            self._watermarks.pop(symbol, None)
+            self._fetched_at.pop(symbol, None)
+            for uuid in uuids:
+                self._release(uuid)
+            self.evictions += 1
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return
+            line_count = 0
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        self._replay(json.loads(line))
+                        line_count += 1
+            except (OSError, ValueError) as e:
+                print(f"Error loading news store: {e}")
+                return
+            
+            # Drop articles that fell out of every symbol's window, fit the budget and rewrite the log
+            for uuid in [uuid for uuid, refs in self._refs.items() if refs == 0]:
+                self._release(uuid, 0)
+            self._evict()
+            if line_count > 2 * (len(self._articles) + len(self._fetched_at)) + 100:
+                self._compact()
+    
+    def _replay(self, entry: Dict[str, Any]):
+        if 'article' in entry:
+            if entry['article']['uuid'] not in self._articles:
+                self._add(entry['article'])
+        elif 'link' in entry:
+            if entry['link'] in self._articles:
+                self._link(entry['symbol'], self._articles[entry['link']])
+        elif 'fetched' in entry:
+            self._fetched_at[entry['fetched']] = entry['at']
+            self._watermarks[entry['fetched']] = entry['watermark']
+            self._touch(entry['fetched'])
+    
+    def _compact(self):
+        """Rewrite the log with only live entries. Caller holds the lock."""
+        entries = [{'article': article} for article in self._articles.values()]
+        for symbol, uuids in self._by_symbol.items():
+            entries.extend({'link': uuid, 'symbol': symbol} for uuid in reversed(uuids))
+        for symbol, fetched_at in self._fetched_at.items():
+            entries.append({'fetched': symbol, 'at': fetched_at,
+                            'watermark': self._watermarks.get(symbol, 0)})
+        
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error compacting news store: {e}")
+    
+    def _append(self, entries: List[Dict[str, Any]]):
+        if not self.path or not entries:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        except OSError as e:
+            print(f"Error saving news store: {e}")
+
+# Process-wide store shared by every DataFetcher
+news_store = NewsStore(os.path.join(config.CACHE_DIR, 'news.jsonl') if config.CACHE_ENABLED else None)
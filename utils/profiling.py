@@ -0,0 +1,222 @@
+"""
+CPU and memory profiling of an analysis run (--profile / --profile-memory)
+"""
+from typing import Dict, List, Optional, Tuple
+from collections import Counter, defaultdict
+import ast
+import bisect
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Code whose time and allocations are broken down per function
+COMPONENT_FILES = [
+    os.path.join('analyzers', name) for name in
+    ('fundamental.py', 'valuation.py', 'dividend.py', 'technical.py', 'sentiment.py', 'patterns.py', 'rules.py',
+     'risk.py', 'ttm.py', 'dividend_metrics.py')
+] + [os.path.join('utils', 'data_fetcher.py')]
+
+# Before 3.12 a cProfile.Profile only sees the thread that enabled it; from 3.12 it
+# hooks sys.monitoring, which covers every thread but allows one active profiler
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+def _function_ranges(path: str) -> Tuple[List[int], List[Tuple[int, int, str]]]:
+    """Line ranges of every function in a source file, as (start, end, qualified name)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    
+    ranges = []
+    def visit(node, prefix):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                visit(child, f"{prefix}{child.name}.")
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                # cProfile reports a decorated function at its first decorator line
+                start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                ranges.append((start, child.end_lineno, prefix + child.name))
+    visit(tree, '')
+    ranges.sort()
+    return [r[0] for r in ranges], ranges
+
+class ComponentIndex:
+    """Maps (filename, line) to 'module: Class.method' for the analyzer and DataFetcher sources"""
+    
+    def __init__(self, root: str = PROJECT_ROOT):
+        self.files: Dict[str, Tuple[str, List[int], List[Tuple[int, int, str]]]] = {}
+        for relative in COMPONENT_FILES:
+            path = os.path.join(root, relative)
+            if os.path.exists(path):
+                starts, ranges = _function_ranges(path)
+                self.files[os.path.normcase(os.path.abspath(path))] = (relative, starts, ranges)
+    
+    def lookup(self, filename: str, line: int) -> Optional[str]:
+        entry = self.files.get(os.path.normcase(os.path.abspath(filename)))
+        if entry is None:
+            return None
+        relative, starts, ranges = entry
+        # Innermost function containing the line: last range starting at or before it that still covers it
+        i = bisect.bisect_right(starts, line) - 1
+        while i >= 0:
+            start, end, name = ranges[i]
+            if start <= line <= end:
+                return f"{relative}: {name}"
+            i -= 1
+        return f"{relative}: <module>"
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval for collapsed-stack (flamegraph) output"""
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def start(self):
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            # Analysis tasks run on TaskGraph worker threads, so sample them all
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(names))] += 1
+    
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+class RunProfiler:
+    """
+    Context manager that profiles the enclosed block, including threads it starts.
+    
+    cpu=True writes <prefix>_cpu.txt (hotspots sorted by cumulative time plus a
+    per-analyzer / DataFetcher method breakdown) and <prefix>.collapsed
+    (sampled stacks for flamegraph.pl, speedscope, etc.).
+    memory=True writes <prefix>_memory.txt (top allocation sites and the same
+    per-component breakdown of memory still allocated at the end of the block).
+    """
+    
+    def __init__(self, prefix: str, cpu: bool = True, memory: bool = False, top: int = 40):
+        self.prefix = prefix
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.outputs: List[str] = []
+        self._profile = None
+        self._thread_profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._sampler = None
+    
+    def __enter__(self):
+        if self.memory:
+            tracemalloc.start(25)
+        if self.cpu:
+            self._sampler = StackSampler()
+            self._sampler.start()
+            self._profile = cProfile.Profile()
+            if PER_THREAD_PROFILES:
+                threading.setprofile(self._profile_thread)
+            self._profile.enable()
+        return self
+    
+    def _profile_thread(self, frame, event, arg):
+        """threading.setprofile hook: give each thread started in the block its own profile"""
+        profile = cProfile.Profile()
+        with self._lock:
+            self._thread_profiles.append(profile)
+        profile.enable()
+    
+    def __exit__(self, exc_type, exc, tb):
+        index = ComponentIndex()
+        if self.cpu:
+            self._profile.disable()
+            if PER_THREAD_PROFILES:
+                threading.setprofile(None)
+            self._sampler.stop()
+            self._write_cpu_report(index)
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._write_memory_report(snapshot, index)
+        return False
+    
+    def _write_cpu_report(self, index: ComponentIndex):
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        with self._lock:
+            for profile in self._thread_profiles:
+                try:
+                    stats.add(profile)
+                except TypeError:
+                    pass  # pstats refuses a profile with no calls (a thread that never ran code)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        
+        components = []
+        for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            name = index.lookup(filename, line)
+            if name:
+                # Lambdas and nested functions are reported inside their enclosing method
+                if name.rsplit('.', 1)[-1].rsplit(' ', 1)[-1] != function:
+                    name = f"{name}.{function}"
+                components.append((cumtime, tottime, ncalls, name))
+        components.sort(reverse=True)
+        
+        path = f"{self.prefix}_cpu.txt"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("By analyzer / DataFetcher method (cumulative seconds)\n")
+            f.write(f"{'cumtime':>10} {'tottime':>10} {'calls':>8}  function\n")
+            for cumtime, tottime, ncalls, name in components:
+                f.write(f"{cumtime:10.3f} {tottime:10.3f} {ncalls:8d}  {name}\n")
+            f.write("\nHotspots\n")
+            f.write(stream.getvalue())
+        self.outputs.append(path)
+        
+        collapsed_path = f"{self.prefix}.collapsed"
+        self._sampler.write(collapsed_path)
+        self.outputs.append(collapsed_path)
+    
+    def _write_memory_report(self, snapshot: tracemalloc.Snapshot, index: ComponentIndex):
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        
+        # Attribute each allocation to the innermost analyzer / DataFetcher frame on its traceback
+        by_component: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for stat in snapshot.statistics('traceback'):
+            owner = '(other)'
+            for frame in reversed(stat.traceback):
+                name = index.lookup(frame.filename, frame.lineno)
+                if name:
+                    owner = name
+                    break
+            by_component[owner][0] += stat.size
+            by_component[owner][1] += stat.count
+        
+        path = f"{self.prefix}_memory.txt"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("By analyzer / DataFetcher method (live at end of run)\n")
+            f.write(f"{'KiB':>12} {'blocks':>10}  function\n")
+            for owner, (size, count) in sorted(by_component.items(), key=lambda item: -item[1][0]):
+                f.write(f"{size / 1024:12.1f} {count:10d}  {owner}\n")
+            f.write("\nTop allocation sites\n")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:12.1f} {stat.count:10d}  {frame.filename}:{frame.lineno}\n")
+        self.outputs.append(path)
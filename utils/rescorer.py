@@ -0,0 +1,94 @@
+"""
+Vectorized what-if re-scoring over weight and threshold grids
+"""
+from typing import Dict, List, Sequence, Tuple, Union
+import itertools
+import numpy as np
+import config
+
+CATEGORIES = ['fundamental', 'valuation', 'dividend', 'technical', 'sentiment']
+
+# Recommendation index returned by Rescorer.rescore (0 = Strong Sell ... 4 = Strong Buy)
+RECOMMENDATIONS = ['Strong Sell', 'Sell', 'Hold', 'Buy', 'Strong Buy']
+
+# Threshold keys in ascending order; a score at or above the i-th key earns index i + 1
+THRESHOLD_KEYS = ['sell', 'hold', 'buy', 'strong_buy']
+
+def weights_matrix(weights: Union[Dict[str, float], Sequence[Dict[str, float]]]) -> np.ndarray:
+    """Convert one or many WEIGHTS-style dicts to a (K x categories) array"""
+    if isinstance(weights, dict):
+        weights = [weights]
+    return np.array([[w.get(c, 0) for c in CATEGORIES] for w in weights], dtype=float)
+
+def thresholds_matrix(thresholds: Union[Dict[str, float], Sequence[Dict[str, float]]]) -> np.ndarray:
+    """Convert one or many THRESHOLDS-style dicts to a (K x 4) array"""
+    if isinstance(thresholds, dict):
+        thresholds = [thresholds]
+    return np.array([[t[k] for k in THRESHOLD_KEYS] for t in thresholds], dtype=float)
+
+def weight_grid(step: int = 5, total: int = 100) -> np.ndarray:
+    """
+    Every weighting of the categories in multiples of `step` that sums to `total`.
+    Returns: (K x categories) array, e.g. 10,626 rows for step=5
+    """
+    slots = total // step
+    n = len(CATEGORIES)
+    # Stars and bars: choose n-1 divider positions among slots + n - 1
+    rows = []
+    for dividers in itertools.combinations(range(slots + n - 1), n - 1):
+        bounds = (-1,) + dividers + (slots + n - 1,)
+        rows.append([bounds[i + 1] - bounds[i] - 1 for i in range(n)])
+    return np.array(rows, dtype=float) * step
+
+class Rescorer:
+    """
+    Re-score a universe under alternative weights and thresholds without refetching.
+    
+    Per-category averages are computed once from the (symbols x questions)
+    matrix, using the same rules as Scorer (scores clipped to 0-100, 50 for a
+    category with no scores). Each rescore call is then one matrix product.
+    """
+    
+    def __init__(self, score_matrix: np.ndarray, question_categories: List[str]):
+        scores = np.clip(np.asarray(score_matrix, dtype=float), 0, 100)
+        membership = np.array([[qc == c for c in CATEGORIES] for qc in question_categories], dtype=float)
+        
+        present = ~np.isnan(scores)
+        sums = np.where(present, scores, 0.0) @ membership
+        counts = present.astype(float) @ membership
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # (symbols x categories)
+            self.category_scores = np.where(counts > 0, sums / counts, 50.0)
+    
+    def overall_scores(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Weighted overall scores for K weight sets.
+        Args:
+            weights: (K x categories) array
+        Returns: (K x symbols) array
+        """
+        weights = np.atleast_2d(np.asarray(weights, dtype=float))
+        totals = weights.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overall = (weights @ self.category_scores.T) / totals
+        return np.where(totals > 0, overall, 50.0)
+    
+    def rescore(self, weights: np.ndarray = None,
+                thresholds: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every symbol under K candidate configurations at once.
+        Args:
+            weights: (K x categories) array, defaults to config.WEIGHTS
+            thresholds: (K x 4) array of sell/hold/buy/strong_buy cutoffs,
+                        or (1 x 4) to share one set; defaults to config.THRESHOLDS
+        Returns: (overall scores, recommendation indices into RECOMMENDATIONS), both K x symbols
+        """
+        if weights is None:
+            weights = weights_matrix(config.WEIGHTS)
+        if thresholds is None:
+            thresholds = thresholds_matrix(config.THRESHOLDS)
+        
+        overall = self.overall_scores(weights)
+        thresholds = np.atleast_2d(np.asarray(thresholds, dtype=float))
+        recommendations = (overall[:, :, None] >= thresholds[:, None, :]).sum(axis=2)
+        return overall, recommendations
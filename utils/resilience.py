@@ -0,0 +1,176 @@
+"""
+Rate limiting, retry and circuit breaking for upstream data requests
+"""
+from typing import Any, Callable, Optional
+import random
+import threading
+import time
+import config
+
+# HTTP statuses worth retrying: throttling and server-side hiccups
+TRANSIENT_HTTP_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Exception class names (requests, curl_cffi, yfinance) that indicate a transient failure
+TRANSIENT_ERROR_NAMES = ('ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout',
+                         'YFRateLimitError', 'ChunkedEncodingError')
+
+class FetchError(Exception):
+    """Raised when upstream data could not be fetched"""
+
+class CircuitOpenError(FetchError):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+class EmptyResultError(FetchError):
+    """Raised when upstream answers without data (yfinance's usual response when throttled)"""
+
+def is_empty(value: Any) -> bool:
+    """Whether a fetched value holds no data: None, an empty frame/series, or a dict of empty values"""
+    if value is None:
+        return True
+    if isinstance(value, dict):
+        return all(is_empty(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return len(value) == 0
+    return bool(getattr(value, 'empty', False))
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether an exception looks like throttling or a temporary network/server failure"""
+    if isinstance(exc, (ConnectionError, TimeoutError, EmptyResultError)):
+        return True
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__):
+        return True
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status in TRANSIENT_HTTP_STATUS:
+        return True
+    message = str(exc).lower()
+    return 'too many requests' in message or 'rate limit' in message
+
+class RateLimiter:
+    """Thread-safe token bucket shared by every caller in the process"""
+    
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = float(rate_per_second)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available, then consume them"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+    
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Consume `tokens` if available right now; never blocks"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+class CircuitBreaker:
+    """
+    Fail fast while upstream is unhealthy.
+    
+    Opens after `failure_threshold` consecutive transient failures, rejects
+    calls for `reset_seconds`, then lets a single trial call through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+    
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not reach upstream"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                remaining = self.reset_seconds - (time.monotonic() - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(f"Upstream circuit open, retry in {remaining:.0f}s")
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                raise CircuitOpenError("Upstream circuit half-open, trial request in flight")
+            self._trial_in_flight = True
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+def call_with_retry(fn: Callable[[], Any], limiter: Optional[RateLimiter] = None,
+                    breaker: Optional[CircuitBreaker] = None,
+                    max_retries: int = None, backoff_base: float = None,
+                    backoff_max: float = None, reject_empty: bool = False) -> Any:
+    """
+    Call `fn` through the rate limiter and circuit breaker, retrying
+    transient failures with full-jitter exponential backoff.
+    Non-transient exceptions propagate immediately.
+    With `reject_empty`, an empty result (see is_empty) counts as a transient failure.
+    """
+    params = config.FETCH_PARAMS
+    limiter = limiter or rate_limiter
+    breaker = breaker or circuit_breaker
+    max_retries = params['max_retries'] if max_retries is None else max_retries
+    backoff_base = params['backoff_base'] if backoff_base is None else backoff_base
+    backoff_max = params['backoff_max'] if backoff_max is None else backoff_max
+    
+    attempt = 0
+    while True:
+        breaker.before_call()
+        limiter.acquire()
+        try:
+            result = fn()
+            if reject_empty and is_empty(result):
+                raise EmptyResultError("Upstream returned no data")
+        except Exception as e:
+            if not is_transient(e):
+                # Upstream answered; the request itself was bad
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt >= max_retries:
+                raise FetchError(f"Giving up after {attempt + 1} attempts: {e}") from e
+            time.sleep(random.uniform(0, min(backoff_max, backoff_base * 2 ** attempt)))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
+
+# Process-wide instances shared by every DataFetcher
+rate_limiter = RateLimiter(config.FETCH_PARAMS['rate_per_second'], config.FETCH_PARAMS['burst'])
+circuit_breaker = CircuitBreaker(config.FETCH_PARAMS['breaker_threshold'],
+                                 config.FETCH_PARAMS['breaker_reset_seconds'])
@@ -0,0 +1,210 @@
+"""
+Score history database - every analysis run in an indexed SQLite file
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, date
+import os
+import sqlite3
+import pandas as pd
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol_id     INTEGER PRIMARY KEY,
+    symbol        TEXT NOT NULL UNIQUE,
+    company_name  TEXT
+);
+CREATE TABLE IF NOT EXISTS questions (
+    question_id   INTEGER PRIMARY KEY,
+    category      TEXT NOT NULL,
+    question_en   TEXT,
+    question_zh   TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id          INTEGER PRIMARY KEY,
+    symbol_id       INTEGER NOT NULL REFERENCES symbols(symbol_id),
+    run_date        TEXT NOT NULL,
+    run_time        TEXT NOT NULL,
+    overall_score   REAL NOT NULL,
+    recommendation  TEXT,
+    confidence      TEXT
+);
+DROP INDEX IF EXISTS idx_runs_symbol_date;
+CREATE INDEX IF NOT EXISTS idx_runs_symbol_time ON runs (symbol_id, run_time);
+CREATE INDEX IF NOT EXISTS idx_runs_date_score ON runs (run_date, overall_score DESC);
+CREATE TABLE IF NOT EXISTS category_scores (
+    run_id    INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    category  TEXT NOT NULL,
+    score     REAL NOT NULL,
+    PRIMARY KEY (run_id, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS question_scores (
+    run_id       INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    question_id  INTEGER NOT NULL REFERENCES questions(question_id),
+    score        REAL,
+    PRIMARY KEY (run_id, question_id)
+) WITHOUT ROWID;
+"""
+
+class ScoreDatabase:
+    """
+    One row per analysis run in `runs`, with its category and per-question
+    scores in child tables. Every run is kept; date queries use each symbol's
+    latest run of the day and read straight off the indexes.
+    """
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.SCORE_DB_PATH
+    
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA foreign_keys = ON")
+        # Idempotent, and cheap once the tables exist; a deleted file gets its schema back
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.executescript(SCHEMA)
+        return connection
+    
+    def save(self, analysis: Dict[str, Any], categories: List[str], when: Optional[datetime] = None):
+        """
+        Record one StockAnalyzer.run_analysis result.
+        Args:
+            analysis: Result dict from run_analysis
+            categories: Category of each entry in analysis['results'], in order
+            when: Run time (default now); its date is the run date
+        """
+        when = when or datetime.now()
+        summary = analysis['summary']
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT INTO symbols (symbol, company_name) VALUES (?, ?) "
+                    "ON CONFLICT(symbol) DO UPDATE SET company_name = excluded.company_name",
+                    (analysis['symbol'], analysis.get('company_name'))
+                )
+                symbol_id = connection.execute(
+                    "SELECT symbol_id FROM symbols WHERE symbol = ?", (analysis['symbol'],)
+                ).fetchone()[0]
+                
+                connection.executemany(
+                    "INSERT OR IGNORE INTO questions (question_id, category, question_en, question_zh) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(number, category, result.get('question_en'), result.get('question_zh'))
+                     for number, (result, category) in enumerate(zip(analysis['results'], categories), 1)]
+                )
+                
+                run_date = when.date().isoformat()
+                run_id = connection.execute(
+                    "INSERT INTO runs (symbol_id, run_date, run_time, overall_score, recommendation, confidence) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (symbol_id, run_date, when.isoformat(timespec='seconds'), summary['overall_score'],
+                     summary['recommendation_en'], summary['confidence'])
+                ).lastrowid
+                
+                connection.executemany(
+                    "INSERT INTO category_scores (run_id, category, score) VALUES (?, ?, ?)",
+                    [(run_id, category, score) for category, score in summary['category_scores'].items()]
+                )
+                connection.executemany(
+                    "INSERT INTO question_scores (run_id, question_id, score) VALUES (?, ?, ?)",
+                    [(run_id, number, result.get('score'))
+                     for number, result in enumerate(analysis['results'], 1)]
+                )
+        finally:
+            connection.close()
+    
+    def _query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        connection = self._connect()
+        try:
+            return pd.read_sql_query(sql, connection, params=params)
+        finally:
+            connection.close()
+    
+    def score_history(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """
+        Every recorded run of one symbol, oldest first.
+        Returns: DataFrame with run_date, run_time, overall_score, recommendation and one column per category
+        """
+        runs = self._query(
+            "SELECT r.run_id, r.run_date, r.run_time, r.overall_score, r.recommendation "
+            "FROM runs r JOIN symbols s ON s.symbol_id = r.symbol_id "
+            "WHERE s.symbol = ? AND r.run_date BETWEEN ? AND ? ORDER BY r.run_time, r.run_id",
+            (symbol.upper(), start or '0000-00-00', end or '9999-99-99')
+        )
+        if runs.empty:
+            return runs.drop(columns='run_id')
+        
+        categories = self._query(
+            "SELECT c.run_id, c.category, c.score FROM category_scores c "
+            "JOIN runs r ON r.run_id = c.run_id JOIN symbols s ON s.symbol_id = r.symbol_id "
+            "WHERE s.symbol = ? AND r.run_date BETWEEN ? AND ?",
+            (symbol.upper(), start or '0000-00-00', end or '9999-99-99')
+        ).pivot(index='run_id', columns='category', values='score')
+        return runs.join(categories, on='run_id').drop(columns='run_id')
+    
+    def top(self, n: int = 50, run_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Highest overall scores on one date (default: the most recent run date),
+        using each symbol's latest run of that day.
+        Returns: DataFrame with symbol, company_name, overall_score and recommendation
+        """
+        run_date = run_date or self.latest_date()
+        if run_date is None:
+            return pd.DataFrame(columns=['symbol', 'company_name', 'overall_score', 'recommendation'])
+        return self._query(
+            "SELECT s.symbol, s.company_name, r.overall_score, r.recommendation FROM ("
+            "  SELECT symbol_id, overall_score, recommendation, ROW_NUMBER() OVER ("
+            "    PARTITION BY symbol_id ORDER BY run_time DESC, run_id DESC) AS position"
+            "  FROM runs WHERE run_date = ?"
+            ") r JOIN symbols s ON s.symbol_id = r.symbol_id "
+            "WHERE r.position = 1 ORDER BY r.overall_score DESC LIMIT ?",
+            (run_date, int(n))
+        )
+    
+    def latest_date(self) -> Optional[str]:
+        """Most recent run date in the database"""
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT MAX(run_date) FROM runs").fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+    
+    def previous_score(self, symbol: str, before: Optional[str] = None) -> Optional[float]:
+        """
+        Overall score of the latest run before a time.
+        Args:
+            before: ISO date or date-time (default now); a bare date excludes runs on that day
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT r.overall_score FROM runs r JOIN symbols s ON s.symbol_id = r.symbol_id "
+                "WHERE s.symbol = ? AND r.run_time < ? ORDER BY r.run_time DESC, r.run_id DESC LIMIT 1",
+                (symbol.upper(), before or datetime.now().isoformat(timespec='seconds'))
+            ).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row else None
+    
+    def question_history(self, symbol: str) -> pd.DataFrame:
+        """Per-question scores of one symbol (run times x question numbers)"""
+        scores = self._query(
+            "SELECT r.run_time, q.question_id, q.score FROM question_scores q "
+            "JOIN runs r ON r.run_id = q.run_id JOIN symbols s ON s.symbol_id = r.symbol_id "
+            "WHERE s.symbol = ?",
+            (symbol.upper(),)
+        )
+        return scores.pivot_table(index='run_time', columns='question_id', values='score', aggfunc='last',
+                                  dropna=False)
+
+def parse_date(value: str) -> str:
+    """Accept YYYY-MM-DD, 'today' or 'yesterday'"""
+    if value == 'today':
+        return date.today().isoformat()
+    if value == 'yesterday':
+        return (pd.Timestamp(date.today()) - pd.Timedelta(days=1)).date().isoformat()
+    return date.fromisoformat(value).isoformat()
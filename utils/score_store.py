@@ -0,0 +1,86 @@
+"""
+Persistence of per-question scores for offline re-scoring
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import json
+import os
+import numpy as np
+import config
+
+class ScoreStore:
+    """
+    Latest per-question scores for each analyzed symbol, one JSON file per
+    symbol under CACHE_DIR/scores. Feeds the vectorized what-if re-scorer.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(config.CACHE_DIR, 'scores')
+    
+    def save(self, analysis: Dict[str, Any], categories: List[str]):
+        """
+        Persist the question scores of one StockAnalyzer.run_analysis result.
+        Args:
+            analysis: Result dict from run_analysis
+            categories: Category of each entry in analysis['results'], in order
+        """
+        questions = []
+        for number, (result, category) in enumerate(zip(analysis['results'], categories), 1):
+            questions.append({
+                'question': number,
+                'category': category,
+                'score': result.get('score')
+            })
+        
+        record = {
+            'symbol': analysis['symbol'],
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'overall_score': analysis['summary']['overall_score'],
+            'recommendation': analysis['summary']['recommendation_en'],
+            'questions': questions
+        }
+        
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{analysis['symbol']}.json")
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+        os.replace(temp_path, path)
+    
+    def load(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Load the stored record for one symbol"""
+        path = os.path.join(self.directory, f"{symbol.upper()}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def symbols(self) -> List[str]:
+        """All symbols with stored scores"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith('.json'))
+    
+    def load_matrix(self, symbols: Optional[List[str]] = None) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Assemble the (symbols x questions) score matrix.
+        Unscored questions (e.g. Q1) are NaN.
+        Returns: (symbols, category of each question column, score matrix)
+        """
+        records = [self.load(symbol) for symbol in (symbols or self.symbols())]
+        records = [r for r in records if r]
+        if not records:
+            return [], [], np.empty((0, 0))
+        
+        n_questions = max(len(r['questions']) for r in records)
+        question_categories = [None] * n_questions
+        matrix = np.full((len(records), n_questions), np.nan)
+        
+        for row, record in enumerate(records):
+            for q in record['questions']:
+                column = q['question'] - 1
+                question_categories[column] = q['category']
+                if q['score'] is not None:
+                    matrix[row, column] = q['score']
+        
+        return [r['symbol'] for r in records], question_categories, matrix
@@ -59,8 +59,14 @@ class Scorer:
         Get buy/sell recommendation based on weighted score
         Returns: (recommendation_en, recommendation_zh, confidence)
         """
-        score = self.get_weighted_score()
-        
+        return self.recommendation_for(self.get_weighted_score())
+    
+    @staticmethod
+    def recommendation_for(score: float) -> Tuple[str, str, str]:
+        """
+        Map a weighted score to a recommendation
+        Returns: (recommendation_en, recommendation_zh, confidence)
+        """
         if score >= config.THRESHOLDS['strong_buy']:
             return "Strong Buy", "强烈买入", "High"
         elif score >= config.THRESHOLDS['buy']:
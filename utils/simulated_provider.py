@@ -0,0 +1,347 @@
+"""
+Simulated market data provider for offline load testing
+"""
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timezone
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from utils.resilience import RateLimiter
+
+SECTORS = [
+    ('Technology', 'Software - Infrastructure'), ('Healthcare', 'Drug Manufacturers'),
+    ('Financial Services', 'Banks - Diversified'), ('Consumer Cyclical', 'Specialty Retail'),
+    ('Energy', 'Oil & Gas Integrated'), ('Industrials', 'Aerospace & Defense'),
+    ('Utilities', 'Utilities - Regulated Electric'), ('Consumer Defensive', 'Beverages - Non-Alcoholic'),
+]
+
+HEADLINE_TEMPLATES = [
+    '{name} shares surge after earnings beat estimates',
+    '{name} announces record revenue and raises guidance',
+    '{name} stock falls as outlook disappoints investors',
+    '{name} faces lawsuit over product safety concerns',
+    'Analysts upgrade {name} on strong growth momentum',
+    '{name} misses expectations, shares drop',
+    '{name} unveils new product lineup',
+    'Regulators open investigation into {name}',
+    '{name} expands partnership to accelerate growth',
+    '{name} cuts jobs amid restructuring',
+]
+
+HISTORY_DAYS = 2520   # ~10 years of daily bars
+
+class SimulatedThrottleError(Exception):
+    """HTTP 429 from the simulated provider"""
+    
+    def __init__(self):
+        super().__init__("Too Many Requests. Rate limited. Try after a while.")
+
+class SimulatedUpstreamError(ConnectionError):
+    """Transient 5xx / connection failure from the simulated provider"""
+
+class ProviderStats:
+    """Thread-safe counters of what the simulated upstream saw"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.throttled = 0
+    
+    def record(self, outcome: str):
+        with self._lock:
+            self.requests += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {'requests': self.requests, 'successes': self.successes,
+                    'errors': self.errors, 'throttled': self.throttled}
+
+class SimulatedProvider:
+    """
+    Factory of SimulatedTicker objects sharing one latency/error profile.
+    
+    Every request sleeps for a log-normally distributed latency, then fails
+    with probability `error_rate` (transient 5xx) or `throttle_rate` (429).
+    Requests beyond `max_requests_per_second` across all tickers are also
+    answered with 429, like a real upstream rate limit.
+    
+    Install with data_fetcher.set_ticker_factory(provider.ticker).
+    """
+    
+    def __init__(self, latency_ms: float = 80.0, latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 max_requests_per_second: Optional[float] = None, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.limit = (RateLimiter(max_requests_per_second, max(1, int(max_requests_per_second)))
+                      if max_requests_per_second else None)
+        self.seed = seed
+        self.stats = ProviderStats()
+        self._rng = np.random.default_rng(seed)
+        self._rng_lock = threading.Lock()
+    
+    def ticker(self, symbol: str) -> 'SimulatedTicker':
+        return SimulatedTicker(symbol, self)
+    
+    def request(self):
+        """Simulate one upstream round trip; raises on injected failures"""
+        with self._rng_lock:
+            latency = self.latency_ms * self._rng.lognormal(0.0, self.latency_sigma) / 1000.0
+            roll = self._rng.random()
+        time.sleep(latency)
+        
+        if (self.limit is not None and not self.limit.try_acquire()) or roll < self.throttle_rate:
+            self.stats.record('throttled')
+            raise SimulatedThrottleError()
+        if roll < self.throttle_rate + self.error_rate:
+            self.stats.record('errors')
+            raise SimulatedUpstreamError("503 Service Unavailable (simulated)")
+        self.stats.record('successes')
+
+class SimulatedTicker:
+    """Drop-in stand-in for yf.Ticker with deterministic synthetic data per symbol"""
+    
+    def __init__(self, symbol: str, provider: SimulatedProvider):
+        self.ticker = symbol.upper()
+        self.provider = provider
+        self._seed = zlib.crc32(f"{provider.seed}:{self.ticker}".encode())
+        self._history: Optional[pd.DataFrame] = None
+    
+    def _rng(self, salt: str) -> np.random.Generator:
+        return np.random.default_rng([self._seed, zlib.crc32(salt.encode())])
+    
+    # ---- price history ----
+    
+    def _full_history(self) -> pd.DataFrame:
+        if self._history is None:
+            rng = self._rng('history')
+            index = pd.bdate_range(end=pd.Timestamp.now(tz='America/New_York').normalize(),
+                                   periods=HISTORY_DAYS, tz='America/New_York')
+            drift, vol = rng.normal(0.0003, 0.0004), rng.uniform(0.01, 0.03)
+            close = rng.uniform(10, 400) * np.exp(np.cumsum(rng.normal(drift, vol, len(index))))
+            spread = np.abs(rng.normal(0, vol, len(index))) * close
+            open_ = close * (1 + rng.normal(0, vol / 2, len(index)))
+            dividends = np.zeros(len(index))
+            dividends[::63] = np.round(close[::63] * rng.uniform(0, 0.008), 2)
+            self._history = pd.DataFrame({
+                'Open': open_,
+                'High': np.maximum(open_, close) + spread / 2,
+                'Low': np.minimum(open_, close) - spread / 2,
+                'Close': close,
+                'Volume': rng.lognormal(15, 0.6, len(index)).astype(np.int64),
+                'Dividends': dividends,
+                'Stock Splits': 0.0,
+            }, index=index)
+        return self._history
+    
+    def history(self, period: str = '1mo', start=None, end=None, **kwargs) -> pd.DataFrame:
+        self.provider.request()
+        frame = self._full_history()
+        tz = frame.index.tz
+        if start is not None:
+            frame = frame.loc[frame.index >= pd.Timestamp(start).tz_localize(tz)]
+            if end is not None:
+                frame = frame.loc[frame.index < pd.Timestamp(end).tz_localize(tz)]
+            return frame.copy()
+        if period == 'max':
+            return frame.copy()
+        if period == 'ytd':
+            return frame.loc[frame.index.year == frame.index[-1].year].copy()
+        bars = {'1d': 1, '5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252,
+                '2y': 504, '5y': 1260, '10y': 2520}.get(period, 21)
+        return frame.iloc[-bars:].copy()
+    
+    # ---- quote / profile ----
+    
+    @property
+    def info(self) -> Dict[str, Any]:
+        self.provider.request()
+        rng = self._rng('info')
+        close = self._full_history()['Close']
+        price = float(close.iloc[-1])
+        year = close.iloc[-252:]
+        sector, industry = SECTORS[self._seed % len(SECTORS)]
+        eps = price / rng.uniform(8, 60)
+        dividend_yield = max(0.0, rng.normal(0.015, 0.015))
+        target = price * rng.uniform(0.85, 1.35)
+        revenue = rng.lognormal(22, 1.2)
+        return {
+            'symbol': self.ticker,
+            'longName': f"{self.ticker} Holdings Inc.",
+            'sector': sector,
+            'industry': industry,
+            'longBusinessSummary': f"{self.ticker} Holdings operates in the {industry.lower()} industry.",
+            'currentPrice': price,
+            'fiftyTwoWeekHigh': float(year.max()),
+            'fiftyTwoWeekLow': float(year.min()),
+            'trailingPE': price / eps,
+            'forwardPE': price / (eps * rng.uniform(0.8, 1.3)),
+            'priceToBook': rng.uniform(0.5, 12),
+            'priceToSalesTrailing12Months': rng.uniform(0.3, 15),
+            'pegRatio': rng.uniform(0.3, 3.5),
+            'enterpriseValue': revenue * rng.uniform(1, 8),
+            'ebitda': revenue * rng.uniform(0.05, 0.4),
+            'profitMargins': rng.normal(0.12, 0.1),
+            'grossMargins': rng.uniform(0.15, 0.8),
+            'revenueGrowth': rng.normal(0.06, 0.12),
+            'quarterlyRevenueGrowth': rng.normal(0.05, 0.1),
+            'earningsGrowth': rng.normal(0.08, 0.2),
+            'debtToEquity': rng.uniform(0, 300),
+            'currentRatio': rng.uniform(0.5, 3.5),
+            'quickRatio': rng.uniform(0.3, 2.5),
+            'operatingCashflow': revenue * rng.normal(0.15, 0.1),
+            'freeCashflow': revenue * rng.normal(0.08, 0.1),
+            'dividendYield': dividend_yield,
+            'dividendRate': price * dividend_yield,
+            'payoutRatio': rng.uniform(0.1, 1.0) if dividend_yield else 0,
+            'fiveYearAvgDividendYield': dividend_yield * 100 * rng.uniform(0.7, 1.3),
+            'targetMeanPrice': target,
+            'targetHighPrice': target * 1.2,
+            'targetLowPrice': target * 0.8,
+            'numberOfAnalystOpinions': int(rng.integers(3, 45)),
+            'recommendationKey': ['strong_buy', 'buy', 'hold', 'underperform', 'sell'][int(rng.integers(0, 5))],
+            'auditRisk': int(rng.integers(1, 11)),
+            'boardRisk': int(rng.integers(1, 11)),
+            'compensationRisk': int(rng.integers(1, 11)),
+            'shareHolderRightsRisk': int(rng.integers(1, 11)),
+            'overallRisk': int(rng.integers(1, 11)),
+            # Matches the latest quarterly statement column; next report ~35 days after the current quarter ends
+            'mostRecentQuarter': int((pd.Timestamp.now().normalize() - pd.offsets.QuarterEnd(1)).timestamp()),
+            'earningsTimestamp': int((pd.Timestamp.now().normalize() + pd.offsets.QuarterEnd(0)
+                                      + pd.Timedelta(days=35)).timestamp()),
+        }
+    
+    # ---- financial statements (newest period first, like yfinance) ----
+    
+    def _statement(self, kind: str, quarterly: bool) -> pd.DataFrame:
+        self.provider.request()
+        rng = self._rng(f"{kind}:{quarterly}")
+        periods = 5 if quarterly else 4
+        end = pd.Timestamp.now().normalize() - pd.offsets.QuarterEnd(1 if quarterly else 4)
+        columns = pd.date_range(end=end, periods=periods, freq='QE' if quarterly else 'YE')[::-1]
+        scale = rng.lognormal(22, 1.2) / (4 if quarterly else 1)
+        growth = np.cumprod(1 + rng.normal(0.05, 0.08, periods))[::-1]
+        revenue = scale * growth / growth[-1]
+        
+        if kind == 'income':
+            gross = revenue * rng.uniform(0.2, 0.7)
+            operating = gross * rng.uniform(0.2, 0.6)
+            rows = {'Total Revenue': revenue, 'Gross Profit': gross,
+                    'Operating Income': operating, 'Net Income': operating * rng.uniform(0.6, 0.85)}
+        elif kind == 'balance':
+            assets = revenue * rng.uniform(1, 3)
+            equity = assets * rng.uniform(0.2, 0.6)
+            rows = {'Total Assets': assets, 'Total Liabilities Net Minority Interest': assets - equity,
+                    'Stockholders Equity': equity, 'Total Debt': (assets - equity) * rng.uniform(0.2, 0.7)}
+        else:
+            operating_cf = revenue * rng.normal(0.15, 0.08, periods)
+            capex = -revenue * rng.uniform(0.02, 0.1)
+            rows = {'Operating Cash Flow': operating_cf, 'Capital Expenditure': capex,
+                    'Free Cash Flow': operating_cf + capex}
+        return pd.DataFrame(rows, index=columns).T
+    
+    @property
+    def income_stmt(self) -> pd.DataFrame:
+        return self._statement('income', False)
+    
+    @property
+    def balance_sheet(self) -> pd.DataFrame:
+        return self._statement('balance', False)
+    
+    @property
+    def cashflow(self) -> pd.DataFrame:
+        return self._statement('cashflow', False)
+    
+    @property
+    def quarterly_income_stmt(self) -> pd.DataFrame:
+        return self._statement('income', True)
+    
+    @property
+    def quarterly_balance_sheet(self) -> pd.DataFrame:
+        return self._statement('balance', True)
+    
+    @property
+    def quarterly_cashflow(self) -> pd.DataFrame:
+        return self._statement('cashflow', True)
+    
+    # ---- corporate actions, analysts, holders, news ----
+    
+    @property
+    def dividends(self) -> pd.Series:
+        self.provider.request()
+        dividends = self._full_history()['Dividends']
+        return dividends[dividends > 0]
+    
+    @property
+    def recommendations(self) -> pd.DataFrame:
+        self.provider.request()
+        rng = self._rng('recommendations')
+        counts = rng.integers(0, 15, size=(4, 5))
+        frame = pd.DataFrame(counts, columns=['strongBuy', 'buy', 'hold', 'sell', 'strongSell'])
+        frame.insert(0, 'period', ['0m', '-1m', '-2m', '-3m'])
+        return frame
+    
+    @property
+    def major_holders(self) -> pd.DataFrame:
+        self.provider.request()
+        rng = self._rng('holders')
+        insiders, institutions = rng.uniform(0, 0.3), rng.uniform(0.2, 0.9)
+        return pd.DataFrame({'Value': [insiders, institutions, institutions / (1 - insiders), rng.integers(50, 4000)]},
+                            index=['insidersPercentHeld', 'institutionsPercentHeld',
+                                   'institutionsFloatPercentHeld', 'institutionsCount'])
+    
+    def _holder_table(self, salt: str) -> pd.DataFrame:
+        self.provider.request()
+        rng = self._rng(salt)
+        return pd.DataFrame({
+            'Holder': [f"Fund {i}" for i in range(10)],
+            'pctHeld': np.sort(rng.uniform(0.001, 0.08, 10))[::-1],
+            'Shares': rng.integers(1_000_000, 100_000_000, 10),
+        })
+    
+    @property
+    def institutional_holders(self) -> pd.DataFrame:
+        return self._holder_table('institutional')
+    
+    @property
+    def mutualfund_holders(self) -> pd.DataFrame:
+        return self._holder_table('mutualfund')
+    
+    @property
+    def news(self) -> List[Dict[str, Any]]:
+        self.provider.request()
+        # New articles appear every few hours, so repeated calls overlap like the real feed
+        slot = int(time.time() // 10800)
+        articles = []
+        for i in range(10):
+            rng = self._rng(f"news:{slot - i}")
+            title = HEADLINE_TEMPLATES[int(rng.integers(0, len(HEADLINE_TEMPLATES)))].format(name=self.ticker)
+            published = datetime.fromtimestamp((slot - i) * 10800, tz=timezone.utc)
+            article_id = f"{self.ticker}-{slot - i}"
+            articles.append({'id': article_id, 'content': {
+                'id': article_id,
+                'title': title,
+                'pubDate': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'provider': {'displayName': 'Simulated Wire'},
+                'canonicalUrl': {'url': f"https://news.example.com/{article_id}"},
+                'finance': {'stockTickers': [{'symbol': self.ticker}]},
+            }})
+        return articles
+    
+    @property
+    def earnings(self) -> None:
+        # Removed upstream in recent yfinance releases
+        self.provider.request()
+        return None
+    
+    @property
+    def quarterly_earnings(self) -> None:
+        self.provider.request()
+        return None
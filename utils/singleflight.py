@@ -0,0 +1,50 @@
+"""
+Single-flight call coalescing
+"""
+from typing import Any, Callable, Dict, Hashable
+import threading
+
+class _Call:
+    """One in-flight call that concurrent callers wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+    
+    While a call for `key` is running, other callers block until it finishes
+    and receive the same result (or exception). Uses explicit locks only, so
+    it is safe on free-threaded builds where the GIL does not serialize dict access.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run `fn` for `key` unless a call is already in flight; share its outcome"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        
+        if call.error is not None:
+            raise call.error
+        return call.result
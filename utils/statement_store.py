@@ -0,0 +1,209 @@
+"""
+Long-format financial statement store for cross-company queries
+"""
+from typing import Any, Dict, List, Optional
+import os
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+import config
+
+# get_financials key -> (statement, frequency)
+STATEMENTS = {
+    'income_stmt': ('income', 'annual'),
+    'balance_sheet': ('balance', 'annual'),
+    'cash_flow': ('cashflow', 'annual'),
+    'quarterly_income': ('income', 'quarterly'),
+    'quarterly_balance': ('balance', 'quarterly'),
+    'quarterly_cashflow': ('cashflow', 'quarterly'),
+}
+
+COLUMNS = ['symbol', 'statement', 'line_item', 'period_end', 'frequency', 'value']
+CATEGORICAL = ['symbol', 'statement', 'line_item', 'frequency']
+# One value per line item and period; a later fetch restating it wins
+ROW_KEY = ['statement', 'line_item', 'period_end', 'frequency']
+
+def _encode(frame: pd.DataFrame) -> pd.DataFrame:
+    """Categorical-encode the repeated string columns"""
+    return frame.astype({column: 'category' for column in CATEGORICAL})
+
+def _concat(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate long frames; each carries its own categories, so re-encode over the union"""
+    return _encode(pd.concat([p.astype({c: 'object' for c in CATEGORICAL}) for p in parts],
+                             ignore_index=True))
+
+def normalize_financials(symbol: str, financials: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Convert get_financials() output (line items x periods, one wide frame per
+    statement) into long rows of (symbol, statement, line_item, period_end, frequency, value).
+    Missing values are dropped.
+    """
+    parts = []
+    for key, (statement, frequency) in STATEMENTS.items():
+        frame = financials.get(key) if financials else None
+        if frame is None or not isinstance(frame, pd.DataFrame) or frame.empty:
+            continue
+        values = frame.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        periods = pd.to_datetime(frame.columns, errors='coerce')
+        # Row-major flattening: each line item's periods are contiguous
+        long = pd.DataFrame({
+            'symbol': symbol.upper(),
+            'statement': statement,
+            'line_item': np.repeat(frame.index.astype(str).to_numpy(), len(periods)),
+            'period_end': np.tile(periods.to_numpy(), len(frame.index)),
+            'frequency': frequency,
+            'value': values.ravel()
+        })
+        long = long[long['value'].notna() & long['period_end'].notna()]
+        parts.append(long)
+    
+    if not parts:
+        return _encode(pd.DataFrame({column: pd.Series(dtype='float64' if column == 'value' else 'object')
+                                     for column in COLUMNS}))
+    long = pd.concat(parts, ignore_index=True)[COLUMNS]
+    long['period_end'] = pd.to_datetime(long['period_end']).astype('datetime64[ns]')
+    long['value'] = long['value'].astype('float64')
+    return _encode(long)
+
+class StatementStore:
+    """
+    Normalized statements partitioned by symbol under CACHE_DIR/statements.
+    Each fetch is merged into the symbol's partition: periods that have dropped
+    out of the provider's window are kept and restated values replace the old
+    ones. load() concatenates partitions into one categorical-encoded table
+    for vectorized queries.
+    """
+    
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.path.join(config.CACHE_DIR, 'statements')
+        self._lock = threading.Lock()
+    
+    def _path(self, symbol: str) -> str:
+        return os.path.join(self.directory, f"{symbol.upper()}.pkl")
+    
+    def _read(self, symbol: str) -> Optional[pd.DataFrame]:
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"Error reading statements for {symbol}: {e}")
+            return None
+    
+    def ingest(self, symbol: str, financials: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Normalize one symbol's statements and merge them into its stored partition.
+        Returns: The symbol's merged rows
+        """
+        long = normalize_financials(symbol, financials)
+        if long.empty:
+            return long
+        with self._lock:
+            stored = self._read(symbol)
+            if stored is not None and not stored.empty:
+                long = _concat([long, stored]).drop_duplicates(ROW_KEY, keep='first').sort_values(
+                    ['statement', 'frequency', 'line_item', 'period_end'], ignore_index=True)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                path = self._path(symbol)
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    pickle.dump(long, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"Error saving statements for {symbol}: {e}")
+        return long
+    
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith('.pkl'))
+    
+    def load(self, symbols: Optional[List[str]] = None) -> pd.DataFrame:
+        """All stored rows for the given symbols (default: every stored symbol)"""
+        parts = [part for part in (self._read(symbol) for symbol in (symbols or self.symbols()))
+                 if part is not None]
+        if not parts:
+            return normalize_financials('', {})
+        return _concat(parts)
+
+def line_items(long: pd.DataFrame, items: List[str], statement: str,
+               frequency: str = 'annual') -> pd.DataFrame:
+    """
+    Wide view of selected line items.
+    Returns: DataFrame indexed by (symbol, period_end), one column per line item, oldest period first
+    """
+    rows = long[(long['statement'] == statement) & (long['frequency'] == frequency)
+                & long['line_item'].isin(items)]
+    wide = rows.pivot_table(index=['symbol', 'period_end'], columns='line_item', values='value',
+                            aggfunc='last', observed=True)
+    return wide.reindex(columns=items).sort_index()
+
+def margin_history(long: pd.DataFrame, numerator: str = 'Gross Profit', denominator: str = 'Total Revenue',
+                   frequency: str = 'annual') -> pd.Series:
+    """Income statement ratio in percent per (symbol, period_end), e.g. the gross margin trend"""
+    wide = line_items(long, [numerator, denominator], 'income', frequency)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        margins = wide[numerator] / wide[denominator] * 100
+    return margins.replace([np.inf, -np.inf], np.nan).dropna().rename('margin')
+
+def _first_last(series: pd.Series) -> pd.DataFrame:
+    grouped = series.groupby(level='symbol', observed=True)
+    return pd.DataFrame({'first': grouped.first(), 'last': grouped.last(), 'periods': grouped.size()})
+
+def fundamental_metrics(long: pd.DataFrame) -> pd.DataFrame:
+    """
+    Statement-based fundamentals for every symbol in one set of group-bys.
+    Returns: DataFrame indexed by symbol with gross margin trend (oldest -> latest annual),
+             revenue YoY growth, operating and free cash flow, and debt to equity
+    """
+    margins = _first_last(margin_history(long))
+    metrics = pd.DataFrame(index=pd.Index(long['symbol'].unique().astype(str), name='symbol'))
+    metrics['gross_margin_first'] = margins['first']
+    metrics['gross_margin_latest'] = margins['last']
+    metrics['margin_periods'] = margins['periods']
+    metrics['margin_trend'] = np.where(
+        metrics['margin_periods'] >= 2,
+        np.where(metrics['gross_margin_latest'] > metrics['gross_margin_first'], 'improving', 'declining'),
+        None
+    )
+    
+    revenue = line_items(long, ['Total Revenue'], 'income')['Total Revenue'].dropna()
+    growth = revenue.groupby(level='symbol', observed=True).pct_change()
+    metrics['revenue_growth_yoy'] = growth.groupby(level='symbol', observed=True).last() * 100
+    
+    cash = line_items(long, ['Operating Cash Flow', 'Free Cash Flow'], 'cashflow')
+    latest_cash = cash.groupby(level='symbol', observed=True).last()
+    metrics['operating_cashflow'] = latest_cash['Operating Cash Flow']
+    metrics['free_cashflow'] = latest_cash['Free Cash Flow']
+    
+    balance = line_items(long, ['Total Debt', 'Stockholders Equity'], 'balance')
+    latest_balance = balance.groupby(level='symbol', observed=True).last()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics['debt_to_equity'] = latest_balance['Total Debt'] / latest_balance['Stockholders Equity'] * 100
+    return metrics
+
+def profitability_scores(frame: pd.DataFrame) -> pd.Series:
+    """
+    Q2 score for many symbols at once.
+    Args:
+        frame: Columns gross_margin and profit_margin (percent, from info) and
+               margin_trend ('improving' / 'declining' / None)
+    """
+    improving = frame['margin_trend'].eq('improving').to_numpy()
+    gross = frame['gross_margin'].to_numpy(dtype=float)
+    profit = frame['profit_margin'].to_numpy(dtype=float)
+    
+    base = np.select([gross > 40, gross > 25],
+                     [np.where(improving, 80, 70), np.where(improving, 65, 55)],
+                     np.where(improving, 45, 35))
+    score = np.where(frame['margin_trend'].notna().to_numpy(), base, 50)
+    score = np.where(profit > 20, np.minimum(100, score + 10),
+                     np.where(profit < 5, np.maximum(0, score - 15), score))
+    return pd.Series(score, index=frame.index)
+
+# Process-wide statement store fed by DataFetcher.get_financials
+statement_store = StatementStore() if config.CACHE_ENABLED else None
@@ -0,0 +1,205 @@
+"""
+Streaming universe summary - one overview report for a batch of analyses
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import heapq
+import html
+import threading
+import numpy as np
+import config
+
+class ScoreSketch:
+    """
+    Fixed-bin histogram over the 0-100 score range: constant memory, quantiles
+    accurate to half a bin width, exact count/mean/min/max.
+    """
+    
+    def __init__(self, bin_width: float = 0.5):
+        self.bin_width = bin_width
+        self.counts = np.zeros(int(np.ceil(100 / bin_width)) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+    
+    def add(self, score: float):
+        self.counts[int(min(max(score, 0.0), 100.0) // self.bin_width)] += 1
+        self.count += 1
+        self.total += score
+        self.minimum = min(self.minimum, score)
+        self.maximum = max(self.maximum, score)
+    
+    def quantiles(self, qs: List[float]) -> List[float]:
+        """Approximate quantiles (bin midpoints, clipped to the observed range)"""
+        if not self.count:
+            return [float('nan')] * len(qs)
+        cumulative = np.cumsum(self.counts)
+        ranks = np.ceil(np.asarray(qs) * self.count).clip(1, self.count)
+        bins = np.searchsorted(cumulative, ranks)
+        values = (bins + 0.5) * self.bin_width
+        return list(np.clip(values, self.minimum, self.maximum))
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+class _Extremes:
+    """The k largest items seen so far (a bounded min-heap)"""
+    
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, str, Any]] = []
+    
+    def add(self, key: float, symbol: str, payload: Any):
+        item = (key, symbol, payload)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+    
+    def items(self) -> List[Tuple[float, str, Any]]:
+        return sorted(self._heap, reverse=True)
+
+class UniverseSummary:
+    """
+    Running aggregates over StockAnalyzer results, fed one at a time as they finish.
+    Nothing per symbol is retained beyond the top/bottom lists, so memory does
+    not grow with the size of the universe.
+    """
+    
+    QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+    
+    def __init__(self, top_n: Optional[int] = None, previous_scores=None):
+        """
+        Args:
+            top_n: Length of the highest/lowest score and mover lists
+            previous_scores: Callable symbol -> previous overall score (or None), used for movers
+        """
+        params = config.SUMMARY_PARAMS
+        self.top_n = top_n or params['top_n']
+        self.previous_scores = previous_scores
+        self.started = datetime.now()
+        self.recommendations: Dict[str, int] = {}
+        self.sketches = {category: ScoreSketch(params['bin_width']) for category in ['overall', *config.WEIGHTS]}
+        self.highest = _Extremes(self.top_n)
+        self.lowest = _Extremes(self.top_n)
+        self.gainers = _Extremes(self.top_n)
+        self.decliners = _Extremes(self.top_n)
+        self.analyzed = 0
+        self.failed = 0
+        self.failure_examples: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+    
+    def add(self, analysis: Dict[str, Any]):
+        """Fold one run_analysis result into the aggregates"""
+        symbol = analysis['symbol']
+        summary = analysis['summary']
+        score = summary['overall_score']
+        previous = self.previous_scores(symbol) if self.previous_scores else None
+        label = (analysis.get('company_name') or symbol, summary['recommendation_en'])
+        
+        with self._lock:
+            self.analyzed += 1
+            recommendation = summary['recommendation_en']
+            self.recommendations[recommendation] = self.recommendations.get(recommendation, 0) + 1
+            self.sketches['overall'].add(score)
+            for category, category_score in summary['category_scores'].items():
+                if category in self.sketches:
+                    self.sketches[category].add(category_score)
+            
+            self.highest.add(score, symbol, label)
+            self.lowest.add(-score, symbol, label)
+            if previous is not None:
+                change = score - previous
+                self.gainers.add(change, symbol, (score, previous))
+                self.decliners.add(-change, symbol, (score, previous))
+    
+    def add_failure(self, symbol: str, error: str):
+        with self._lock:
+            self.failed += 1
+            if len(self.failure_examples) < self.top_n:
+                self.failure_examples.append((symbol, error))
+    
+    def sections(self) -> List[Tuple[str, List[str], List[List[str]]]]:
+        """Report content as (title, table header, table rows) triples"""
+        sections = []
+        order = ["Strong Buy", "Buy", "Hold", "Sell", "Strong Sell"]
+        total = max(self.analyzed, 1)
+        sections.append(("Recommendations | 建议分布", ["Recommendation", "Symbols", "Share"],
+                         [[r, str(self.recommendations.get(r, 0)), f"{self.recommendations.get(r, 0) / total:.1%}"]
+                          for r in order]))
+        
+        rows = []
+        for category, sketch in self.sketches.items():
+            quantiles = sketch.quantiles(self.QUANTILES)
+            rows.append([category.title(), str(sketch.count), f"{sketch.mean:.1f}",
+                         *[f"{q:.1f}" for q in quantiles],
+                         f"{sketch.minimum:.1f}" if sketch.count else "N/A",
+                         f"{sketch.maximum:.1f}" if sketch.count else "N/A"])
+        sections.append(("Score Distribution | 评分分布",
+                         ["Category", "N", "Mean", *[f"P{int(q * 100)}" for q in self.QUANTILES], "Min", "Max"],
+                         rows))
+        
+        for title, extremes, sign in (("Highest Scores | 最高评分", self.highest, 1),
+                                      ("Lowest Scores | 最低评分", self.lowest, -1)):
+            sections.append((title, ["Symbol", "Company", "Score", "Recommendation"],
+                             [[symbol, name, f"{sign * key:.1f}", recommendation]
+                              for key, symbol, (name, recommendation) in extremes.items()]))
+        
+        for title, extremes, sign in (("Top Gainers | 评分上升", self.gainers, 1),
+                                      ("Top Decliners | 评分下降", self.decliners, -1)):
+            items = [(k, s, p) for k, s, p in extremes.items() if k > 0]
+            sections.append((title, ["Symbol", "Change", "Score", "Previous"],
+                             [[symbol, f"{sign * key:+.1f}", f"{score:.1f}", f"{previous:.1f}"]
+                              for key, symbol, (score, previous) in items]))
+        
+        if self.failure_examples:
+            sections.append((f"Failures | 失败 ({self.failed})", ["Symbol", "Error"],
+                             [[symbol, error] for symbol, error in self.failure_examples]))
+        return sections
+    
+    def _heading(self) -> List[str]:
+        return [
+            f"Generated | 生成时间: {datetime.now():%Y-%m-%d %H:%M:%S}",
+            f"Analyzed | 已分析: {self.analyzed}  Failed | 失败: {self.failed}  "
+            f"Elapsed | 用时: {(datetime.now() - self.started).total_seconds():.0f}s",
+        ]
+    
+    def to_markdown(self) -> str:
+        lines = ["# Universe Summary | 股票池汇总", ""]
+        lines += [f"{line}  " for line in self._heading()]
+        for title, header, rows in self.sections():
+            lines += ["", f"## {title}", ""]
+            if not rows:
+                lines.append("_None_")
+                continue
+            lines.append("| " + " | ".join(header) + " |")
+            lines.append("|" + "|".join("---" for _ in header) + "|")
+            lines += ["| " + " | ".join(cell.replace('|', '\\|') for cell in row) + " |" for row in rows]
+        return "\n".join(lines) + "\n"
+    
+    def to_html(self) -> str:
+        parts = ["<!DOCTYPE html>", "<html><head><meta charset=\"utf-8\"><title>Universe Summary</title>",
+                 "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+                 "td,th{border:1px solid #ddd;padding:4px 8px;text-align:right}"
+                 "td:first-child,th:first-child{text-align:left}</style></head><body>",
+                 "<h1>Universe Summary | 股票池汇总</h1>"]
+        parts += [f"<p>{html.escape(line)}</p>" for line in self._heading()]
+        for title, header, rows in self.sections():
+            parts.append(f"<h2>{html.escape(title)}</h2>")
+            if not rows:
+                parts.append("<p><em>None</em></p>")
+                continue
+            parts.append("<table><tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in header) + "</tr>")
+            parts += ["<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>" for row in rows]
+            parts.append("</table>")
+        parts.append("</body></html>")
+        return "\n".join(parts)
+    
+    def write(self, path: str) -> str:
+        """Write the summary as HTML (.html/.htm) or markdown (anything else)"""
+        content = self.to_html() if path.lower().endswith(('.html', '.htm')) else self.to_markdown()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
@@ -0,0 +1,73 @@
+"""
+Minimal dependency-graph executor
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+
+class TaskGraph:
+    """
+    Run named callables on a thread pool, each as soon as its dependencies finish.
+    
+    Tasks with no dependencies start immediately. If a task raises, tasks that
+    depend on it are not started and the first error is re-raised from run()
+    once everything already running has finished.
+    """
+    
+    def __init__(self):
+        self._tasks: Dict[str, Callable[[], Any]] = {}
+        self._deps: Dict[str, List[str]] = {}
+    
+    def add(self, name: str, fn: Callable[[], Any], deps: Iterable[str] = ()):
+        """Register a task; dependencies must be added before run()"""
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        self._tasks[name] = fn
+        self._deps[name] = list(deps)
+    
+    def run(self, max_workers: Optional[int] = None,
+            on_done: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Execute the graph.
+        Args:
+            max_workers: Thread pool size (default: one per task)
+            on_done: Called with each task name as it completes successfully
+        Returns: Mapping of task name -> result
+        """
+        for name, deps in self._deps.items():
+            missing = [d for d in deps if d not in self._tasks]
+            if missing:
+                raise ValueError(f"Task {name} depends on unknown tasks: {missing}")
+        
+        results: Dict[str, Any] = {}
+        pending = {name: set(deps) for name, deps in self._deps.items()}
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+        
+        with ThreadPoolExecutor(max_workers=max_workers or max(1, len(self._tasks))) as pool:
+            while pending or running:
+                if error is None:
+                    for name in [n for n, deps in pending.items() if not deps]:
+                        del pending[name]
+                        running[pool.submit(self._tasks[name])] = name
+                if not running:
+                    # Either an error stopped scheduling or the graph has a cycle
+                    if error is None:
+                        raise ValueError(f"Dependency cycle among tasks: {sorted(pending)}")
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException as e:
+                        error = error or e
+                        continue
+                    for deps in pending.values():
+                        deps.discard(name)
+                    if on_done:
+                        on_done(name)
+        
+        if error is not None:
+            raise error
+        return results
@@ -0,0 +1,227 @@
+"""
+Watchlist Refresh Daemon - keeps a watchlist's analyses current with minimal fetching
+"""
+from typing import Dict, List, Any, Optional, Callable, Tuple
+from datetime import datetime
+import heapq
+import json
+import time
+import config
+from stock_analyzer import StockAnalyzer
+from analyzers.sentiment import scan_headlines
+from utils.data_fetcher import DataFetcher, get_fetcher
+from utils.filing_cache import filing_cache
+from utils.history_store import history_store
+from utils.memory_cache import memory_cache
+from utils.news_store import news_store
+from utils.resilience import RateLimiter
+
+# Dataset classes the analyzers depend on: name -> (DataFetcher cache key, loader)
+DATASETS: Dict[str, Tuple[str, Callable[[DataFetcher], Any]]] = {
+    'info': ('info', lambda f: f.get_stock_info()),
+    'history': ('history_1y', lambda f: f.get_historical_data(period="1y")),
+    'financials': ('financials', lambda f: f.get_financials()),
+    'dividends': ('dividends', lambda f: f.get_dividends()),
+    'recommendations': ('recommendations', lambda f: f.get_recommendations()),
+    'news': ('news', lambda f: f.get_news()),
+    'holders': ('holders', lambda f: f.get_major_holders()),
+}
+
+# Every analysis also reads the benchmark's history for beta; it is refreshed once for the
+# whole watchlist on the 'history' cadence
+BENCHMARK_DATASET: Tuple[str, Callable[[DataFetcher], Any]] = (
+    f"history_{config.RISK_PARAMS['history_period']}",
+    lambda f: f.get_historical_data(period=config.RISK_PARAMS['history_period'])
+)
+
+# Datasets read through a process-wide store, so they stay readable without an upstream
+# request after their memory cache entry is evicted
+DISK_BACKED = {dataset for dataset, store in (('history', history_store), ('benchmark', history_store),
+                                              ('financials', filing_cache), ('news', news_store))
+               if store is not None}
+
+def load_watchlist(path: str) -> Dict[str, float]:
+    """
+    Read a watchlist file: one symbol per line, optionally followed by an
+    importance weight ("AAPL,2.5"). Blank lines and '#' comments are ignored.
+    Returns: Mapping of symbol -> importance
+    """
+    watchlist = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            parts = [p.strip() for p in line.replace('\t', ',').split(',')]
+            importance = float(parts[1]) if len(parts) > 1 and parts[1] else 1.0
+            # Priorities are staleness x importance; zero or negative weights break the ordering
+            if not importance > 0 or importance == float('inf'):
+                raise ValueError(f"Importance for {parts[0]} must be a positive number, got {parts[1]}")
+            watchlist[parts[0].upper()] = importance
+    return watchlist
+
+class WatchlistDaemon:
+    """
+    Long-running scheduler that refreshes only what is due.
+    
+    Every tick, each (symbol, dataset) whose age exceeds its cadence is put on
+    a priority queue ordered by staleness x importance (staleness = age /
+    cadence). Items are popped while the global fetch budget allows; symbols
+    whose data changed are re-scored and recommendation flips are logged.
+    """
+    
+    def __init__(self, watchlist: Dict[str, float], cadence_minutes: Dict[str, float] = None,
+                 fetches_per_minute: float = None, changelog_path: Optional[str] = None):
+        self.watchlist = watchlist
+        self.cadence = dict(config.REFRESH_CADENCE_MINUTES)
+        if cadence_minutes:
+            self.cadence.update(cadence_minutes)
+        budget = fetches_per_minute or config.WATCHLIST_FETCH_BUDGET
+        self.budget = RateLimiter(budget / 60.0, max(1, int(budget)))
+        self.changelog_path = changelog_path
+        self.benchmark = config.RISK_PARAMS['benchmark']
+        self.cadence.setdefault('benchmark', self.cadence['history'])
+        
+        # (symbol, dataset, importance) for every item the analyses read
+        self.items = [(symbol, dataset, importance)
+                      for symbol, importance in watchlist.items() for dataset in DATASETS]
+        self.items.append((self.benchmark, 'benchmark', max(watchlist.values(), default=1.0)))
+        
+        # Shared registry fetchers the cached datasets belong to
+        self.fetchers: Dict[str, DataFetcher] = {}
+        self.last_refresh: Dict[Tuple[str, str], float] = {}
+        self.recommendations: Dict[str, Dict[str, Any]] = {}
+        self.fetch_count = 0
+    
+    def due_items(self, now: float) -> List[Tuple[float, float, str, str]]:
+        """
+        Build the priority queue of (symbol, dataset) pairs past their cadence.
+        Returns: Heap of (-priority, -importance, symbol, dataset)
+        """
+        heap = []
+        for symbol, dataset, importance in self.items:
+            cadence = self.cadence[dataset] * 60
+            last = self.last_refresh.get((symbol, dataset))
+            # Never-fetched and no longer cached items are maximally stale
+            staleness = (now - last) / cadence if self._present(symbol, dataset) else float('inf')
+            if staleness >= 1:
+                heap.append((-staleness * importance, -importance, symbol, dataset))
+        heapq.heapify(heap)
+        return heap
+    
+    def tick(self) -> List[Dict[str, Any]]:
+        """
+        Run one scheduling round.
+        Returns: Recommendation changes emitted this round
+        """
+        now = time.time()
+        queue = self.due_items(now)
+        dirty = set()
+        
+        while queue and self.budget.try_acquire():
+            _, _, symbol, dataset = heapq.heappop(queue)
+            if self._refresh(symbol, dataset):
+                dirty.add(symbol)
+        
+        ready = [symbol for symbol in sorted(dirty) if self._is_ready(symbol)]
+        # The ready symbols' cached headlines are keyword-scanned in one matcher pass
+        headlines = scan_headlines({symbol: self._fetcher(symbol).get_news() for symbol in ready})
+        changes = []
+        for symbol in ready:
+            change = self._rescore(symbol, headlines.get(symbol))
+            if change:
+                changes.append(change)
+        return changes
+    
+    def run(self, tick_seconds: float = None, max_ticks: Optional[int] = None):
+        """Run the scheduling loop until interrupted (or for max_ticks rounds)"""
+        tick_seconds = tick_seconds or config.WATCHLIST_TICK_SECONDS
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            self.tick()
+            ticks += 1
+            time.sleep(tick_seconds)
+    
+    def _refresh(self, symbol: str, dataset: str) -> bool:
+        """Refetch one dataset; returns True if it was fetched successfully"""
+        key, loader = BENCHMARK_DATASET if dataset == 'benchmark' else DATASETS[dataset]
+        fetcher = self._fetcher(symbol)
+        fetcher.invalidate(key)
+        loader(fetcher)
+        self.fetch_count += 1
+        
+        if key in fetcher.errors:
+            return False
+        self.last_refresh[(symbol, dataset)] = time.time()
+        return True
+    
+    def _fetcher(self, symbol: str) -> DataFetcher:
+        """
+        The symbol's shared fetcher. When the registry has replaced it (aged out or
+        evicted), the datasets the old one still holds carry over: the cadences,
+        not the registry, decide when they are stale.
+        """
+        fetcher = get_fetcher(symbol)
+        previous = self.fetchers.get(symbol)
+        if previous is not fetcher:
+            self.fetchers[symbol] = fetcher
+            if isinstance(previous, DataFetcher):
+                for key in self._keys(symbol):
+                    found, value = memory_cache.get(previous._namespace, key)
+                    if found and not memory_cache.contains(fetcher._namespace, key):
+                        memory_cache.put(fetcher._namespace, key, value)
+        return fetcher
+    
+    def _keys(self, symbol: str) -> List[str]:
+        keys = [key for key, _ in DATASETS.values()]
+        return keys + [BENCHMARK_DATASET[0]] if symbol == self.benchmark else keys
+    
+    def _present(self, symbol: str, dataset: str) -> bool:
+        """Whether a refreshed dataset can still be read without an upstream request"""
+        if (symbol, dataset) not in self.last_refresh:
+            return False
+        if dataset in DISK_BACKED:
+            return True
+        key = BENCHMARK_DATASET[0] if dataset == 'benchmark' else DATASETS[dataset][0]
+        # Memory-only datasets may have been evicted from the LRU since their refresh
+        return memory_cache.contains(self._fetcher(symbol)._namespace, key)
+    
+    def _is_ready(self, symbol: str) -> bool:
+        """
+        A symbol is scored only once every dataset it reads, the benchmark
+        history included, is still cached, so rescoring never fetches outside the budget
+        """
+        return (all(self._present(symbol, dataset) for dataset in DATASETS)
+                and self._present(self.benchmark, 'benchmark'))
+    
+    def _rescore(self, symbol: str, headline_scan: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Re-run the analysis from cached data; return a change record if the recommendation flipped"""
+        # Charts read a longer history the budget does not cover
+        analyzer = StockAnalyzer(symbol, data_fetcher=self._fetcher(symbol), verbose=False, charts=False,
+                                 headline_scan=headline_scan)
+        results = analyzer.run_analysis()
+        summary = results['summary']
+        previous = self.recommendations.get(symbol)
+        self.recommendations[symbol] = summary
+        
+        if previous is None or previous['recommendation_en'] == summary['recommendation_en']:
+            return None
+        
+        change = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'symbol': symbol,
+            'from': previous['recommendation_en'],
+            'to': summary['recommendation_en'],
+            'old_score': previous['overall_score'],
+            'new_score': summary['overall_score']
+        }
+        self._emit(change)
+        return change
+    
+    def _emit(self, change: Dict[str, Any]):
+        """Print a compact change line and append it to the change log"""
+        print(f"[{change['time']}] {change['symbol']}: {change['from']} → {change['to']} "
+              f"({change['old_score']:.1f} → {change['new_score']:.1f})")
+        if self.changelog_path:
+            with open(self.changelog_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(change, ensure_ascii=False) + '\n')